@@ -0,0 +1,37 @@
+"""Compare validate_arrow on an Arrow table with validate_columns on the same columns."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pyarrow as pa
+
+from benchmarks.datasets import archive_rows, as_columns
+from isic_metadata.arrow import validate_arrow
+from isic_metadata.metadata import validate_columns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    columns = as_columns(archive_rows(args.rows))
+    table = pa.table({name: pa.array(values, pa.string()) for name, values in columns.items()})
+
+    start = time.perf_counter()
+    validate_columns(columns)
+    columnar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validate_arrow(table)
+    arrow = time.perf_counter() - start
+
+    print(f"rows:      {args.rows:,}")
+    print(f"columnar:  {columnar:.2f}s")
+    print(f"arrow:     {arrow:.2f}s ({columnar / arrow:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
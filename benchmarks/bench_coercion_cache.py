@@ -0,0 +1,38 @@
+"""Compare validating rows with and without a shared CoercionCache."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.metadata import CoercionCache, MetadataRow
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--maxsize", type=int, default=4096)
+    args = parser.parse_args()
+
+    rows = archive_rows(args.rows)
+
+    start = time.perf_counter()
+    for row in rows:
+        MetadataRow.model_validate(dict(row))
+    uncached = time.perf_counter() - start
+
+    cache = CoercionCache(maxsize=args.maxsize)
+    start = time.perf_counter()
+    for row in rows:
+        MetadataRow.validate_with_cache(row, cache)
+    cached = time.perf_counter() - start
+
+    print(f"rows:      {args.rows:,}")
+    print(f"uncached:  {uncached:.2f}s")
+    print(f"cached:    {cached:.2f}s ({uncached / cached:.1f}x)")
+    print(f"cache:     {cache.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare validate_columns with validating one MetadataRow per row."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.datasets import archive_rows, as_columns
+from isic_metadata.metadata import MetadataRow, validate_columns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = archive_rows(args.rows)
+    columns = as_columns(rows)
+
+    start = time.perf_counter()
+    for row in rows:
+        MetadataRow.model_validate(dict(row))
+    per_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validate_columns(columns)
+    columnar = time.perf_counter() - start
+
+    print(f"rows:      {args.rows:,}")
+    print(f"per row:   {per_row:.2f}s")
+    print(f"columnar:  {columnar:.2f}s ({per_row / columnar:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compare validating a wide CSV file as dicts of values and as rows routed by position."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import time
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.ingest import ValidationStream, validate_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--unstructured", type=int, default=50, help="unstructured columns")
+    args = parser.parse_args()
+
+    rows = archive_rows(args.rows)
+    extra_columns = [f"extra_{i}" for i in range(args.unstructured)]
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow([*rows[0], *extra_columns])
+    writer.writerows(
+        [*row.values(), *(f"{i % 7}" for i in range(len(extra_columns)))] for row in rows
+    )
+    text.seek(0)
+
+    start = time.perf_counter()
+    list(ValidationStream(csv.DictReader(text)))
+    dicts = time.perf_counter() - start
+
+    text.seek(0)
+    start = time.perf_counter()
+    list(validate_csv(text))
+    positional = time.perf_counter() - start
+
+    print(f"rows:       {args.rows:,} ({len(rows[0]) + len(extra_columns)} columns)")
+    print(f"dicts:      {dicts:.2f}s")
+    print(f"positional: {positional:.2f}s ({dicts / positional:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
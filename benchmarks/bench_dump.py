@@ -0,0 +1,54 @@
+"""Measure the throughput of dumping validated rows, row by row and in bulk."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import TYPE_CHECKING, Any
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.export import dump_columns, dump_ndjson, dump_rows
+from isic_metadata.metadata import CoercionCache, MetadataRow
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def best_of(repeat: int, function: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cache = CoercionCache()
+    rows = [MetadataRow.validate_with_cache(row, cache) for row in archive_rows(args.rows)]
+
+    print(f"rows:      {args.rows:,}")
+    for label, per_row, bulk in [
+        ("dicts", lambda: [row.model_dump() for row in rows], lambda: dump_rows(rows)),
+        (
+            "ndjson",
+            lambda: b"".join(row.model_dump_json().encode() + b"\n" for row in rows),
+            lambda: dump_ndjson(rows),
+        ),
+        ("columns", lambda: [row.model_dump() for row in rows], lambda: dump_columns(rows)),
+    ]:
+        per_row_elapsed = best_of(args.repeat, per_row)
+        bulk_elapsed = best_of(args.repeat, bulk)
+        print(
+            f"{label + ':':<10} {per_row_elapsed:.2f}s per row, {bulk_elapsed:.2f}s in bulk "
+            f"({per_row_elapsed / bulk_elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare revalidating edited rows in full and revalidating only the changed values."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from pydantic import ValidationError
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.metadata import CoercionCache, MetadataRow
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw_rows = archive_rows(args.rows)
+    rows = [MetadataRow.model_validate(dict(values)) for values in raw_rows]
+    edits = [
+        {"diagnosis": "Nevus"} if i % 2 else {"age": str(20 + i % 60)} for i in range(args.rows)
+    ]
+
+    errors = 0
+    start = time.perf_counter()
+    for values, changes in zip(raw_rows, edits, strict=True):
+        try:
+            MetadataRow.model_validate({**values, **changes})
+        except ValidationError:
+            errors += 1
+    full = time.perf_counter() - start
+
+    cache = CoercionCache()
+    start = time.perf_counter()
+    for values, changes in zip(raw_rows, edits, strict=True):
+        try:
+            MetadataRow.validate_with_cache({**values, **changes}, cache)
+        except ValidationError:
+            errors += 1
+    cached = time.perf_counter() - start
+
+    cache = CoercionCache()
+    start = time.perf_counter()
+    for row, changes in zip(rows, edits, strict=True):
+        try:
+            row.with_changes(changes, cache)
+        except ValidationError:
+            errors += 1
+    edited = time.perf_counter() - start
+
+    print(f"rows:         {args.rows:,} (each editing diagnosis or age)")
+    print(f"invalid:      {errors // 3:,}")
+    print(f"full:         {full:.2f}s (model_validate)")
+    print(f"full, cached: {cached:.2f}s (validate_with_cache)")
+    print(f"changes:      {edited:.2f}s ({full / edited:.1f}x, {cached / edited:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare running every cross-field rule on each row with dispatching on its image type."""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import time
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.fields import ImageTypeEnum
+from isic_metadata.metadata import (
+    _CROSS_FIELD_RULES,
+    _RCM_IMAGE_TYPES,
+    _TBP_TILE_IMAGE_TYPES,
+    CoercionCache,
+    MetadataRow,
+)
+
+# The image types for which each rule is a no-op, as dispatching on the image type would skip them.
+_NO_OP_IMAGE_TYPES = {
+    "validate_rcm_fields": _RCM_IMAGE_TYPES,
+    "validate_dermoscopic_fields": frozenset({ImageTypeEnum.dermoscopic}),
+    "validate_tbp_tile_fields": _TBP_TILE_IMAGE_TYPES,
+}
+
+_RULES_BY_IMAGE_TYPE = {
+    image_type: tuple(
+        rule
+        for rule in _CROSS_FIELD_RULES
+        if image_type not in _NO_OP_IMAGE_TYPES.get(rule.name, frozenset())
+    )
+    for image_type in [None, *ImageTypeEnum]
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw_rows = archive_rows(args.rows)
+    cache = CoercionCache()
+    start = time.perf_counter()
+    rows = [MetadataRow.validate_with_cache(values, cache) for values in raw_rows]
+    validation = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in rows:
+        for rule in _CROSS_FIELD_RULES:
+            getattr(row, rule.name)()
+    every_rule = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in rows:
+        for rule in _RULES_BY_IMAGE_TYPE[row.image_type]:
+            getattr(row, rule.name)()
+    dispatched = time.perf_counter() - start
+
+    image_types = Counter(row.image_type for row in rows)
+    print(f"rows:       {args.rows:,}")
+    print("mix:        " + ", ".join(f"{k}: {v:,}" for k, v in image_types.most_common()))
+    print(f"validation: {validation:.2f}s (validate_with_cache)")
+    print(f"every rule: {every_rule:.3f}s")
+    print(f"dispatched: {dispatched:.3f}s ({every_rule / dispatched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
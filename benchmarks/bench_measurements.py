@@ -0,0 +1,53 @@
+"""Compare parsing measurement columns value by value and with parse_measurements."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from isic_metadata.fields import ClinSizeLongDiamMm, MelThickMm
+from isic_metadata.metadata import _coerce_value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)  # noqa: S311
+    columns = {
+        "clin_size_long_diam_mm": (
+            ClinSizeLongDiamMm.parse_measurements,
+            [
+                f"{rng.randint(1, 9999) / 100}{rng.choice(['mm', ' mm', 'cm', 'um'])}"
+                for _ in range(args.rows)
+            ],
+        ),
+        "mel_thick_mm": (
+            MelThickMm.parse_measurements,
+            [
+                f"{rng.randint(1, 999) / 100}{rng.choice(['', 'mm', ' mm'])}"
+                for _ in range(args.rows)
+            ],
+        ),
+    }
+
+    print(f"rows: {args.rows:,}")
+    for field_name, (parse_measurements, values) in columns.items():
+        start = time.perf_counter()
+        for value in dict.fromkeys(values):
+            _coerce_value(field_name, value)
+        per_value = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parse_measurements(values)
+        batch = time.perf_counter() - start
+
+        print(f"{field_name}: {len(set(values)):,} distinct values")
+        print(f"  per value: {per_value:.2f}s")
+        print(f"  batch:     {batch:.2f}s ({per_value / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Compare revalidating a database dump with from_normalized and with model_validate."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.metadata import MetadataRow
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    # rows are stored in the database as they're dumped, with multi-valued hierarchies
+    dump = [MetadataRow.model_validate(row).model_dump() for row in archive_rows(args.rows)]
+
+    start = time.perf_counter()
+    for row in dump:
+        MetadataRow.model_validate(dict(row))
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in dump:
+        MetadataRow.from_normalized(row)
+    trusted = time.perf_counter() - start
+
+    print(f"rows:             {args.rows:,}")
+    print(f"model_validate:   {full:.2f}s")
+    print(f"from_normalized:  {trusted:.2f}s ({full / trusted:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Measure how validating rows with a ValidationStream scales across worker processes."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.ingest import ValidationStream
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rows = archive_rows(args.rows)
+
+    print(f"rows:      {args.rows:,}")
+    print(f"cpus:      {os.cpu_count()}")
+
+    baseline = None
+    for max_workers in args.workers:
+        stream = ValidationStream(rows, max_workers=max_workers, chunk_size=args.chunk_size)
+        start = time.perf_counter()
+        for _ in stream:
+            pass
+        elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        print(f"{max_workers} workers: {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
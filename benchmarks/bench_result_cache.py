@@ -0,0 +1,51 @@
+"""Compare validating a resubmitted upload with and without a ValidationResultCache."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.ingest import ValidationResultCache, ValidationStream
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--edited", type=float, default=0.01, help="fraction of rows edited")
+    args = parser.parse_args()
+
+    rows = archive_rows(args.rows)
+    resubmitted = [
+        {**row, "age": "85+"} if i % round(1 / args.edited) == 0 else row
+        for i, row in enumerate(rows)
+    ]
+
+    start = time.perf_counter()
+    list(ValidationStream(resubmitted))
+    uncached = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        with ValidationResultCache(Path(directory) / "results.sqlite") as result_cache:
+            start = time.perf_counter()
+            list(ValidationStream(rows, result_cache=result_cache))
+            first = time.perf_counter() - start
+
+        # reopened as a later upload would be
+        with ValidationResultCache(Path(directory) / "results.sqlite") as result_cache:
+            start = time.perf_counter()
+            list(ValidationStream(resubmitted, result_cache=result_cache))
+            cached = time.perf_counter() - start
+            cache_info = result_cache.cache_info()
+
+    print(f"rows:        {args.rows:,}")
+    print(f"uncached:    {uncached:.2f}s")
+    print(f"first:       {first:.2f}s (filling the cache)")
+    print(f"resubmitted: {cached:.2f}s ({uncached / cached:.1f}x)")
+    print(f"cache:       {cache_info}")
+
+
+if __name__ == "__main__":
+    main()
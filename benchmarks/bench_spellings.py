@@ -0,0 +1,78 @@
+"""Compare coercing a boolean-heavy TBP upload through the cache and the spelling tables."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from isic_metadata.metadata import CoercionCache, MetadataRow
+
+_BOOLEAN_FIELDS = [
+    "personal_hx_mm",
+    "family_hx_mm",
+    "melanocytic",
+    "concomitant_biopsy",
+    "marker_pen",
+    "hairy",
+    "blurry",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)  # noqa: S311
+    rows = [
+        {
+            **{
+                field_name: rng.choice(["True", "False", "true", "false", "0", "1", "yes", ""])
+                for field_name in _BOOLEAN_FIELDS
+            },
+            "age": rng.choice([str(rng.randint(20, 90)), "85+"]),
+            "acquisition_day": str(rng.randint(0, 900)),
+            "diagnosis_confirm_type": "histopathology",
+            "image_type": "TBP tile: close-up",
+            "tbp_tile_type": rng.choice(["3D: white", "3D: XP"]),
+            "patient_id": f"IP_{i // 500:07d}",
+            "lesion_id": f"IL_{i:07d}",
+        }
+        for i in range(args.rows)
+    ]
+
+    prepare = MetadataRow.handle_hierarchical_modes_and_unstructured_fields
+    prepared = [prepare(dict(row)) for row in rows]  # type: ignore[operator]
+
+    # every value goes through the cache, as values of every field did before the tables
+    coercion_cache = CoercionCache()
+    start = time.perf_counter()
+    for values in prepared:
+        for field_name, value in values.items():
+            if field_name != "unstructured":
+                coercion_cache.coerce(field_name, value)
+    cached = time.perf_counter() - start
+
+    coercion_cache = CoercionCache()
+    start = time.perf_counter()
+    for values in prepared:
+        coercion_cache.coerce_row(values)
+    looked_up = time.perf_counter() - start
+
+    coercion_cache = CoercionCache(track_spellings=True)
+    start = time.perf_counter()
+    for values in prepared:
+        coercion_cache.coerce_row(values)
+    tracked = time.perf_counter() - start
+
+    print(f"rows:      {args.rows:,}")
+    print(f"cached:    {cached:.2f}s")
+    print(f"looked up: {looked_up:.2f}s ({cached / looked_up:.1f}x)")
+    print(f"tracked:   {tracked:.2f}s ({cached / tracked:.1f}x, counting spellings)")
+    for field_name, usage in coercion_cache.spelling_usage().items():
+        print(f"  {field_name}: {', '.join(f'{s!r} {n:,}' for s, n in usage.most_common(4))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare cold lookups of terminal values with the previous linear scan of the hierarchy."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+
+
+def linear_scan(value: str) -> str:
+    # how accept_terminal_values resolved values before the index
+    if ":" not in value:
+        for member in DiagnosisEnum.reverse_ordered_hierarchy():
+            if value == member.split(":")[-1]:
+                return member
+
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=20_000)
+    args = parser.parse_args()
+
+    # values which were never seen before, half of them resolving to a member
+    terminal_values = [member.split(":")[-1] for member in DiagnosisEnum]
+    values = [
+        terminal_values[i % len(terminal_values)] if i % 2 else f"unknown diagnosis {i}"
+        for i in range(args.values)
+    ]
+
+    start = time.perf_counter()
+    for value in values:
+        linear_scan(value)
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    DiagnosisEnum._terminal_value_index.cache_clear()  # noqa: SLF001
+    for value in values:
+        DiagnosisEnum.accept_terminal_values(value)
+    indexed = time.perf_counter() - start
+
+    print(f"values:    {args.values:,}")
+    print(f"scan:      {scan * 1e6 / args.values:.2f}us per value")
+    print(f"indexed:   {indexed * 1e6 / args.values:.2f}us per value ({scan / indexed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
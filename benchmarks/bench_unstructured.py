@@ -0,0 +1,64 @@
+"""Compare the memory held by validated rows with unstructured dicts and with shared columns."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+
+from benchmarks.datasets import archive_rows
+from isic_metadata.ingest import validate_csv
+from isic_metadata.metadata import CoercionCache, MetadataRow
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--unstructured", type=int, default=30, help="unstructured columns")
+    args = parser.parse_args()
+
+    rows = archive_rows(args.rows)
+    extra_columns = [f"extra_{i}" for i in range(args.unstructured)]
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow([*rows[0], *extra_columns])
+    writer.writerows(
+        [*row.values(), *(f"{(i * j) % 11}" for j in range(len(extra_columns)))]
+        for i, row in enumerate(rows)
+    )
+
+    text.seek(0)
+    cache = CoercionCache()
+    tracemalloc.start()
+    start = time.perf_counter()
+    dicts = [MetadataRow.validate_with_cache(values, cache) for values in csv.DictReader(text)]
+    dicts_time = time.perf_counter() - start
+    dicts_held, dicts_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dicts
+
+    text.seek(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    shared = [result for _, result in validate_csv(text, shared_unstructured=True)]
+    shared_time = time.perf_counter() - start
+    shared_held, shared_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del shared
+
+    mib = 2**20
+    print(f"rows:    {args.rows:,} ({len(extra_columns)} unstructured columns)")
+    print(
+        f"dicts:   {dicts_held / mib:.0f} MiB held, {dicts_peak / mib:.0f} MiB peak, "
+        f"{dicts_time:.2f}s"
+    )
+    print(
+        f"columns: {shared_held / mib:.0f} MiB held, {shared_peak / mib:.0f} MiB peak, "
+        f"{shared_time:.2f}s ({dicts_held / shared_held:.1f}x less held)"
+    )
+
+
+if __name__ == "__main__":
+    main()
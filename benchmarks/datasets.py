@@ -0,0 +1,82 @@
+"""Synthetic, archive-like metadata for benchmarks."""
+
+from __future__ import annotations
+
+import random
+
+# Image types weighted roughly as they appear in the archive.
+_IMAGE_TYPES = {
+    "dermoscopic": 60,
+    "clinical: close-up": 12,
+    "clinical: overview": 8,
+    "TBP tile: close-up": 10,
+    "TBP tile: overview": 5,
+    "RCM: macroscopic": 1,
+    "RCM: tile": 2,
+    "RCM: mosaic": 2,
+}
+
+_DIAGNOSES = [
+    "Nevus",
+    "Melanoma Invasive",
+    "Melanoma in situ",
+    "Basal cell carcinoma",
+    "Seborrheic keratosis",
+    "Solar or actinic keratosis",
+    "Dermatofibroma",
+    "Benign",
+]
+
+_ANATOM_SITES = ["Scalp", "Anterior trunk", "Upper back", "Thigh", "Forearm", "Face", "Foot"]
+
+
+def archive_rows(num_rows: int, *, seed: int = 0) -> list[dict[str, str]]:
+    """Generate rows as they'd be read from a contributor CSV, every value being a string."""
+    rng = random.Random(seed)  # noqa: S311
+    image_types = rng.choices(list(_IMAGE_TYPES), weights=list(_IMAGE_TYPES.values()), k=num_rows)
+
+    rows = []
+    for i, image_type in enumerate(image_types):
+        diagnosis = rng.choice(_DIAGNOSES)
+        row = {
+            "filename": f"image_{i}.jpg",
+            "age": rng.choice([str(rng.randint(20, 90)), "85+"]),
+            "sex": rng.choice(["male", "female", "Male", ""]),
+            "anatom_site": rng.choice(_ANATOM_SITES),
+            "diagnosis": diagnosis,
+            "diagnosis_confirm_type": rng.choice(
+                ["histopathology", "single image expert consensus"]
+            ),
+            "clin_size_long_diam_mm": rng.choice(["", f"{rng.randint(1, 40) / 2} mm"]),
+            "fitzpatrick_skin_type": rng.choice(["I", "II", "III", "IV", ""]),
+            "melanocytic": rng.choice(["True", "False", "true", "false", ""]),
+            "personal_hx_mm": rng.choice(["True", "False", ""]),
+            "family_hx_mm": rng.choice(["True", "False", ""]),
+            "patient_id": f"IP_{i // 20:07d}",
+            "lesion_id": f"IL_{i // 4:07d}",
+            "image_type": image_type,
+            "dermoscopic_type": "",
+            "tbp_tile_type": "",
+            "rcm_case_id": "",
+            "mel_ulcer": "",
+            "mel_thick_mm": "",
+        }
+
+        if image_type == "dermoscopic":
+            row["dermoscopic_type"] = rng.choice(["contact polarized", "contact non-polarized"])
+        elif image_type.startswith("TBP"):
+            row["tbp_tile_type"] = rng.choice(["3D: white", "3D: XP"])
+        elif image_type.startswith("RCM"):
+            row["rcm_case_id"] = f"RC_{i // 4:07d}"
+
+        if diagnosis.startswith("Melanoma"):
+            row["mel_ulcer"] = rng.choice(["True", "False", ""])
+            row["mel_thick_mm"] = rng.choice(["", f"{rng.randint(1, 300) / 100}mm"])
+
+        rows.append(row)
+
+    return rows
+
+
+def as_columns(rows: list[dict[str, str]]) -> dict[str, list[str]]:
+    return {column: [row[column] for row in rows] for column in rows[0]}
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from isic_metadata.anatom_site_hierarchical import AnatomSiteEnum
 from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+from isic_metadata.export import dump_columns, dump_ndjson, dump_rows
 from isic_metadata.fields import (
     Age,
     AnatomSiteSpecialEnum,
@@ -15,10 +16,27 @@ from isic_metadata.fields import (
     LegacyDxEnum,
     MelMitoticIndexEnum,
     MelThickMm,
+    NormalizedStrEnum,
     TBPTileTypeEnum,
 )
-from isic_metadata.metadata import MetadataBatch, MetadataRow, convert_errors
+from isic_metadata.ingest import (
+    HeaderLayout,
+    ValidationResultCache,
+    ValidationStream,
+    validate_csv,
+)
+from isic_metadata.metadata import (
+    BatchCheckState,
+    CoercionCache,
+    ColumnarValidationResult,
+    MetadataBatch,
+    MetadataRow,
+    convert_errors,
+    schema_fingerprint,
+    validate_columns,
+)
 from isic_metadata.registry import FIELD_REGISTRY, Field, SearchConfig
+from isic_metadata.unstructured import UnstructuredColumns, UnstructuredRow
 from isic_metadata.utils import get_unstructured_columns
 
 __all__ = [
@@ -26,13 +44,17 @@ __all__ = [
     "Age",
     "AnatomSiteEnum",
     "AnatomSiteSpecialEnum",
+    "BatchCheckState",
     "ClinSizeLongDiamMm",
+    "CoercionCache",
     "ColorTintEnum",
+    "ColumnarValidationResult",
     "DermoscopicTypeEnum",
     "DiagnosisConfirmTypeEnum",
     "DiagnosisEnum",
     "Field",
     "FitzpatrickSkinType",
+    "HeaderLayout",
     "ImageManipulationEnum",
     "ImageTypeEnum",
     "LegacyDxEnum",
@@ -40,8 +62,19 @@ __all__ = [
     "MelThickMm",
     "MetadataBatch",
     "MetadataRow",
+    "NormalizedStrEnum",
     "SearchConfig",
     "TBPTileTypeEnum",
+    "UnstructuredColumns",
+    "UnstructuredRow",
+    "ValidationResultCache",
+    "ValidationStream",
     "convert_errors",
+    "dump_columns",
+    "dump_ndjson",
+    "dump_rows",
     "get_unstructured_columns",
+    "schema_fingerprint",
+    "validate_columns",
+    "validate_csv",
 ]
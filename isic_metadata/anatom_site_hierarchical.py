@@ -1,11 +1,28 @@
 from __future__ import annotations
 
-from enum import StrEnum
 from functools import cache
-from typing import Self
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Self
 
+from isic_metadata.cache import bounded_cache
+from isic_metadata.fields import NormalizedStrEnum
+from isic_metadata.hierarchy import (
+    CACHE_MAXSIZE,
+    HierarchyCodes,
+    HierarchyIndex,
+    expand_levels,
+    terminal_value_index,
+)
+from isic_metadata.hierarchy_codes import ANATOM_SITE_CODES
 
-class AnatomSiteEnum(StrEnum):
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import numpy as np
+    import pyarrow as pa
+
+
+class AnatomSiteEnum(NormalizedStrEnum):
     head_and_neck = "Head and neck"
     trunk = "Trunk"
     upper_extremity = "Upper extremity"
@@ -350,21 +367,34 @@ class AnatomSiteEnum(StrEnum):
     )
 
     @staticmethod
-    @cache
-    def levels(value: str) -> list[str | None]:
-        levels_list = value.split(":")
-        return levels_list + [None] * (5 - len(levels_list))
+    @bounded_cache(CACHE_MAXSIZE)
+    def levels(value: str) -> tuple[str | None, ...]:
+        levels_tuple = tuple(value.split(":"))
+        return levels_tuple + (None,) * (5 - len(levels_tuple))
 
     @staticmethod
-    @cache
-    def as_dict(value: str) -> dict[str, str | None]:
-        return {
-            "anatom_site_1": AnatomSiteEnum.levels(value)[0],
-            "anatom_site_2": AnatomSiteEnum.levels(value)[1],
-            "anatom_site_3": AnatomSiteEnum.levels(value)[2],
-            "anatom_site_4": AnatomSiteEnum.levels(value)[3],
-            "anatom_site_5": AnatomSiteEnum.levels(value)[4],
-        }
+    @bounded_cache(CACHE_MAXSIZE)
+    def as_dict(value: str) -> Mapping[str, str | None]:
+        return MappingProxyType(
+            {
+                "anatom_site_1": AnatomSiteEnum.levels(value)[0],
+                "anatom_site_2": AnatomSiteEnum.levels(value)[1],
+                "anatom_site_3": AnatomSiteEnum.levels(value)[2],
+                "anatom_site_4": AnatomSiteEnum.levels(value)[3],
+                "anatom_site_5": AnatomSiteEnum.levels(value)[4],
+            }
+        )
+
+    @classmethod
+    def expand_levels(
+        cls, values: np.ndarray[Any, Any] | pa.Array | pa.ChunkedArray
+    ) -> dict[str, Any]:
+        """
+        Return the anatom_site_1..anatom_site_5 columns for a NumPy or pyarrow array of values.
+
+        Values can be full paths or terminal values (e.g. "Scalp"), see accept_terminal_values.
+        """
+        return expand_levels(values, cls.codes(), cls.accept_terminal_values, "anatom_site")
 
     @classmethod
     @cache
@@ -373,6 +403,33 @@ class AnatomSiteEnum(StrEnum):
 
     @classmethod
     @cache
+    def hierarchy(cls) -> HierarchyIndex[Self]:
+        return HierarchyIndex.build(cls)
+
+    @classmethod
+    @cache
+    def codes(cls) -> HierarchyCodes[Self]:
+        return HierarchyCodes.build(cls, ANATOM_SITE_CODES)
+
+    @classmethod
+    @cache
+    def _terminal_value_index(cls) -> dict[str, Self]:
+        # deepest members first, so they win should a terminal value ever be ambiguous
+        return terminal_value_index(cls.reverse_ordered_hierarchy())
+
+    @classmethod
+    @cache
+    def normalized_lookup(cls, *, ignore_case: bool = False) -> Mapping[str, Self]:
+        """Map the raw values a field accepts to their members, including terminal values."""
+        lookup = super().normalized_lookup(ignore_case=ignore_case)
+        if ignore_case:
+            # terminal values aren't lowercased, so none would be accepted
+            return lookup
+
+        # terminal values take precedence as they do in accept_terminal_values
+        return MappingProxyType({**lookup, **cls._terminal_value_index()})
+
+    @classmethod
     def accept_terminal_values(cls, value: str) -> str:
         """
         Allow the user to specify any terminal value of the hierarchy to obtain the relevant value.
@@ -381,8 +438,6 @@ class AnatomSiteEnum(StrEnum):
         or "Head" for "Head and neck:Head".
         """
         if ":" not in value:
-            for member in cls.reverse_ordered_hierarchy():
-                if value == member.split(":")[-1]:
-                    return member
+            return cls._terminal_value_index().get(value, value)
 
         return value
@@ -0,0 +1,330 @@
+"""
+Validation of metadata held in Arrow tables, which requires the arrow extra.
+
+This module isn't imported by isic_metadata itself, so pyarrow remains optional.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Literal, get_args, get_origin
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from pydantic.fields import FieldInfo
+
+from isic_metadata.metadata import (
+    _CROSS_FIELD_RULES,
+    _HIERARCHICAL_FIELDS,
+    _STRUCTURED_FIELDS,
+    MetadataRow,
+    _coerce_column,
+    _combine_hierarchical_columns,
+    _cross_field_rule_evaluator,
+    _field_type,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pydantic_core import ErrorDetails
+
+    from isic_metadata.metadata import CoercionCache
+
+
+def _arrow_type(field_name: str) -> pa.DataType:
+    field_type = _field_type(field_name)
+    if (isinstance(field_type, type) and issubclass(field_type, Enum)) or (
+        get_origin(field_type) is Literal
+    ):
+        return pa.dictionary(pa.int32(), pa.string())
+    if field_type is bool:
+        return pa.bool_()
+    if field_type is int:
+        return pa.int64()
+    if field_type is Decimal:
+        # the precision comes from the Field(max_digits=..., decimal_places=...) of the annotation
+        annotated = next(
+            arg
+            for arg in get_args(MetadataRow.model_fields[field_name].annotation)
+            if arg is not type(None)
+        )
+        constraints = {
+            name: getattr(metadata, name)
+            for arg in get_args(annotated)
+            if isinstance(arg, FieldInfo)
+            for metadata in arg.metadata
+            for name in ("max_digits", "decimal_places")
+            if hasattr(metadata, name)
+        }
+        return pa.decimal128(constraints["max_digits"], constraints["decimal_places"])
+    return pa.string()
+
+
+def _dictionary_values(field_name: str) -> list[str]:
+    """Return every value of an enum or Literal field, the dictionary of its Arrow column."""
+    field_type = _field_type(field_name)
+    if get_origin(field_type) is Literal:
+        return list(get_args(field_type))
+    return [member.value for member in field_type]
+
+
+# The schema of a validated table, one column per structured field of MetadataRow
+ARROW_SCHEMA = pa.schema(
+    [pa.field(field_name, _arrow_type(field_name)) for field_name in _STRUCTURED_FIELDS]
+)
+
+# The schema of the errors of a validated table. field is null for errors of cross-field rules.
+ARROW_ERRORS_SCHEMA = pa.schema(
+    [
+        pa.field("row", pa.int64(), nullable=False),
+        pa.field("field", pa.string()),
+        pa.field("type", pa.string(), nullable=False),
+        pa.field("message", pa.string(), nullable=False),
+    ]
+)
+
+
+@dataclass(frozen=True)
+class ArrowValidationResult:
+    # the validated values of every structured field, see ARROW_SCHEMA. values which failed
+    # validation are null, but the other values of their rows are kept.
+    table: pa.Table
+    # whether each row is valid, table.filter(valid) giving just the valid rows
+    valid: pa.BooleanArray
+    # one row per error, ordered by row, see ARROW_ERRORS_SCHEMA
+    errors: pa.Table
+    # every column which isn't a structured field, as given
+    unstructured: pa.Table
+
+
+@dataclass(frozen=True)
+class _EncodedColumn:
+    # the position of each row's value among the distinct values of the column, null for nulls
+    indices: pa.Array
+    # the distinct values of the column
+    raw: list[Any]
+    # the validated value of each distinct value, None for those which failed validation
+    values: list[Any]
+    # the errors of each distinct value which failed validation, keyed by position
+    errors: dict[int, list[ErrorDetails]]
+
+    def truthy(self) -> pa.BooleanArray:
+        """Return whether the validated value of each row is truthy."""
+        truthy = pa.array(map(bool, self.values), pa.bool_())
+        return pc.fill_null(truthy.take(self.indices), fill_value=False)
+
+
+def _encode_column(
+    column: pa.ChunkedArray, field_name: str, coercion_cache: CoercionCache | None
+) -> _EncodedColumn:
+    if pa.types.is_null(column.type):
+        return _EncodedColumn(pa.nulls(len(column), pa.int32()), [], [], {})
+
+    if pa.types.is_dictionary(column.type):
+        encoded = column.unify_dictionaries().combine_chunks()
+    else:
+        encoded = column.dictionary_encode().combine_chunks()
+
+    raw = encoded.dictionary.to_pylist()
+    values, errors = _coerce_column(field_name, raw, coercion_cache)
+    return _EncodedColumn(encoded.indices, raw, values, errors)
+
+
+def _validated_column(
+    column: pa.ChunkedArray, field_name: str, encoded: _EncodedColumn
+) -> pa.Array | pa.ChunkedArray:
+    arrow_type = ARROW_SCHEMA.field(field_name).type
+    unchanged = column.type == arrow_type and not encoded.errors
+
+    if not pa.types.is_dictionary(arrow_type):
+        # values which validation leaves as they are needn't be copied
+        if unchanged and encoded.values == encoded.raw:
+            return column
+
+        return pa.array(encoded.values, arrow_type).take(encoded.indices)
+
+    dictionary_values = _dictionary_values(field_name)
+    dictionary = pa.array(dictionary_values, pa.string())
+    if unchanged and all(chunk.dictionary.equals(dictionary) for chunk in column.chunks):
+        return column
+
+    positions = {value: position for position, value in enumerate(dictionary_values)}
+    codes = pa.array(
+        [None if value is None else positions[value] for value in encoded.values], pa.int32()
+    )
+    return pa.DictionaryArray.from_arrays(codes.take(encoded.indices), dictionary)
+
+
+def rows_to_arrow(rows: Iterable[MetadataRow]) -> pa.Table:
+    """Convert validated rows to a table matching ARROW_SCHEMA, the reverse of validate_arrow."""
+    values = list(map(vars, rows))
+    return pa.Table.from_arrays(
+        [pa.array(list(map(itemgetter(field.name), values)), field.type) for field in ARROW_SCHEMA],
+        schema=ARROW_SCHEMA,
+    )
+
+
+def _prepare_table(table: pa.Table) -> pa.Table:
+    """Combine hierarchical values given as levels, e.g. diagnosis_1..diagnosis_5."""
+    level_names = [
+        f"{field_name}_{level}" for field_name in _HIERARCHICAL_FIELDS for level in range(1, 6)
+    ]
+    if not any(name in table.column_names for name in level_names):
+        return table
+
+    # this is only needed when revalidating normalized values, so rows are combined in Python
+    names = [name for name in (*_HIERARCHICAL_FIELDS, *level_names) if name in table.column_names]
+    raw = {name: table[name].to_pylist() for name in names}
+    _combine_hierarchical_columns(raw, table.num_rows)
+
+    table = table.drop_columns(names)
+    for field_name in _HIERARCHICAL_FIELDS:
+        if field_name in raw:
+            table = table.append_column(field_name, pa.array(raw[field_name], pa.string()))
+    return table
+
+
+type _Error = tuple[int, str | None, str, str]
+
+
+def _field_errors(encoded: dict[str, _EncodedColumn], failed: set[int]) -> list[_Error]:
+    """Return the (row, field, type, message) of every value which failed validation."""
+    errors: list[_Error] = []
+    for field_name, column in encoded.items():
+        if not column.errors:
+            continue
+
+        invalid = pa.array(list(column.errors), column.indices.type)
+        rows = pc.indices_nonzero(pc.fill_null(pc.is_in(column.indices, invalid), fill_value=False))
+        for row, position in zip(
+            rows.to_pylist(), column.indices.take(rows).to_pylist(), strict=True
+        ):
+            failed.add(row)
+            errors.extend(
+                (row, field_name, error["type"], error["msg"]) for error in column.errors[position]
+            )
+
+    return errors
+
+
+def _cross_field_errors(
+    encoded: dict[str, _EncodedColumn], failed: set[int], *, ignore_rcm_model_checks: bool
+) -> list[_Error]:
+    """Return the (row, None, type, message) of every row failing a cross-field rule."""
+    # model validators only run for rows where every field is valid, and the first rule to fail
+    # is the only one reported.
+    errors: list[_Error] = []
+    for rule in _CROSS_FIELD_RULES:
+        triggered = encoded[rule.triggers[0]].truthy()
+        for trigger in rule.triggers[1:]:
+            triggered = pc.or_(triggered, encoded[trigger].truthy())
+
+        rows = pc.indices_nonzero(triggered)
+        if not len(rows):
+            continue
+
+        # the rows reading each distinct combination of values, null values being -1
+        rule_columns = [encoded[field_name] for field_name in rule.fields]
+        grouped = (
+            pa.table(
+                {
+                    **{
+                        field_name: pc.fill_null(column.indices.take(rows), -1)
+                        for field_name, column in zip(rule.fields, rule_columns, strict=True)
+                    },
+                    "row": rows,
+                }
+            )
+            .group_by(list(rule.fields))
+            .aggregate([("row", "list")])
+        )
+
+        evaluate = _cross_field_rule_evaluator(
+            rule, ignore_rcm_model_checks=ignore_rcm_model_checks
+        )
+        combinations = zip(
+            *(grouped[field_name].to_pylist() for field_name in rule.fields), strict=True
+        )
+        for group, positions in enumerate(combinations):
+            rule_error = evaluate(
+                tuple(
+                    None if position == -1 else column.values[position]
+                    for column, position in zip(rule_columns, positions, strict=True)
+                )
+            )
+            if rule_error is None:
+                continue
+
+            for row in grouped["row_list"][group].values.to_pylist():
+                if row not in failed:
+                    failed.add(row)
+                    errors.append((row, None, rule_error.type, rule_error.message()))
+
+    return errors
+
+
+def validate_arrow(
+    data: pa.Table | pa.RecordBatch,
+    *,
+    ignore_rcm_model_checks: bool = False,
+    coercion_cache: CoercionCache | None = None,
+) -> ArrowValidationResult:
+    """
+    Validate a table of metadata, producing the same values and errors as MetadataRow.
+
+    Like validate_columns, each distinct value of a column is validated once, and each cross-field
+    rule is evaluated once per distinct combination of the values it reads. Otherwise rows are
+    handled by Arrow compute functions, only those which fail validation being visited in Python.
+    Columns which validation leaves unchanged (e.g. an int64 acquisition_day, or ids without
+    surrounding whitespace) are returned without being copied.
+    """
+    table = data if isinstance(data, pa.Table) else pa.Table.from_batches([data])
+    table = _prepare_table(table)
+    num_rows = table.num_rows
+
+    encoded: dict[str, _EncodedColumn] = {}
+    columns: list[pa.Array | pa.ChunkedArray] = []
+    for field_name in _STRUCTURED_FIELDS:
+        if field_name not in table.column_names:
+            encoded[field_name] = _EncodedColumn(pa.nulls(num_rows, pa.int32()), [], [], {})
+            columns.append(pa.nulls(num_rows, ARROW_SCHEMA.field(field_name).type))
+            continue
+
+        column = table[field_name]
+        encoded[field_name] = _encode_column(column, field_name, coercion_cache)
+        columns.append(_validated_column(column, field_name, encoded[field_name]))
+
+    failed: set[int] = set()
+    errors = _field_errors(encoded, failed)
+    errors.extend(
+        _cross_field_errors(encoded, failed, ignore_rcm_model_checks=ignore_rcm_model_checks)
+    )
+    # field errors are listed in the order fields are defined, and sorting is stable
+    errors.sort(key=lambda error: error[0])
+
+    valid = [True] * num_rows
+    for row in failed:
+        valid[row] = False
+
+    return ArrowValidationResult(
+        table=pa.Table.from_arrays(columns, schema=ARROW_SCHEMA),
+        valid=pa.array(valid, pa.bool_()),
+        errors=pa.Table.from_arrays(
+            [
+                pa.array(values, field.type)
+                for values, field in zip(
+                    list(zip(*errors, strict=True)) or [()] * len(ARROW_ERRORS_SCHEMA),
+                    ARROW_ERRORS_SCHEMA,
+                    strict=True,
+                )
+            ],
+            schema=ARROW_ERRORS_SCHEMA,
+        ),
+        unstructured=table.drop_columns(
+            [name for name in table.column_names if name in _STRUCTURED_FIELDS]
+        ),
+    )
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import functools
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+class CachedFunction[K, V](Protocol):
+    """
+    A function of one argument whose results are kept in an LRUCache, see bounded_cache.
+
+    This mirrors the functools.cache API (cache_info, cache_clear), along with a way to resize the
+    cache and to warm it ahead of time.
+    """
+
+    def __call__(self, key: K, /) -> V: ...
+
+    def cache_info(self) -> CacheInfo: ...
+
+    def cache_clear(self) -> None: ...
+
+    def cache_resize(self, maxsize: int | None) -> None: ...
+
+    def cache_warm(self, keys: Iterable[K]) -> None: ...
+
+
+class LRUCache[K, V]:
+    """
+    A cache of bounded size which evicts the least recently used entries.
+
+    A maxsize of None leaves the cache unbounded.
+    """
+
+    def __init__(self, maxsize: int | None = 4096) -> None:
+        self._check_maxsize(maxsize)
+
+        self.maxsize = maxsize
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _check_maxsize(maxsize: int | None) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or non-negative.")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def get_or_compute(self, key: K, compute: Callable[[K], V]) -> V:
+        """Return the cached value for key, computing and caching it on a miss."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable keys can't be cached
+            return compute(key)
+        else:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+        self._misses += 1
+        value = compute(key)
+        self._entries[key] = value
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def resize(self, maxsize: int | None) -> None:
+        """Change maxsize, evicting the least recently used entries which no longer fit."""
+        self._check_maxsize(maxsize)
+
+        self.maxsize = maxsize
+        while maxsize is not None and len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+
+    def cached(self, function: Callable[[K], V]) -> CachedFunction[K, V]:
+        """Wrap a function of one argument so its results are kept in this cache."""
+        entries = self._entries
+
+        # a plain function with the hit path of get_or_compute inlined, as these are called very
+        # often and calling an object with __call__ is several times slower.
+        @functools.wraps(function)
+        def wrapper(key: K) -> V:
+            try:
+                value = entries[key]
+            except (KeyError, TypeError):
+                return self.get_or_compute(key, function)
+
+            self._hits += 1
+            entries.move_to_end(key)
+            return value
+
+        def cache_warm(keys: Iterable[K]) -> None:
+            for key in keys:
+                wrapper(key)
+
+        cached_function = cast("Any", wrapper)
+        cached_function.cache_info = self.cache_info
+        cached_function.cache_clear = self.clear
+        cached_function.cache_resize = self.resize
+        cached_function.cache_warm = cache_warm
+        return cast("CachedFunction[K, V]", cached_function)
+
+
+def bounded_cache[K, V](
+    maxsize: int | None = 4096,
+) -> Callable[[Callable[[K], V]], CachedFunction[K, V]]:
+    """Cache the results of a function of one argument, keeping at most maxsize of them."""
+
+    def decorator(function: Callable[[K], V]) -> CachedFunction[K, V]:
+        return LRUCache[K, V](maxsize).cached(function)
+
+    return decorator
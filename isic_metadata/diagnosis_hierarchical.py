@@ -1,11 +1,28 @@
 from __future__ import annotations
 
-from enum import StrEnum
 from functools import cache
-from typing import Self
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Self
 
+from isic_metadata.cache import bounded_cache
+from isic_metadata.fields import NormalizedStrEnum
+from isic_metadata.hierarchy import (
+    CACHE_MAXSIZE,
+    HierarchyCodes,
+    HierarchyIndex,
+    expand_levels,
+    terminal_value_index,
+)
+from isic_metadata.hierarchy_codes import DIAGNOSIS_CODES
 
-class DiagnosisEnum(StrEnum):
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import numpy as np
+    import pyarrow as pa
+
+
+class DiagnosisEnum(NormalizedStrEnum):
     # ruff: disable[E501]
     benign = "Benign"
     indeterminate = "Indeterminate"
@@ -874,21 +891,34 @@ class DiagnosisEnum(StrEnum):
     # ruff: enable[E501]
 
     @staticmethod
-    @cache
-    def levels(value: str) -> list[str | None]:
-        levels_list = value.split(":")
-        return levels_list + [None] * (5 - len(levels_list))
+    @bounded_cache(CACHE_MAXSIZE)
+    def levels(value: str) -> tuple[str | None, ...]:
+        levels_tuple = tuple(value.split(":"))
+        return levels_tuple + (None,) * (5 - len(levels_tuple))
 
     @staticmethod
-    @cache
-    def as_dict(value: str) -> dict[str, str | None]:
-        return {
-            "diagnosis_1": DiagnosisEnum.levels(value)[0],
-            "diagnosis_2": DiagnosisEnum.levels(value)[1],
-            "diagnosis_3": DiagnosisEnum.levels(value)[2],
-            "diagnosis_4": DiagnosisEnum.levels(value)[3],
-            "diagnosis_5": DiagnosisEnum.levels(value)[4],
-        }
+    @bounded_cache(CACHE_MAXSIZE)
+    def as_dict(value: str) -> Mapping[str, str | None]:
+        return MappingProxyType(
+            {
+                "diagnosis_1": DiagnosisEnum.levels(value)[0],
+                "diagnosis_2": DiagnosisEnum.levels(value)[1],
+                "diagnosis_3": DiagnosisEnum.levels(value)[2],
+                "diagnosis_4": DiagnosisEnum.levels(value)[3],
+                "diagnosis_5": DiagnosisEnum.levels(value)[4],
+            }
+        )
+
+    @classmethod
+    def expand_levels(
+        cls, values: np.ndarray[Any, Any] | pa.Array | pa.ChunkedArray
+    ) -> dict[str, Any]:
+        """
+        Return the diagnosis_1..diagnosis_5 columns for a NumPy or pyarrow array of values.
+
+        Values can be full paths or terminal values (e.g. "Nevus"), see accept_terminal_values.
+        """
+        return expand_levels(values, cls.codes(), cls.accept_terminal_values, "diagnosis")
 
     @classmethod
     @cache
@@ -897,6 +927,33 @@ class DiagnosisEnum(StrEnum):
 
     @classmethod
     @cache
+    def hierarchy(cls) -> HierarchyIndex[Self]:
+        return HierarchyIndex.build(cls)
+
+    @classmethod
+    @cache
+    def codes(cls) -> HierarchyCodes[Self]:
+        return HierarchyCodes.build(cls, DIAGNOSIS_CODES)
+
+    @classmethod
+    @cache
+    def _terminal_value_index(cls) -> dict[str, Self]:
+        # deepest members first, so they win should a terminal value ever be ambiguous
+        return terminal_value_index(cls.reverse_ordered_hierarchy())
+
+    @classmethod
+    @cache
+    def normalized_lookup(cls, *, ignore_case: bool = False) -> Mapping[str, Self]:
+        """Map the raw values a field accepts to their members, including terminal values."""
+        lookup = super().normalized_lookup(ignore_case=ignore_case)
+        if ignore_case:
+            # terminal values aren't lowercased, so none would be accepted
+            return lookup
+
+        # terminal values take precedence as they do in accept_terminal_values
+        return MappingProxyType({**lookup, **cls._terminal_value_index()})
+
+    @classmethod
     def accept_terminal_values(cls, value: str) -> str:
         """
         Allow the user to specify any terminal value of the hierarchy to obtain the relevant value.
@@ -904,22 +961,23 @@ class DiagnosisEnum(StrEnum):
         e.g. "baz" can be used to obtain "foo:bar:baz", or "bar" for "foo:bar".
         """
         if ":" not in value:
-            for member in cls.reverse_ordered_hierarchy():
-                if value == member.split(":")[-1]:
-                    return member
+            return cls._terminal_value_index().get(value, value)
 
         return value
 
     @classmethod
     @cache
     def _melanoma_diagnoses(cls) -> list[Self]:
+        melanoma = cls.malignant_malignant_melanocytic_proliferations_melanoma
         return [
-            diagnosis
-            for diagnosis in cls
-            if diagnosis.startswith(cls.malignant_malignant_melanocytic_proliferations_melanoma)
-        ] + [cls.malignant_collision_at_least_one_malignant_proliferation]
+            melanoma,
+            *cls.hierarchy().descendants(melanoma),
+            cls.malignant_collision_at_least_one_malignant_proliferation,
+        ]
 
     @classmethod
-    @cache
     def is_melanoma(cls, value: str) -> bool:
-        return value in cls._melanoma_diagnoses()
+        return value in _MELANOMA_DIAGNOSES
+
+
+_MELANOMA_DIAGNOSES = frozenset(DiagnosisEnum._melanoma_diagnoses())  # noqa: SLF001
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from pydantic import TypeAdapter
+
+from isic_metadata.metadata import _HIERARCHICAL_FIELDS, MetadataBatch, MetadataRow
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# The fields model_dump leaves out, and the computed level fields it adds in their place
+_EXCLUDED_FIELDS = tuple(name for name, field in MetadataRow.model_fields.items() if field.exclude)
+_LEVEL_FIELDS = tuple(
+    f"{field_name}_{level}" for field_name in _HIERARCHICAL_FIELDS for level in range(1, 6)
+)
+
+# The keys of a dumped row, in the order model_dump gives them
+RECORD_KEYS = (
+    *(name for name in MetadataRow.model_fields if name not in _EXCLUDED_FIELDS),
+    *_LEVEL_FIELDS,
+)
+
+
+@cache
+def _record_adapter() -> TypeAdapter[Any]:
+    # serializes dumped rows exactly as model_dump_json serializes the rows themselves
+    annotations = {
+        name: field.annotation
+        for name, field in MetadataRow.model_fields.items()
+        if name not in _EXCLUDED_FIELDS
+    }
+    annotations.update(
+        (name, field.return_type) for name, field in MetadataRow.model_computed_fields.items()
+    )
+    return TypeAdapter(TypedDict("MetadataRecord", annotations))  # type: ignore[operator]
+
+
+def dump_rows(rows: Iterable[MetadataRow] | MetadataBatch) -> list[dict[str, Any]]:
+    """
+    Dump every row to a dict, giving the same result as calling model_dump on each row.
+
+    Rather than serializing row by row, the values of each row are copied as they are and the
+    levels of the hierarchical fields are shared by every row with the same diagnosis and
+    anatom_site.
+    """
+    if isinstance(rows, MetadataBatch):
+        rows = rows.items
+
+    records: list[dict[str, Any]] = []
+    level_records: dict[tuple[Any, Any], dict[str, str | None]] = {}
+
+    for row in rows:
+        levels = row._hierarchy_levels()  # noqa: SLF001
+        try:
+            level_record = level_records[levels[0], levels[1]]
+        except KeyError:
+            level_record = level_records[levels[0], levels[1]] = dict(
+                zip(_LEVEL_FIELDS, (*levels[2], *levels[3]), strict=True)
+            )
+
+        # a row's __dict__ holds every field, in the order they're defined
+        record = row.__dict__.copy()
+        for field_name in _EXCLUDED_FIELDS:
+            del record[field_name]
+        record.update(level_record)
+        records.append(record)
+
+    return records
+
+
+def dump_ndjson(rows: Iterable[MetadataRow] | MetadataBatch) -> bytes:
+    """Dump every row as newline delimited JSON, each line being the row's model_dump_json."""
+    dump_json = _record_adapter().dump_json
+    return b"".join(dump_json(record) + b"\n" for record in dump_rows(rows))
+
+
+def dump_columns(rows: Iterable[MetadataRow] | MetadataBatch) -> dict[str, list[Any]]:
+    """Dump the rows as a list of values per key of model_dump, e.g. for building a DataFrame."""
+    records = dump_rows(rows)
+    if not records:
+        return {key: [] for key in RECORD_KEYS}
+
+    # every record has the same keys in the same order, so transposing their values gives columns
+    columns = zip(*map(dict.values, records), strict=True)
+    return dict(zip(RECORD_KEYS, map(list, columns), strict=True))
@@ -1,31 +1,148 @@
 from __future__ import annotations
 
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 from enum import StrEnum
+from functools import cache
 import re
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+
+# The limits MetadataRow places on measurements, Field(max_digits=5, decimal_places=2)
+_MAX_WHOLE_DIGITS = 3
+_MAX_DECIMAL_PLACES = 2
+
+_TENTH = Decimal("0.1")
+
+
+def _within_limits(value: Decimal) -> bool:
+    if not value.is_finite():
+        return False
+
+    # trailing zeros don't count towards the limits, as with pydantic
+    normalized = value.normalize()
+    return (
+        normalized.adjusted() < _MAX_WHOLE_DIGITS
+        and -normalized.as_tuple().exponent <= _MAX_DECIMAL_PLACES  # type: ignore[operator]
+    )
+
+
+def _float_digits(value: Decimal) -> Decimal:
+    """Give a value the digits it has when parsed as a float, e.g. 3.0 for 3 and 1.5 for 1.50."""
+    normalized = value.normalize()
+    if normalized.as_tuple().exponent < 0:  # type: ignore[operator]
+        return normalized
+
+    try:
+        return normalized.quantize(_TENTH)
+    except InvalidOperation:
+        # too many digits to be a valid measurement anyway
+        return normalized
+
+
+def _parse_measurements(
+    values: Iterable[str | None], parse: Callable[[str], str | Decimal]
+) -> tuple[list[Decimal | None], list[bool]]:
+    """Parse a column of raw measurements, parsing each distinct value only once."""
+    values = list(values)
+    parsed: dict[str | None, Decimal | None] = {}
+    invalid: set[str | None] = set()
+
+    for value in dict.fromkeys(values):
+        # stripped, lowercased and dropped when empty, as MetadataRow does
+        normalized = value.strip().lower() if value is not None else ""
+        if not normalized:
+            parsed[value] = None
+            continue
+
+        result = parse(normalized)
+        try:
+            # values which aren't measurements are parsed as plain numbers
+            number = result if isinstance(result, Decimal) else Decimal(result)
+        except InvalidOperation:
+            number = None
+
+        if number is not None and _within_limits(number):
+            parsed[value] = number
+        else:
+            parsed[value] = None
+            invalid.add(value)
+
+    return list(map(parsed.__getitem__, values)), [value in invalid for value in values]
 
 
 class ClinSizeLongDiamMm:
+    _regex = re.compile(r"(.+)(um|mm|cm)$")
+
+    # the power of ten converting each unit to mm
+    _unit_exponents = {"um": -3, "mm": 0, "cm": 1}
+
     @classmethod
-    def parse_measurement_str[T](cls, value: T) -> T | float:
+    def parse_measurement_str[T](cls, value: T) -> T | Decimal:
         if isinstance(value, str):
-            match = re.match(r"(.+)(um|mm|cm)$", value)
+            match = cls._regex.match(value)
 
             if not match:
                 return value
 
-            float_value, units = match.groups()
-            float_value = float(float_value)
-
-            # Convert to mm
-            if units == "um":
-                float_value *= 1e-3
-            elif units == "cm":
-                float_value *= 1e1
+            number, units = match.groups()
+            try:
+                # converted exactly, rather than through a float
+                mm = Decimal(number).scaleb(cls._unit_exponents[units])
+            except InvalidOperation:
+                return value
 
-            return round(float_value, ndigits=1)
+            try:
+                return mm.quantize(_TENTH, rounding=ROUND_HALF_UP)
+            except InvalidOperation:
+                # too large or not finite, which the field's constraints reject
+                return mm
 
         return value
 
+    @classmethod
+    def parse_measurements(
+        cls, values: Iterable[str | None]
+    ) -> tuple[list[Decimal | None], list[bool]]:
+        """
+        Parse a column of raw values into mm, along with which of them are invalid.
+
+        Values are the same as validating each with MetadataRow would give, invalid values and
+        missing ones being None.
+        """
+        return _parse_measurements(values, cls.parse_measurement_str)
+
+
+class NormalizedStrEnum(StrEnum):
+    """A StrEnum whose members can be looked up from the raw values contributors give."""
+
+    @classmethod
+    @cache
+    def normalized_lookup(cls, *, ignore_case: bool = False) -> Mapping[str, Self]:
+        """
+        Map the raw values a field accepts to the members they're validated as.
+
+        These are the values of the members and, for fields which lowercase their values, the
+        common capitalizations of them. Looking up a raw value saves stripping, lowercasing and
+        validating it. Other variants are validated as usual.
+        """
+        if not ignore_case:
+            return MappingProxyType({member.value: member for member in cls})
+
+        lookup: dict[str, Self] = {}
+        for member in cls:
+            value = member.value
+            for variant in (value, value.upper(), value.capitalize(), value.title()):
+                # values are lowercased before they're validated, so only lowercase values are
+                # accepted
+                if variant.lower() == value:
+                    lookup.setdefault(variant, member)
+
+        return MappingProxyType(lookup)
+
 
 class Age:
     @classmethod
@@ -40,7 +157,7 @@ class Age:
         return min(value, 85)
 
 
-class DiagnosisConfirmTypeEnum(StrEnum):
+class DiagnosisConfirmTypeEnum(NormalizedStrEnum):
     histopathology = "histopathology"
     serial_imaging_showing_no_change = "serial imaging showing no change"
     single_image_expert_consensus = "single image expert consensus"
@@ -48,7 +165,7 @@ class DiagnosisConfirmTypeEnum(StrEnum):
     single_contributor_clinical_assessment = "single contributor clinical assessment"
 
 
-class LegacyDxEnum(StrEnum):
+class LegacyDxEnum(NormalizedStrEnum):
     actinic_keratosis = "actinic keratosis"
     adnexal_tumor = "adnexal tumor"
     aimp = "AIMP"
@@ -87,7 +204,7 @@ class LegacyDxEnum(StrEnum):
     other = "other"
 
 
-class ImageTypeEnum(StrEnum):
+class ImageTypeEnum(NormalizedStrEnum):
     dermoscopic = "dermoscopic"
     clinical_overview = "clinical: overview"
     clinical_close_up = "clinical: close-up"
@@ -99,13 +216,13 @@ class ImageTypeEnum(StrEnum):
     rcm_mosaic = "RCM: mosaic"
 
 
-class DermoscopicTypeEnum(StrEnum):
+class DermoscopicTypeEnum(NormalizedStrEnum):
     contact_polarized = "contact polarized"
     contact_non_polarized = "contact non-polarized"
     non_contact_polarized = "non-contact polarized"
 
 
-class TBPTileTypeEnum(StrEnum):
+class TBPTileTypeEnum(NormalizedStrEnum):
     tbp_3d_white = "3D: white"
     tbp_3d_xp = "3D: XP"
     tbp_2d = "2D"
@@ -115,19 +232,29 @@ class MelThickMm:
     _regex = re.compile(r"^([\d.]+)(\s+)?(mm)?$")
 
     @classmethod
-    def parse_measurement_str[T](cls, value: T) -> T | float:
+    def parse_measurement_str[T](cls, value: T) -> T | Decimal:
         if isinstance(value, str):
-            result = re.match(MelThickMm._regex, value)
+            result = cls._regex.match(value)
 
             if not result:
                 return value
 
-            return float(result.group(1))
+            try:
+                return _float_digits(Decimal(result.group(1)))
+            except InvalidOperation:
+                return value
 
         return value
 
+    @classmethod
+    def parse_measurements(
+        cls, values: Iterable[str | None]
+    ) -> tuple[list[Decimal | None], list[bool]]:
+        """See ClinSizeLongDiamMm.parse_measurements."""
+        return _parse_measurements(values, cls.parse_measurement_str)
+
 
-class MelMitoticIndexEnum(StrEnum):
+class MelMitoticIndexEnum(NormalizedStrEnum):
     zero = "0/mm^2"
     lt_one = "<1/mm^2"
     one = "1/mm^2"
@@ -137,7 +264,7 @@ class MelMitoticIndexEnum(StrEnum):
     gt_4 = ">4/mm^2"
 
 
-class AnatomSiteSpecialEnum(StrEnum):
+class AnatomSiteSpecialEnum(NormalizedStrEnum):
     acral_nos = "acral NOS"
     nail_nos = "nail NOS"
     fingernail = "fingernail"
@@ -146,13 +273,13 @@ class AnatomSiteSpecialEnum(StrEnum):
     oral_genital = "oral or genital"
 
 
-class ColorTintEnum(StrEnum):
+class ColorTintEnum(NormalizedStrEnum):
     blue = "blue"
     pink = "pink"
     none = "none"
 
 
-class FitzpatrickSkinType(StrEnum):
+class FitzpatrickSkinType(NormalizedStrEnum):
     type_i = "I"
     type_ii = "II"
     type_iii = "III"
@@ -161,7 +288,7 @@ class FitzpatrickSkinType(StrEnum):
     type_vi = "VI"
 
 
-class ImageManipulationEnum(StrEnum):
+class ImageManipulationEnum(NormalizedStrEnum):
     instrument_only = "instrument only"
     altered = "altered"
     synthetic = "synthetic"
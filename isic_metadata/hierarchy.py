@@ -0,0 +1,305 @@
+"""Helpers shared by the hierarchical enums, whose values are levels joined by ":"."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+import hashlib
+import sys
+from typing import TYPE_CHECKING, Any, cast
+import warnings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+
+    import numpy as np
+    import pyarrow as pa
+
+# The size of the caches of the hierarchy helpers. This comfortably fits every member of a
+# hierarchy, while bounding the memory used by caching arbitrary input.
+CACHE_MAXSIZE = 1024
+
+# The number of levels of every hierarchy.
+_NUM_LEVELS = 5
+
+# The number of members 16 bit codes allow for.
+_MAX_CODES = 2**15 - 1
+
+
+class AmbiguousTerminalValueWarning(UserWarning):
+    """A terminal value names more than one node of a hierarchy."""
+
+
+def terminal_value_index[T: str](members: Iterable[T]) -> dict[str, T]:
+    """
+    Index the members of a hierarchy by their terminal (last) value.
+
+    Where a terminal value names several members, the first one given wins and a warning lists the
+    ambiguous values.
+    """
+    index: dict[str, T] = {}
+    ambiguous: dict[str, list[T]] = {}
+
+    for member in members:
+        terminal_value = member.rpartition(":")[2]
+        first = index.setdefault(terminal_value, member)
+        if first is not member:
+            ambiguous.setdefault(terminal_value, [first]).append(member)
+
+    if ambiguous:
+        warnings.warn(
+            "Terminal values name more than one member, the first member is used: "
+            + "; ".join(
+                f"{terminal_value!r} -> {[str(member) for member in ambiguous_members]}"
+                for terminal_value, ambiguous_members in ambiguous.items()
+            ),
+            AmbiguousTerminalValueWarning,
+            stacklevel=2,
+        )
+
+    return index
+
+
+@dataclass(frozen=True)
+class HierarchyIndex[T: str]:
+    """
+    A tree index over the members of a hierarchy.
+
+    Nodes are numbered in depth first order, so the descendants of the node numbered i are
+    numbered from i + 1 up to the end of its interval. Questions about the tree are then answered in
+    constant time, or in time bounded by the size of the answer.
+    """
+
+    nodes: tuple[T, ...]
+    _positions: dict[str, int]
+    _ends: tuple[int, ...]
+    _ancestors: tuple[tuple[T, ...], ...]
+
+    @classmethod
+    def build(cls, members: Iterable[T]) -> HierarchyIndex[T]:
+        children: dict[str, list[T]] = {}
+        for member in members:
+            children.setdefault(member.rpartition(":")[0], []).append(member)
+
+        nodes: list[T] = []
+        ends: list[int] = []
+        ancestors: list[tuple[T, ...]] = []
+
+        def visit(node: T, path: tuple[T, ...]) -> None:
+            position = len(nodes)
+            nodes.append(node)
+            ends.append(position)
+            ancestors.append(path)
+            for child in children.get(node, ()):
+                visit(child, (*path, node))
+            ends[position] = len(nodes)
+
+        # top level nodes have no ":", so they're grouped under ""
+        for root in children.get("", ()):
+            visit(root, ())
+
+        if len(nodes) != sum(map(len, children.values())):
+            raise ValueError("Every member of a hierarchy must have its parent as a member.")
+
+        return cls(
+            tuple(nodes),
+            {node: position for position, node in enumerate(nodes)},
+            tuple(ends),
+            tuple(ancestors),
+        )
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._positions
+
+    def _position(self, value: str) -> int:
+        try:
+            return self._positions[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a member of the hierarchy.") from None
+
+    def is_descendant(self, value: str, ancestor: str) -> bool:
+        """Whether value lies below ancestor. Values which aren't members lie below nothing."""
+        position = self._positions.get(value)
+        ancestor_position = self._positions.get(ancestor)
+        if position is None or ancestor_position is None:
+            return False
+
+        return ancestor_position < position < self._ends[ancestor_position]
+
+    def ancestors(self, value: str) -> tuple[T, ...]:
+        """Return the ancestors of value, from the top level down to its parent."""
+        return self._ancestors[self._position(value)]
+
+    def descendants(self, node: str) -> tuple[T, ...]:
+        """Return every node below node, in depth first order."""
+        position = self._position(node)
+        return self.nodes[position + 1 : self._ends[position]]
+
+    def depth(self, value: str) -> int:
+        """Return the number of levels of value, e.g. 1 for a top level node."""
+        return len(self._ancestors[self._position(value)]) + 1
+
+
+# The code of a missing value, and of a top level node's parent.
+NO_CODE = -1
+
+
+@dataclass(frozen=True)
+class HierarchyCodes[T: str]:
+    """
+    Integer codes for the members of a hierarchy, along with lookup tables indexed by code.
+
+    Codes are positions in an append only sequence of values, see hierarchy_codes, so they're
+    compact, can index arrays, and stay the same as members are added to or removed from a
+    hierarchy. Values which are no longer members keep their codes and decode to themselves.
+    fingerprint identifies the values coded, so it changes whenever one is appended.
+    """
+
+    members: tuple[T, ...]
+    levels: tuple[tuple[str | None, ...], ...]
+    parents: tuple[int, ...]
+    fingerprint: str
+    _codes: dict[str, int]
+
+    @classmethod
+    def build(cls, members: Iterable[T], codes: Sequence[str] | None = None) -> HierarchyCodes[T]:
+        """
+        Code members by their positions in codes, or in the order given without codes.
+
+        Every member must have a code, i.e. new members must be appended to codes.
+        """
+        members = tuple(members)
+        if codes is not None:
+            if len(set(codes)) != len(codes):
+                raise ValueError("A value can only be given one code.")
+
+            coded = set(codes)
+            missing = [member for member in members if member not in coded]
+            if missing:
+                raise ValueError(f"Members without a code, which must be appended: {missing}")
+
+            by_value: dict[str, T] = {member: member for member in members}
+            members = tuple(by_value.get(value, cast("T", value)) for value in codes)
+
+        if len(members) > _MAX_CODES:
+            raise ValueError(f"A hierarchy can have at most {_MAX_CODES} members.")
+
+        member_codes: dict[str, int] = {member: code for code, member in enumerate(members)}
+        return cls(
+            members,
+            tuple(
+                (*member.split(":"), *([None] * (_NUM_LEVELS - member.count(":") - 1)))
+                for member in members
+            ),
+            tuple(member_codes.get(member.rpartition(":")[0], NO_CODE) for member in members),
+            hashlib.sha256("\n".join(members).encode()).hexdigest()[:16],
+            member_codes,
+        )
+
+    def encode(self, value: str) -> int:
+        try:
+            return self._codes[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a member of the hierarchy.") from None
+
+    def decode(self, code: int) -> T:
+        if code < 0:
+            raise ValueError(f"{code} is not a code of the hierarchy.")
+
+        return self.members[code]
+
+    def encode_many(self, values: Iterable[str | None]) -> array[int]:
+        """Encode values as a compact array of 16 bit codes, with NO_CODE for missing values."""
+        codes = self._codes
+        return array("h", [NO_CODE if value is None else codes[value] for value in values])
+
+    def decode_many(self, codes: Iterable[int]) -> list[T | None]:
+        members = self.members
+        return [None if code == NO_CODE else members[code] for code in codes]
+
+
+def expand_levels(
+    values: np.ndarray[Any, Any] | pa.Array | pa.ChunkedArray,
+    codes: HierarchyCodes[Any],
+    resolve: Callable[[str], str],
+    prefix: str,
+) -> dict[str, Any]:
+    """
+    Expand an array of hierarchy values into one array per level, e.g. diagnosis_1..diagnosis_5.
+
+    Values are dictionary encoded, so resolve (e.g. accept_terminal_values) is only called once
+    per distinct value and the levels of every row are gathered from tables indexed by code. NumPy
+    arrays give NumPy object arrays and pyarrow arrays give pyarrow string arrays. Missing values,
+    None or "", have missing levels.
+    """
+
+    def resolve_codes(distinct_values: Iterable[str | None]) -> list[int | None]:
+        return [codes.encode(resolve(value)) if value else None for value in distinct_values]
+
+    # neither library is a dependency, but an array of either means it's been imported
+    numpy = sys.modules.get("numpy")
+    pyarrow = sys.modules.get("pyarrow")
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        levels = _expand_numpy_levels(values, codes, resolve_codes)
+    elif pyarrow is not None and isinstance(values, pyarrow.Array | pyarrow.ChunkedArray):
+        levels = _expand_arrow_levels(values, codes, resolve_codes)
+    else:
+        raise TypeError("Values must be a NumPy or pyarrow array.")
+
+    return {f"{prefix}_{level}": column for level, column in enumerate(levels, start=1)}
+
+
+def _expand_numpy_levels(
+    values: np.ndarray[Any, Any],
+    codes: HierarchyCodes[Any],
+    resolve_codes: Callable[[Iterable[str | None]], list[int | None]],
+) -> list[np.ndarray[Any, Any]]:
+    import numpy as np  # noqa: PLC0415
+
+    distinct: Iterable[Any]
+    try:
+        unique, inverse = np.unique(values, return_inverse=True)
+        distinct = unique.tolist()
+    except TypeError:
+        # object arrays holding None can't be sorted
+        positions: dict[Any, int] = {}
+        inverse = np.fromiter(
+            (positions.setdefault(value, len(positions)) for value in values.tolist()),
+            dtype=np.intp,
+            count=len(values),
+        )
+        distinct = list(positions)
+
+    row_codes = np.array(
+        [NO_CODE if code is None else code for code in resolve_codes(distinct)], dtype=np.int16
+    )[inverse]
+
+    # NO_CODE indexes the None appended to each table
+    return [
+        np.array([*(member_levels[level] for member_levels in codes.levels), None])[row_codes]
+        for level in range(_NUM_LEVELS)
+    ]
+
+
+def _expand_arrow_levels(
+    values: pa.Array | pa.ChunkedArray,
+    codes: HierarchyCodes[Any],
+    resolve_codes: Callable[[Iterable[str | None]], list[int | None]],
+) -> list[pa.Array]:
+    import pyarrow as pa  # noqa: PLC0415
+
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if not pa.types.is_dictionary(values.type):
+        values = values.dictionary_encode()
+
+    # missing values have null codes, which take turns into null levels
+    row_codes = pa.array(resolve_codes(values.dictionary.to_pylist()), pa.int16()).take(
+        values.indices
+    )
+    return [
+        pa.array([member_levels[level] for member_levels in codes.levels], pa.string()).take(
+            row_codes
+        )
+        for level in range(_NUM_LEVELS)
+    ]
@@ -0,0 +1,613 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import csv
+from decimal import Decimal
+from enum import Enum
+from functools import cache, partial
+import hashlib
+from itertools import batched
+import json
+from operator import itemgetter
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+from typing import IO, TYPE_CHECKING, Any, Self
+
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+
+from isic_metadata.cache import CacheInfo
+from isic_metadata.metadata import (
+    _BATCH_FIELDS,
+    _HIERARCHICAL_FIELDS,
+    _STRUCTURED_FIELD_NAMES,
+    _STRUCTURED_FIELDS,
+    BatchCheckState,
+    CoercionCache,
+    MetadataRow,
+    _construct_row,
+    _field_type,
+    _join_hierarchical_levels,
+    _validate_prepared,
+    schema_fingerprint,
+)
+from isic_metadata.unstructured import UnstructuredColumns
+from isic_metadata.utils import RESERVED_COLUMNS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+    from types import TracebackType
+
+type _RowResult = MetadataRow | list[ErrorDetails]
+
+# The result of a row along with the row the batch checks see for it, the row itself when it's
+# valid and otherwise just its batch fields, if those are valid.
+type _RowOutcome = tuple[_RowResult, MetadataRow | None]
+
+# The coercion cache used by chunks validated in a worker process, kept for the lifetime of the
+# worker so it warms up across chunks.
+_worker_coercion_cache: CoercionCache | None = None
+
+
+def _positions_getter(positions: Sequence[int]) -> Callable[[Sequence[Any]], Sequence[Any]]:
+    """Return a function picking the values at positions out of a row."""
+    if len(positions) == 1:
+        # itemgetter of a single position returns the value rather than a tuple
+        return itemgetter(slice(positions[0], positions[0] + 1))
+    if not positions:
+        return itemgetter(slice(0, 0))
+    return itemgetter(*positions)
+
+
+class HeaderLayout:
+    """
+    The columns of a CSV file, classified once so the values of each row are routed by position.
+
+    Columns are either structured fields, levels of hierarchical fields (e.g. diagnosis_1 to
+    diagnosis_5), reserved columns (see RESERVED_COLUMNS), or unstructured columns. Rows are
+    prepared the way handle_hierarchical_modes_and_unstructured_fields prepares a dict of the
+    same values, so like any column which isn't a field, reserved columns are kept with the
+    unstructured values.
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = tuple(columns)
+        # like csv.DictReader, the last of any columns with the same name is used
+        positions = {column: i for i, column in enumerate(self.columns)}
+        level_names = {
+            f"{field_name}_{level}" for field_name in _HIERARCHICAL_FIELDS for level in range(1, 6)
+        }
+
+        self.structured = tuple(column for column in positions if column in _STRUCTURED_FIELD_NAMES)
+        self.hierarchical = tuple(column for column in positions if column in level_names)
+        self.reserved = tuple(column for column in positions if column in RESERVED_COLUMNS)
+        self.unstructured = tuple(
+            column
+            for column in positions
+            if column not in _STRUCTURED_FIELD_NAMES
+            and column not in level_names
+            and column not in RESERVED_COLUMNS
+        )
+
+        # reserved and unstructured columns, in the order they come
+        self.unstructured_keys = tuple(
+            column
+            for column in positions
+            if column not in _STRUCTURED_FIELD_NAMES and column not in level_names
+        )
+
+        self._structured_values = _positions_getter([positions[c] for c in self.structured])
+        self._unstructured_values = _positions_getter(
+            [positions[c] for c in self.unstructured_keys]
+        )
+        # the positions of the levels of each hierarchical field given as levels, None for
+        # missing levels
+        levels = []
+        for field_name in _HIERARCHICAL_FIELDS:
+            level_positions = tuple(positions.get(f"{field_name}_{level}") for level in range(1, 6))
+            if any(position is not None for position in level_positions):
+                levels.append((field_name, level_positions))
+        self._levels = tuple(levels)
+
+    def mapping(self, row: Sequence[Any]) -> dict[Any, Any]:
+        """Return the values of a row by column, as csv.DictReader would give them."""
+        values: dict[Any, Any] = dict(zip(self.columns, row, strict=False))
+        if len(row) > len(self.columns):
+            values[None] = list(row[len(self.columns) :])
+        for column in self.columns[len(row) :]:
+            values.setdefault(column, None)
+        return values
+
+    def prepare(
+        self, row: Sequence[Any], unstructured: UnstructuredColumns | None = None
+    ) -> dict[str, Any]:
+        """
+        Split a row into structured and unstructured values, see MetadataRow.
+
+        With unstructured, created with unstructured_keys, the unstructured values are added to
+        it rather than to a dict of their own.
+        """
+        if len(row) != len(self.columns):
+            # rows with missing or extra cells are rare, and handled as mappings
+            prepared: dict[str, Any] = (
+                MetadataRow.handle_hierarchical_modes_and_unstructured_fields(  # type: ignore[operator]
+                    self.mapping(row)
+                )
+            )
+            if unstructured is not None:
+                prepared["unstructured"] = unstructured.append(prepared["unstructured"])
+            return prepared
+
+        values = dict(zip(self.structured, self._structured_values(row), strict=True))
+        for field_name, level_positions in self._levels:
+            if not values.get(field_name):
+                values[field_name] = _join_hierarchical_levels(
+                    "" if position is None else row[position] for position in level_positions
+                )
+
+        unstructured_values = self._unstructured_values(row)
+        values["unstructured"] = (
+            dict(zip(self.unstructured_keys, unstructured_values, strict=True))
+            if unstructured is None
+            else unstructured.append_values(unstructured_values)
+        )
+        return values
+
+
+def _batch_row(values: Mapping[str, Any], coercion_cache: CoercionCache) -> MetadataRow | None:
+    try:
+        return MetadataRow.validate_with_cache(
+            {field: values[field] for field in _BATCH_FIELDS if field in values},
+            coercion_cache,
+            _ignore_rcm_model_checks=True,
+        )
+    except ValidationError:
+        return None
+
+
+def _validate_rows(
+    rows: Sequence[Any],
+    coercion_cache: CoercionCache | None = None,
+    layout: HeaderLayout | None = None,
+    *,
+    shared_unstructured: bool = False,
+) -> list[_RowOutcome]:
+    if coercion_cache is None:
+        global _worker_coercion_cache  # noqa: PLW0603
+        if _worker_coercion_cache is None:
+            _worker_coercion_cache = CoercionCache()
+        coercion_cache = _worker_coercion_cache
+
+    # with shared_unstructured, the unstructured values of the rows are stored together rather
+    # than in a dict per row
+    unstructured = (
+        UnstructuredColumns(() if layout is None else layout.unstructured_keys)
+        if shared_unstructured
+        else None
+    )
+
+    outcomes: list[_RowOutcome] = []
+    for values in rows:
+        if layout is None:
+            prepared = MetadataRow.handle_hierarchical_modes_and_unstructured_fields(dict(values))  # type: ignore[operator]
+            if unstructured is not None:
+                prepared["unstructured"] = unstructured.append(prepared["unstructured"])
+        else:
+            prepared = layout.prepare(values, unstructured)
+
+        try:
+            row = _validate_prepared(prepared, coercion_cache)
+        except ValidationError as e:
+            # rows which aren't valid still take part in the batch checks, see
+            # MetadataRow.__init__.
+            outcomes.append((e.errors(), _batch_row(prepared, coercion_cache)))
+        else:
+            outcomes.append((row, row))
+
+    if unstructured is not None:
+        unstructured.seal()
+    return outcomes
+
+
+def _share_unstructured(results: Iterable[_RowResult]) -> None:
+    """Store the unstructured values of rows holding a dict of their own together."""
+    unstructured = UnstructuredColumns()
+    for result in results:
+        if isinstance(result, MetadataRow) and isinstance(result.unstructured, dict):
+            result.__dict__["unstructured"] = unstructured.append(result.unstructured)
+    unstructured.seal()
+
+
+def _batch_state(outcomes: Iterable[_RowOutcome]) -> BatchCheckState:
+    state = BatchCheckState()
+    state.update(batch_row for _, batch_row in outcomes if batch_row is not None)
+    return state
+
+
+def _validate_chunk(
+    rows: Sequence[Any],
+    coercion_cache: CoercionCache | None = None,
+    layout: HeaderLayout | None = None,
+    *,
+    shared_unstructured: bool = False,
+) -> tuple[list[_RowResult], BatchCheckState]:
+    """Validate a chunk of rows, returning the result of each row and the chunk's batch state."""
+    outcomes = _validate_rows(rows, coercion_cache, layout, shared_unstructured=shared_unstructured)
+    return [result for result, _ in outcomes], _batch_state(outcomes)
+
+
+# The fields of a row, the last being the only one which isn't structured
+_ROW_FIELDS = (*_STRUCTURED_FIELDS, "unstructured")
+
+
+def _field_decoder(field_name: str) -> Callable[[Any], Any] | None:
+    field_type = _field_type(field_name)
+    if isinstance(field_type, type) and issubclass(field_type, Enum):
+        return field_type._value2member_map_.__getitem__
+    if field_type is Decimal:
+        return Decimal
+    return None
+
+
+# How the values of the fields which aren't stored as they are, enums and decimals, are rebuilt
+_FIELD_DECODERS = tuple(
+    (field_name, decode)
+    for field_name in _STRUCTURED_FIELDS
+    if (decode := _field_decoder(field_name)) is not None
+)
+
+
+@cache
+def _fields_set(mask: int) -> frozenset[str]:
+    return frozenset(field_name for i, field_name in enumerate(_ROW_FIELDS) if mask >> i & 1)
+
+
+# A row as the values of its structured fields, enums and decimals being stored as strings, its
+# unstructured values, a bit mask of its set fields, and whether it ignores the RCM model checks.
+# Unpickling this is several times faster than unpickling a row, as no objects other than
+# builtins are involved.
+type _PackedRow = tuple[tuple[Any, ...], dict[str, Any], int, bool]
+
+
+def _pack_row(row: MetadataRow) -> _PackedRow:
+    values = vars(row)
+    fields_set = row.model_fields_set
+    return (
+        tuple(
+            value.value
+            if isinstance(value, Enum)
+            else str(value)
+            if isinstance(value, Decimal)
+            else value
+            for value in map(values.__getitem__, _STRUCTURED_FIELDS)
+        ),
+        values["unstructured"],
+        sum(1 << i for i, field_name in enumerate(_ROW_FIELDS) if field_name in fields_set),
+        row._ignore_rcm_model_checks,  # noqa: SLF001
+    )
+
+
+def _unpack_row(packed: _PackedRow) -> MetadataRow:
+    packed_values, unstructured, fields_set, ignore_rcm_model_checks = packed
+    values = dict(zip(_STRUCTURED_FIELDS, packed_values, strict=True))
+    for field_name, decode in _FIELD_DECODERS:
+        if (value := values[field_name]) is not None:
+            values[field_name] = decode(value)
+    values["unstructured"] = unstructured
+
+    row = _construct_row(values, ignore_rcm_model_checks=ignore_rcm_model_checks)
+    object.__setattr__(row, "__pydantic_fields_set__", set(_fields_set(fields_set)))
+    return row
+
+
+def _dump_outcome(outcome: _RowOutcome) -> bytes:
+    result, batch_row = outcome
+    if isinstance(result, MetadataRow):
+        # a valid row is also the row the batch checks see
+        return pickle.dumps((None, _pack_row(result)))
+
+    return pickle.dumps((result, None if batch_row is None else _pack_row(batch_row)))
+
+
+def _load_outcome(data: bytes) -> _RowOutcome:
+    errors, packed_row = pickle.loads(data)  # noqa: S301
+    if errors is None:
+        row = _unpack_row(packed_row)
+        return row, row
+
+    return errors, None if packed_row is None else _unpack_row(packed_row)
+
+
+class ValidationResultCache:
+    """
+    A persistent cache of the outcome of validating rows, see ValidationStream.
+
+    Outcomes are keyed by a hash of each row's values, in whatever order its columns come, along
+    with schema_fingerprint. Outcomes cached with another fingerprint are discarded when the
+    cache is opened, so they're never reused once validation changes. Outcomes are pickled, so
+    the cache should only be shared with trusted processes.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._fingerprint = schema_fingerprint()
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS outcomes "
+                "(key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, outcome BLOB NOT NULL)"
+            )
+            self._connection.execute(
+                "DELETE FROM outcomes WHERE fingerprint != ?", (self._fingerprint,)
+            )
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, values: Mapping[str, Any]) -> str:
+        try:
+            # the values of a CSV are all strings, which are joined as that's much faster
+            normalized = "\0".join([part for item in sorted(values.items()) for part in item])
+        except TypeError:
+            # csv.DictReader gives the values of surplus cells a key of None, as a list
+            normalized = repr(sorted(values.items(), key=lambda item: repr(item[0])))
+
+        return hashlib.blake2b(
+            normalized.encode(), digest_size=16, person=self._fingerprint.encode()[:16]
+        ).hexdigest()
+
+    def _get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        """Return the pickled outcomes cached for any of keys."""
+        return dict(
+            self._connection.execute(
+                "SELECT key, outcome FROM outcomes WHERE key IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(keys)),),
+            ).fetchall()
+        )
+
+    def _put_many(self, outcomes: Mapping[str, _RowOutcome]) -> dict[str, bytes]:
+        """Cache outcomes, returning them pickled."""
+        pickled = {key: _dump_outcome(outcome) for key, outcome in outcomes.items()}
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?)",
+                [(key, self._fingerprint, outcome) for key, outcome in pickled.items()],
+            )
+
+        return pickled
+
+    def cache_info(self) -> CacheInfo:
+        (size,) = self._connection.execute("SELECT COUNT(*) FROM outcomes").fetchone()
+        return CacheInfo(self._hits, self._misses, None, size)
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM outcomes")
+        self._hits = 0
+        self._misses = 0
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class ValidationStream:
+    """
+    Validate metadata rows in chunks, without holding every row in memory.
+
+    Iterating yields (row_index, MetadataRow | list[ErrorDetails]) for each row, in the order of
+    the rows. The checks performed by MetadataBatch are tracked per chunk and merged, and their
+    errors are available from batch_errors once every row has been validated.
+
+    With max_workers greater than 1, chunks are validated in a pool of processes. At most
+    2 * max_workers chunks are in flight at once, so memory stays bounded.
+
+    With a result_cache, only rows whose values aren't in the cache yet are validated, e.g. the
+    rows edited since a file was last uploaded, and the outcomes of other rows are reused. The
+    batch checks still span every row.
+
+    With a layout, rows are sequences of values in the order of its columns (e.g. read with
+    csv.reader) rather than mappings, and their values are routed to fields by position.
+
+    With shared_unstructured, the unstructured values of the rows of each chunk are stored
+    together, see UnstructuredColumns, which takes substantially less memory for wide files.
+    row.unstructured is then a read-only UnstructuredRow rather than a dict, which e.g. can't be
+    passed to json.dumps as is.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rows: Iterable[Mapping[str, Any]] | Iterable[Sequence[Any]],
+        *,
+        layout: HeaderLayout | None = None,
+        coercion_cache: CoercionCache | None = None,
+        max_workers: int = 1,
+        chunk_size: int = 1_000,
+        result_cache: ValidationResultCache | None = None,
+        shared_unstructured: bool = False,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        self._rows = rows
+        self._layout = layout
+        self._coercion_cache = coercion_cache if coercion_cache is not None else CoercionCache()
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._result_cache = result_cache
+        self._shared_unstructured = shared_unstructured
+        self._batch_errors: list[ErrorDetails] | None = None
+
+    def __iter__(self) -> Iterator[tuple[int, _RowResult]]:
+        state = BatchCheckState()
+        i = 0
+
+        for results, chunk_state in self._validated_chunks():
+            for result in results:
+                yield i, result
+                i += 1
+            state.merge(chunk_state)
+
+        self._batch_errors = state.finalize()
+
+    def _validated_chunks(self) -> Iterator[tuple[list[_RowResult], BatchCheckState]]:
+        # mappings are copied, as preparing a row modifies it
+        rows = self._rows if self._layout is not None else map(dict, self._rows)
+        chunks = batched(rows, self._chunk_size)
+
+        if self._result_cache is None:
+            validated = self._map_chunks(
+                partial(
+                    _validate_chunk,
+                    layout=self._layout,
+                    shared_unstructured=self._shared_unstructured,
+                ),
+                chunks,
+            )
+        else:
+            validated = self._cached_chunks(chunks, self._result_cache)
+
+        for results, state in validated:
+            # rows from worker processes or the result cache come with a dict of unstructured
+            # values each
+            if self._shared_unstructured and (
+                self._max_workers > 1 or self._result_cache is not None
+            ):
+                _share_unstructured(results)
+            yield results, state
+
+    def _map_chunks[T](
+        self,
+        function: Callable[[Sequence[Any], CoercionCache | None], T],
+        chunks: Iterable[Sequence[Any]],
+    ) -> Iterator[T]:
+        if self._max_workers == 1:
+            for chunk in chunks:
+                yield function(chunk, self._coercion_cache)
+            return
+
+        with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+            # workers use a coercion cache of their own
+            pending: deque[Future[T]] = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(function, chunk, None))
+                if len(pending) >= 2 * self._max_workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _cached_chunks(
+        self, chunks: Iterable[Sequence[Any]], result_cache: ValidationResultCache
+    ) -> Iterator[tuple[list[_RowResult], BatchCheckState]]:
+        layout = self._layout
+        # the keys of each chunk's rows, their cached outcomes, and the keys of the rows to be
+        # validated, for the chunks being validated
+        pending: deque[tuple[list[str], dict[str, bytes], list[str]]] = deque()
+
+        def uncached_rows() -> Iterator[list[Any]]:
+            for chunk in chunks:
+                keys = [
+                    result_cache._key(values if layout is None else layout.mapping(values))  # noqa: SLF001
+                    for values in chunk
+                ]
+                cached = result_cache._get_many(keys)  # noqa: SLF001
+                # rows repeated within a chunk are only validated once
+                uncached = {
+                    key: values
+                    for key, values in zip(keys, chunk, strict=True)
+                    if key not in cached
+                }
+                pending.append((keys, cached, list(uncached)))
+                yield list(uncached.values())
+
+        validate = partial(
+            _validate_rows, layout=layout, shared_unstructured=self._shared_unstructured
+        )
+        for validated in self._map_chunks(validate, uncached_rows()):
+            keys, cached, uncached_keys = pending.popleft()
+            result_cache._hits += len(keys) - len(validated)  # noqa: SLF001
+            result_cache._misses += len(validated)  # noqa: SLF001
+
+            fresh = dict(zip(uncached_keys, validated, strict=True))
+            cached.update(result_cache._put_many(fresh))  # noqa: SLF001
+
+            # every other row gets its own copy of its outcome, so rows can be mutated safely
+            outcomes = [
+                fresh.pop(key) if key in fresh else _load_outcome(cached[key]) for key in keys
+            ]
+            yield [result for result, _ in outcomes], _batch_state(outcomes)
+
+    @property
+    def batch_errors(self) -> list[ErrorDetails]:
+        if self._batch_errors is None:
+            raise RuntimeError("Batch errors are only available once every row is validated.")
+
+        return self._batch_errors
+
+
+def _open_csv(path: str | os.PathLike[str]) -> IO[str]:
+    # utf-8-sig strips the byte order mark spreadsheet software tends to add
+    return Path(path).open(newline="", encoding="utf-8-sig")
+
+
+def _read_csv(source: str | os.PathLike[str] | IO[str]) -> tuple[list[str], Iterator[list[str]]]:
+    """Return the header of a CSV file, along with an iterator over the rows which follow it."""
+    if not isinstance(source, str | os.PathLike):
+        reader = csv.reader(source)
+        # blank lines are skipped, as csv.DictReader does
+        return next(reader, []), filter(None, reader)
+
+    # the header is read up front, and the file is opened again once rows are iterated so it's
+    # never left open by a stream which isn't iterated
+    with _open_csv(source) as f:
+        header = next(csv.reader(f), [])
+
+    def rows() -> Iterator[list[str]]:
+        with _open_csv(source) as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            yield from filter(None, reader)
+
+    return header, rows()
+
+
+def validate_csv(  # noqa: PLR0913
+    source: str | os.PathLike[str] | IO[str],
+    *,
+    coercion_cache: CoercionCache | None = None,
+    max_workers: int = 1,
+    chunk_size: int = 1_000,
+    result_cache: ValidationResultCache | None = None,
+    shared_unstructured: bool = False,
+) -> ValidationStream:
+    """
+    Validate a metadata CSV file, or file-like object, in chunks of rows.
+
+    The header is classified once, see HeaderLayout, and the values of each row are routed to
+    fields by position rather than each row being read into a dict and split by key. See
+    ValidationStream for shared_unstructured.
+    """
+    header, rows = _read_csv(source)
+    return ValidationStream(
+        rows,
+        layout=HeaderLayout(header),
+        coercion_cache=coercion_cache,
+        max_workers=max_workers,
+        chunk_size=chunk_size,
+        result_cache=result_cache,
+        shared_unstructured=shared_unstructured,
+    )
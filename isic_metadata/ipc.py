@@ -0,0 +1,114 @@
+"""
+Arrow IPC caches of validated metadata, which requires the arrow extra.
+
+A validated cohort is written once to an uncompressed Arrow IPC (Feather v2) file, which other
+processes memory map rather than validating it again. Mapped tables aren't copied into memory,
+so every process reading the same file shares it through the page cache. This module isn't
+imported by isic_metadata itself, so pyarrow remains optional.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+import hashlib
+import os
+from pathlib import Path
+import secrets
+from typing import TYPE_CHECKING
+
+import pyarrow as pa
+
+from isic_metadata.arrow import ARROW_SCHEMA, rows_to_arrow
+from isic_metadata.metadata import schema_fingerprint
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from isic_metadata.metadata import MetadataRow
+
+# The key of the schema metadata holding the fingerprint a file was written with
+FINGERPRINT_KEY = b"isic_metadata.fingerprint"
+
+
+@cache
+def ipc_fingerprint() -> str:
+    """Return the fingerprint files are written with, see schema_fingerprint."""
+    digest = hashlib.sha256()
+    digest.update(schema_fingerprint().encode())
+    digest.update(ARROW_SCHEMA.to_string().encode())
+    return digest.hexdigest()[:16]
+
+
+def write_ipc(path: str | Path, data: pa.Table | Iterable[MetadataRow]) -> None:
+    """
+    Write validated metadata, a table matching ARROW_SCHEMA or rows, to an Arrow IPC file.
+
+    The file is written next to path and then moved into place, so processes reading path never
+    see a partially written file.
+    """
+    path = Path(path)
+    table = (
+        data.select(ARROW_SCHEMA.names).cast(ARROW_SCHEMA)
+        if isinstance(data, pa.Table)
+        else rows_to_arrow(data)
+    )
+    # IPC files hold a single dictionary per column, so the chunks must share theirs
+    table = table.unify_dictionaries().replace_schema_metadata({FINGERPRINT_KEY: ipc_fingerprint()})
+
+    # created as open would, so the umask applies and other users sharing the cache can map it
+    temporary_path = path.with_name(f".{path.name}.{secrets.token_hex(8)}")
+    fd = os.open(temporary_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+        temporary_path.replace(path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+
+
+def read_ipc(path: str | Path) -> pa.Table | None:
+    """
+    Memory map a file written by write_ipc, without copying it.
+
+    None is returned when there's no file, or when it was written with a different
+    ipc_fingerprint, as its values may no longer be valid.
+    """
+    try:
+        source = pa.memory_map(str(path))
+    except FileNotFoundError:
+        return None
+
+    try:
+        reader = pa.ipc.open_file(source)
+    except BaseException:
+        source.close()
+        raise
+
+    if (reader.schema.metadata or {}).get(FINGERPRINT_KEY) != ipc_fingerprint().encode():
+        source.close()
+        return None
+
+    return reader.read_all().replace_schema_metadata(None)
+
+
+def cached_ipc(path: str | Path, build: Callable[[], pa.Table | Iterable[MetadataRow]]) -> pa.Table:
+    """
+    Memory map the validated metadata cached at path, calling build to (re)write it when needed.
+
+    build is called when there's no cache yet, or when it's stale because the schema changed,
+    e.g. validating a snapshot with validate_arrow and returning the valid rows. A cache which
+    can't be read, e.g. one truncated by a full disk, is treated as stale.
+    """
+    try:
+        table = read_ipc(path)
+    except (pa.ArrowInvalid, OSError):
+        table = None
+
+    if table is None:
+        write_ipc(path, build())
+        table = read_ipc(path)
+
+    if table is None:
+        raise RuntimeError(f"{path} was replaced with a different schema while being written.")
+    return table
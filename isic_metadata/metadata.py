@@ -1,8 +1,27 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from collections import Counter
+import dataclasses
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Annotated, Any, Literal, cast
+from functools import cache
+import hashlib
+import importlib.metadata
+from itertools import compress, repeat
+import json
+from operator import eq, itemgetter
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    Literal,
+    NoReturn,
+    Protocol,
+    cast,
+    get_args,
+    get_origin,
+)
 
 from annotated_types import Ge
 from pydantic import (
@@ -11,14 +30,18 @@ from pydantic import (
     BeforeValidator,
     ConfigDict,
     Field,
+    PlainValidator,
+    TypeAdapter,
     ValidationError,
+    WrapValidator,
     computed_field,
     field_validator,
     model_validator,
 )
-from pydantic_core import ErrorDetails, PydanticCustomError
+from pydantic_core import ErrorDetails, InitErrorDetails, PydanticCustomError
 
 from isic_metadata.anatom_site_hierarchical import AnatomSiteEnum
+from isic_metadata.cache import LRUCache
 from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
 from isic_metadata.fields import (
     Age,
@@ -32,9 +55,14 @@ from isic_metadata.fields import (
     ImageTypeEnum,
     MelMitoticIndexEnum,
     MelThickMm,
+    NormalizedStrEnum,
     TBPTileTypeEnum,
 )
 
+if TYPE_CHECKING:
+    from array import array
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+
 _CUSTOM_MESSAGES = {
     "enum": "Unsupported value for {loc}: '{value}'.",
     "int_parsing": "Unable to parse value as an integer.",
@@ -105,6 +133,236 @@ def _error_missing_field(
     )
 
 
+def _join_hierarchical_levels(levels: Iterable[str]) -> str:
+    return ":".join(levels).rstrip(":")
+
+
+def _error_one_lesion_multiple_patients(lesions: list[str]) -> PydanticCustomError:
+    return PydanticCustomError(
+        "one_lesion_multiple_patients",
+        "One or more lesions belong to multiple patients.",
+        {"examples": lesions[:5]},
+    )
+
+
+def _error_rcm_multiple_macroscopics(rcm_cases: list[str]) -> PydanticCustomError:
+    return PydanticCustomError(
+        "rcm_multiple_macroscopics",
+        "One or more RCM cases have multiple macroscopic images.",
+        {"examples": rcm_cases[:5]},
+    )
+
+
+def _error_one_rcm_case_multiple_lesions(rcm_cases: list[str]) -> PydanticCustomError:
+    return PydanticCustomError(
+        "one_rcm_case_multiple_lesions",
+        "One or more RCM cases belong to multiple lesions.",
+        {"examples": rcm_cases[:5]},
+    )
+
+
+@dataclass()
+class _KeyValues:
+    """The first value seen with each key, and the keys seen with more than one value."""
+
+    first: dict[str, str] = dataclasses.field(default_factory=dict)
+    conflicting: set[str] = dataclasses.field(default_factory=set)
+
+
+class _BatchCheck[A](Protocol):
+    """
+    A check spanning the rows of a batch.
+
+    Rather than seeing the rows themselves, a check folds columns of the fields it reads into an
+    aggregate, and reports its error, if any, from the aggregate once every row has been added.
+    This lets all of the checks share a single pass over the rows.
+    """
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """The row fields the check reads."""
+        ...
+
+    def aggregate(self) -> A: ...
+
+    def update(self, aggregate: A, columns: Mapping[str, Sequence[Any]]) -> None: ...
+
+    def merge(self, aggregate: A, other: A) -> None:
+        """Fold in the aggregate of rows which come after the rows in aggregate."""
+        ...
+
+    def error(self, aggregate: A) -> PydanticCustomError | None: ...
+
+    def dump(self, aggregate: A) -> Any:
+        """Return aggregate as JSON compatible data."""
+        ...
+
+    def load(self, data: Any) -> A: ...
+
+
+@dataclass(frozen=True)
+class _OneValuePerKey:
+    """Rows sharing a key (e.g. a lesion) must all have the same value (e.g. a patient)."""
+
+    key: str
+    value: str
+    make_error: Callable[[list[str]], PydanticCustomError]
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return (self.key, self.value)
+
+    def aggregate(self) -> _KeyValues:
+        return _KeyValues()
+
+    def update(self, aggregate: _KeyValues, columns: Mapping[str, Sequence[Any]]) -> None:
+        keys = columns[self.key]
+        self._add_pairs(aggregate, compress(zip(keys, columns[self.value], strict=True), keys))
+
+    def merge(self, aggregate: _KeyValues, other: _KeyValues) -> None:
+        self._add_pairs(aggregate, other.first.items())
+        aggregate.conflicting |= other.conflicting
+
+    def _add_pairs(self, aggregate: _KeyValues, pairs: Iterable[tuple[str, str]]) -> None:
+        first = aggregate.first
+        for key, value in pairs:
+            if value and first.setdefault(key, value) != value:
+                aggregate.conflicting.add(key)
+
+    def error(self, aggregate: _KeyValues) -> PydanticCustomError | None:
+        if not aggregate.conflicting:
+            return None
+
+        return self.make_error([key for key in aggregate.first if key in aggregate.conflicting])
+
+    def dump(self, aggregate: _KeyValues) -> Any:
+        return {"first": aggregate.first, "conflicting": sorted(aggregate.conflicting)}
+
+    def load(self, data: Any) -> _KeyValues:
+        return _KeyValues(dict(data["first"]), set(data["conflicting"]))
+
+
+@dataclass(frozen=True)
+class _AtMostOneMatchPerKey:
+    """Rows sharing a key (e.g. an RCM case) must have at most one row where field is value."""
+
+    key: str
+    field: str
+    value: Any
+    make_error: Callable[[list[str]], PydanticCustomError]
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return (self.key, self.field)
+
+    def aggregate(self) -> Counter[str]:
+        return Counter()
+
+    def update(self, aggregate: Counter[str], columns: Mapping[str, Sequence[Any]]) -> None:
+        matches = map(eq, columns[self.field], repeat(self.value))
+        aggregate.update(filter(None, compress(columns[self.key], matches)))
+
+    def merge(self, aggregate: Counter[str], other: Counter[str]) -> None:
+        aggregate.update(other)
+
+    def error(self, aggregate: Counter[str]) -> PydanticCustomError | None:
+        keys = [key for key, count in aggregate.items() if count > 1]
+        return self.make_error(keys) if keys else None
+
+    def dump(self, aggregate: Counter[str]) -> Any:
+        return dict(aggregate)
+
+    def load(self, data: Any) -> Counter[str]:
+        return Counter(data)
+
+
+# The checks performed by MetadataBatch, in the order their errors are reported.
+_BATCH_CHECKS: tuple[_BatchCheck[Any], ...] = (
+    _OneValuePerKey("lesion_id", "patient_id", _error_one_lesion_multiple_patients),
+    _AtMostOneMatchPerKey(
+        "rcm_case_id", "image_type", ImageTypeEnum.rcm_macroscopic, _error_rcm_multiple_macroscopics
+    ),
+    _OneValuePerKey("rcm_case_id", "lesion_id", _error_one_rcm_case_multiple_lesions),
+)
+
+# The fields the batch checks read.
+_BATCH_FIELDS = tuple(dict.fromkeys(field for check in _BATCH_CHECKS for field in check.fields))
+
+
+@dataclass()
+class BatchCheckState:
+    """
+    The state of the checks MetadataBatch performs, for the rows added so far.
+
+    This allows batch checks on rows which aren't all in memory at once, e.g. a shard of rows per
+    worker. The state of each shard is built with update, sent to a coordinator (see to_dict and
+    from_dict), and combined with merge before calling finalize. Memory grows with the number of
+    distinct ids rather than the number of rows.
+    """
+
+    aggregates: list[Any] = dataclasses.field(
+        default_factory=lambda: [check.aggregate() for check in _BATCH_CHECKS]
+    )
+
+    def update(self, rows: Iterable[MetadataRow]) -> None:
+        # the fields the checks read are pulled out of the rows once, as columns, rather than
+        # each check traversing the rows itself.
+        row_fields = list(map(vars, rows))
+        columns = {field: list(map(itemgetter(field), row_fields)) for field in _BATCH_FIELDS}
+        for check, aggregate in zip(_BATCH_CHECKS, self.aggregates, strict=True):
+            check.update(aggregate, columns)
+
+    def merge(self, other: BatchCheckState) -> None:
+        """
+        Fold in the state of rows which come after the rows added so far.
+
+        Merging the states of consecutive shards of rows, in order, is equivalent to adding every
+        row to a single state. Merging out of order only changes the order of error examples.
+        """
+        for check, aggregate, other_aggregate in zip(
+            _BATCH_CHECKS, self.aggregates, other.aggregates, strict=True
+        ):
+            check.merge(aggregate, other_aggregate)
+
+    def _errors(self) -> list[PydanticCustomError]:
+        return [
+            error
+            for check, aggregate in zip(_BATCH_CHECKS, self.aggregates, strict=True)
+            if (error := check.error(aggregate)) is not None
+        ]
+
+    def finalize(self) -> list[ErrorDetails]:
+        """Return the errors of every batch check, in the order MetadataBatch checks them."""
+        errors = self._errors()
+        if not errors:
+            return []
+
+        return ValidationError.from_exception_data(
+            "MetadataBatch", [InitErrorDetails(type=error, loc=(), input=None) for error in errors]
+        ).errors()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the state as JSON compatible data."""
+        return {
+            "checks": [
+                check.dump(aggregate)
+                for check, aggregate in zip(_BATCH_CHECKS, self.aggregates, strict=True)
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> BatchCheckState:
+        if len(data["checks"]) != len(_BATCH_CHECKS):
+            raise ValueError("The state doesn't match the batch checks.")
+
+        return cls(
+            [
+                check.load(aggregate)
+                for check, aggregate in zip(_BATCH_CHECKS, data["checks"], strict=True)
+            ]
+        )
+
+
 class MetadataBatch(BaseModel):
     """
     A batch of metadata rows.
@@ -115,66 +373,57 @@ class MetadataBatch(BaseModel):
     items: list[MetadataRow]
 
     @model_validator(mode="after")
-    def check_patients_lesions(self) -> MetadataBatch:
-        lesion_to_patients: dict[str, set[str]] = defaultdict(set)
-
-        for item in self.items:
-            if item.patient_id and item.lesion_id:
-                lesion_to_patients[item.lesion_id].add(item.patient_id)
+    def check_batch(self) -> MetadataBatch:
+        state = BatchCheckState()
+        state.update(self.items)
 
-        bad_lesions = [
-            lesion for lesion in lesion_to_patients if len(lesion_to_patients[lesion]) > 1
-        ]
-        if bad_lesions:
-            raise PydanticCustomError(
-                "one_lesion_multiple_patients",
-                "One or more lesions belong to multiple patients.",
-                {"examples": bad_lesions[:5]},
-            )
+        # like any model validator, stop at the first error
+        errors = state._errors()  # noqa: SLF001
+        if errors:
+            raise errors[0]
 
         return self
 
-    @model_validator(mode="after")
-    def check_rcm_at_most_one_macroscopic_image(self) -> MetadataBatch:
-        rcm_case_to_macroscopic: dict[str, int] = defaultdict(int)
 
-        for item in self.items:
-            if item.rcm_case_id and item.image_type == ImageTypeEnum.rcm_macroscopic:
-                rcm_case_to_macroscopic[item.rcm_case_id] += 1
+# The levels of a missing hierarchical value
+_NO_LEVELS: tuple[None, ...] = (None,) * 5
 
-        bad_rcm_cases = [
-            rcm_case
-            for rcm_case in rcm_case_to_macroscopic
-            if rcm_case_to_macroscopic[rcm_case] > 1
-        ]
-        if bad_rcm_cases:
-            raise PydanticCustomError(
-                "rcm_multiple_macroscopics",
-                "One or more RCM cases have multiple macroscopic images.",
-                {"examples": bad_rcm_cases[:5]},
-            )
+# A row's diagnosis and anatom_site, followed by the levels of each
+type _HierarchyLevels = tuple[
+    DiagnosisEnum | None, AnatomSiteEnum | None, tuple[str | None, ...], tuple[str | None, ...]
+]
 
-        return self
 
-    @model_validator(mode="after")
-    def check_rcm_case_at_most_one_lesion(self) -> MetadataBatch:
-        rcm_case_to_lesions: dict[str, set[str]] = defaultdict(set)
+def _resolve_levels(
+    diagnosis: DiagnosisEnum | None, anatom_site: AnatomSiteEnum | None
+) -> _HierarchyLevels:
+    return (
+        diagnosis,
+        anatom_site,
+        DiagnosisEnum.levels(diagnosis) if diagnosis else _NO_LEVELS,
+        AnatomSiteEnum.levels(anatom_site) if anatom_site else _NO_LEVELS,
+    )
 
-        for item in self.items:
-            if item.rcm_case_id and item.lesion_id:
-                rcm_case_to_lesions[item.rcm_case_id].add(item.lesion_id)
 
-        bad_rcm_cases = [
-            rcm_case for rcm_case in rcm_case_to_lesions if len(rcm_case_to_lesions[rcm_case]) > 1
-        ]
-        if bad_rcm_cases:
-            raise PydanticCustomError(
-                "one_rcm_case_multiple_lesions",
-                "One or more RCM cases belong to multiple lesions.",
-                {"examples": bad_rcm_cases[:5]},
-            )
+# The fields whose values are lowercased before they're validated
+_LOWERCASED_FIELDS = (
+    "clin_size_long_diam_mm",
+    "diagnosis_confirm_type",
+    "mel_mitotic_index",
+    "mel_thick_mm",
+    "sex",
+)
 
-        return self
+# The fields which require a melanoma diagnosis
+_MELANOMA_FIELDS = ("mel_mitotic_index", "mel_thick_mm", "mel_ulcer")
+
+# The image types rcm_case_id and tbp_tile_type are compatible with
+_RCM_IMAGE_TYPES = frozenset(
+    {ImageTypeEnum.rcm_macroscopic, ImageTypeEnum.rcm_tile, ImageTypeEnum.rcm_mosaic}
+)
+_TBP_TILE_IMAGE_TYPES = frozenset(
+    {ImageTypeEnum.tbp_tile_close_up, ImageTypeEnum.tbp_tile_overview}
+)
 
 
 class MetadataRow(BaseModel):
@@ -257,55 +506,82 @@ class MetadataRow(BaseModel):
     @computed_field  # type: ignore[prop-decorator]
     @property
     def diagnosis_1(self) -> str | None:
-        return DiagnosisEnum.levels(self.diagnosis)[0] if self.diagnosis else None
+        return self._hierarchy_levels()[2][0]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def diagnosis_2(self) -> str | None:
-        return DiagnosisEnum.levels(self.diagnosis)[1] if self.diagnosis else None
+        return self._hierarchy_levels()[2][1]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def diagnosis_3(self) -> str | None:
-        return DiagnosisEnum.levels(self.diagnosis)[2] if self.diagnosis else None
+        return self._hierarchy_levels()[2][2]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def diagnosis_4(self) -> str | None:
-        return DiagnosisEnum.levels(self.diagnosis)[3] if self.diagnosis else None
+        return self._hierarchy_levels()[2][3]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def diagnosis_5(self) -> str | None:
-        return DiagnosisEnum.levels(self.diagnosis)[4] if self.diagnosis else None
+        return self._hierarchy_levels()[2][4]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def anatom_site_1(self) -> str | None:
-        return AnatomSiteEnum.levels(self.anatom_site)[0] if self.anatom_site else None
+        return self._hierarchy_levels()[3][0]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def anatom_site_2(self) -> str | None:
-        return AnatomSiteEnum.levels(self.anatom_site)[1] if self.anatom_site else None
+        return self._hierarchy_levels()[3][1]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def anatom_site_3(self) -> str | None:
-        return AnatomSiteEnum.levels(self.anatom_site)[2] if self.anatom_site else None
+        return self._hierarchy_levels()[3][2]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def anatom_site_4(self) -> str | None:
-        return AnatomSiteEnum.levels(self.anatom_site)[3] if self.anatom_site else None
+        return self._hierarchy_levels()[3][3]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def anatom_site_5(self) -> str | None:
-        return AnatomSiteEnum.levels(self.anatom_site)[4] if self.anatom_site else None
+        return self._hierarchy_levels()[3][4]
+
+    # the integer codes of the hierarchical fields, see HierarchyCodes. these aren't computed
+    # fields, so they're left out of dumps.
+    @property
+    def diagnosis_code(self) -> int | None:
+        return DiagnosisEnum.codes().encode(self.diagnosis) if self.diagnosis else None
+
+    @property
+    def anatom_site_code(self) -> int | None:
+        return AnatomSiteEnum.codes().encode(self.anatom_site) if self.anatom_site else None
 
-    __slots__ = ("_ignore_rcm_model_checks",)
+    __slots__ = ("_ignore_rcm_model_checks", "_levels")
     _ignore_rcm_model_checks: bool
+    # the levels of the hierarchical fields, resolved once rather than by each computed field
+    _levels: _HierarchyLevels
+
+    def _hierarchy_levels(self) -> _HierarchyLevels:
+        # rows can be mutated, copied, unpickled or constructed without validation, so the slot
+        # is only trusted while it was resolved from the current values.
+        try:
+            levels = self._levels
+        except AttributeError:
+            pass
+        else:
+            if levels[0] is self.diagnosis and levels[1] is self.anatom_site:
+                return levels
+
+        levels = _resolve_levels(self.diagnosis, self.anatom_site)
+        object.__setattr__(self, "_levels", levels)
+        return levels
 
     # see https://github.com/pydantic/pydantic/issues/655#issuecomment-570312649 for details on
     # implementing a private property to be used internally.
@@ -322,6 +598,135 @@ class MetadataRow(BaseModel):
         object.__setattr__(self, "_ignore_rcm_model_checks", _ignore_rcm_model_checks)
 
         super().__init__(**kwargs)
+        object.__setattr__(self, "_levels", _resolve_levels(self.diagnosis, self.anatom_site))
+
+    # the slot isn't part of the state pydantic pickles, so rows validated in another process
+    # would lose it.
+    def __getstate__(self) -> dict[Any, Any]:
+        return {
+            **super().__getstate__(),
+            "_ignore_rcm_model_checks": self._ignore_rcm_model_checks,
+        }
+
+    def __setstate__(self, state: dict[Any, Any]) -> None:
+        state = dict(state)
+        object.__setattr__(
+            self, "_ignore_rcm_model_checks", state.pop("_ignore_rcm_model_checks", False)
+        )
+        super().__setstate__(state)
+
+    @classmethod
+    def validate_with_cache(
+        cls,
+        values: Mapping[str, Any],
+        cache: CoercionCache,
+        *,
+        _ignore_rcm_model_checks: bool = False,
+    ) -> MetadataRow:
+        """
+        Validate values like model_validate, checking a CoercionCache before coercing each field.
+
+        Only fields missing from the cache are coerced, and on a full cache hit the row is
+        constructed directly before running the cross-field validators.
+        """
+        prepared = cls.handle_hierarchical_modes_and_unstructured_fields(dict(values))  # type: ignore[operator]
+        return _validate_prepared(prepared, cache, ignore_rcm_model_checks=_ignore_rcm_model_checks)
+
+    @classmethod
+    def from_normalized(
+        cls, values: Mapping[str, Any], *, _ignore_rcm_model_checks: bool = False
+    ) -> MetadataRow:
+        """
+        Revalidate values which are already normalized, e.g. rows retrieved from the database.
+
+        The hierarchical values are rebuilt and the cross-field validators are run, but values
+        already of the type a field produces are trusted as-is rather than being stripped,
+        lowercased, parsed, etc. Any other value is coerced as model_validate would.
+        """
+        prepared = cls.handle_hierarchical_modes_and_unstructured_fields(dict(values))  # type: ignore[operator]
+
+        coerced: dict[str, Any] = {}
+        errors: list[ErrorDetails] = []
+        for field_name, value in prepared.items():
+            if field_name == "unstructured":
+                continue
+
+            coerced[field_name], field_errors = _trusted_coercer(field_name)(value)
+            if field_errors:
+                errors.extend(field_errors)
+
+        return _build_row(
+            prepared, coerced, errors, ignore_rcm_model_checks=_ignore_rcm_model_checks
+        )
+
+    def with_changes(
+        self, changes: Mapping[str, Any], cache: CoercionCache | None = None
+    ) -> MetadataRow:
+        """
+        Revalidate a row with some of its values changed, e.g. by a metadata edit.
+
+        This gives the same result as validating the values of the row with changes applied on
+        top, but only the changed values are coerced and only the cross-field validators reading
+        them are run. The row must have been validated, as the rest of it isn't checked again.
+        Passing a cache shares coerced values across the rows of a bulk edit.
+        """
+        values = self.__dict__
+        fields_set = self.model_fields_set
+        prepared = _prepare_changes(self, changes)
+
+        coerce = _coerce_value if cache is None else cache.coerce
+        coerced: dict[str, Any] = {}
+        errors: list[ErrorDetails] = []
+        for field_name, value in prepared.items():
+            if field_name == "unstructured":
+                continue
+
+            coerced[field_name], field_errors = coerce(field_name, value)
+            if field_errors:
+                errors.extend(field_errors)
+
+        if errors:
+            _raise_field_errors(errors)
+
+        # like model_copy, an unchanged unstructured dict is shared with the original row
+        unstructured = prepared["unstructured"]
+        row = _construct_row(
+            {
+                **values,
+                **coerced,
+                "unstructured": {**self.unstructured, **unstructured}
+                if unstructured
+                else self.unstructured,
+            },
+            ignore_rcm_model_checks=self._ignore_rcm_model_checks,
+            fields_set={*fields_set, *coerced, "unstructured"},
+        )
+
+        # the validators not reading a changed value already passed for this row
+        changed = coerced.keys()
+        for rule in _CROSS_FIELD_RULES:
+            if changed.isdisjoint(rule.fields):
+                continue
+
+            try:
+                getattr(row, rule.name)()
+            except PydanticCustomError as e:
+                # pydantic reports all of the values of a row failing a model validator
+                row_values = {
+                    **{
+                        field_name: values[field_name]
+                        for field_name in fields_set
+                        if field_name != "unstructured"
+                    },
+                    **self.unstructured,
+                    **changes,
+                }
+                row_input = self.handle_hierarchical_modes_and_unstructured_fields(row_values)  # type: ignore[operator]
+                raise ValidationError.from_exception_data(
+                    MetadataRow.__name__, [InitErrorDetails(type=e, loc=(), input=row_input)]
+                ) from None
+
+        return row
 
     @model_validator(mode="before")
     @classmethod
@@ -345,18 +750,16 @@ class MetadataRow(BaseModel):
             if using_multi_values and using_single_value:
                 [values.pop(f"{field_name}_{i}", "") for i in range(1, 6)]
             elif using_multi_values:
-                values[field_name] = ":".join(
-                    values.pop(f"{field_name}_{i}", "") for i in range(1, 6)
+                # unused levels of rows from the database are null
+                values[field_name] = _join_hierarchical_levels(
+                    values.pop(f"{field_name}_{i}", "") or "" for i in range(1, 6)
                 )
-                values[field_name] = values[field_name].rstrip(":")
 
         # handle unstructured fields
         # See https://github.com/samuelcolvin/pydantic/issues/2285 for more detail
-        structured_field_names = {field for field in cls.model_fields if field != "unstructured"}
-
         unstructured: dict[str, Any] = {}
         for field_name in list(values):
-            if field_name not in structured_field_names:
+            if field_name not in _STRUCTURED_FIELD_NAMES:
                 unstructured[field_name] = values.pop(field_name)
         values["unstructured"] = unstructured
         return values
@@ -371,14 +774,7 @@ class MetadataRow(BaseModel):
         # drop empty strings as though they were never passed
         return None if v == "" else v
 
-    @field_validator(
-        "clin_size_long_diam_mm",
-        "diagnosis_confirm_type",
-        "mel_mitotic_index",
-        "mel_thick_mm",
-        "sex",
-        mode="before",
-    )
+    @field_validator(*_LOWERCASED_FIELDS, mode="before")
     @classmethod
     def lower[T](cls, v: T) -> T:
         if isinstance(v, str):
@@ -387,13 +783,7 @@ class MetadataRow(BaseModel):
 
     @model_validator(mode="after")
     def validate_melanoma_fields(self) -> MetadataRow:
-        melanoma_fields: list[str] = [
-            "mel_mitotic_index",
-            "mel_thick_mm",
-            "mel_ulcer",
-        ]
-
-        for field in melanoma_fields:
+        for field in _MELANOMA_FIELDS:
             if not getattr(self, field):
                 continue
 
@@ -418,11 +808,7 @@ class MetadataRow(BaseModel):
         if not self.image_type:
             raise _error_missing_field("rcm_case_id", "image_type")
 
-        if self.image_type not in [
-            ImageTypeEnum.rcm_macroscopic,
-            ImageTypeEnum.rcm_tile,
-            ImageTypeEnum.rcm_mosaic,
-        ]:
+        if self.image_type not in _RCM_IMAGE_TYPES:
             raise _error_incompatible_fields(
                 "rcm_case_id", "image_type", field2_value=ImageTypeEnum.rcm_macroscopic
             )
@@ -452,10 +838,7 @@ class MetadataRow(BaseModel):
         if not self.image_type:
             raise _error_missing_field("tbp_tile_type", "image_type")
 
-        if self.image_type not in [
-            ImageTypeEnum.tbp_tile_close_up,
-            ImageTypeEnum.tbp_tile_overview,
-        ]:
+        if self.image_type not in _TBP_TILE_IMAGE_TYPES:
             raise _error_incompatible_fields(
                 "tbp_tile_type", "image_type", field2_value=self.image_type.value
             )
@@ -472,3 +855,684 @@ class MetadataRow(BaseModel):
             )
 
         return self
+
+
+_FIELD_VALIDATOR_TYPES = {
+    "before": BeforeValidator,
+    "after": AfterValidator,
+    "wrap": WrapValidator,
+    "plain": PlainValidator,
+}
+
+# All fields of MetadataRow that are populated from a column of the same name.
+_STRUCTURED_FIELDS = tuple(field for field in MetadataRow.model_fields if field != "unstructured")
+_STRUCTURED_FIELD_NAMES = frozenset(_STRUCTURED_FIELDS)
+
+_HIERARCHICAL_FIELDS = ("diagnosis", "anatom_site")
+
+# The keys a value of each hierarchical field can be given as, see
+# handle_hierarchical_modes_and_unstructured_fields
+_HIERARCHICAL_KEYS = {
+    field_name: frozenset({field_name, *(f"{field_name}_{i}" for i in range(1, 6))})
+    for field_name in _HIERARCHICAL_FIELDS
+}
+_ALL_HIERARCHICAL_KEYS = frozenset().union(*_HIERARCHICAL_KEYS.values())
+
+
+@dataclass(frozen=True)
+class _CrossFieldRule:
+    # the name of the MetadataRow model validator implementing the rule
+    name: str
+    # the rule is a no-op for any row where all of these fields are falsy
+    triggers: tuple[str, ...]
+    # every field the rule reads, including the triggers
+    fields: tuple[str, ...]
+
+
+# The cross-field model validators of MetadataRow, in the order pydantic runs them.
+_CROSS_FIELD_RULES = (
+    _CrossFieldRule("validate_melanoma_fields", _MELANOMA_FIELDS, (*_MELANOMA_FIELDS, "diagnosis")),
+    _CrossFieldRule("validate_rcm_fields", ("rcm_case_id",), ("rcm_case_id", "image_type")),
+    _CrossFieldRule(
+        "validate_dermoscopic_fields", ("dermoscopic_type",), ("dermoscopic_type", "image_type")
+    ),
+    _CrossFieldRule(
+        "validate_tbp_tile_fields", ("tbp_tile_type",), ("tbp_tile_type", "image_type")
+    ),
+    _CrossFieldRule(
+        "validate_concomitant_biopsy",
+        ("concomitant_biopsy",),
+        ("concomitant_biopsy", "diagnosis_confirm_type"),
+    ),
+)
+
+
+# The value of every field of a row which isn't set, unstructured having a default factory.
+_FIELD_DEFAULTS = {
+    field_name: None if field.default_factory else field.default
+    for field_name, field in MetadataRow.model_fields.items()
+}
+
+
+@cache
+def _field_adapter(field_name: str) -> TypeAdapter[Any]:
+    """Build a validator for a single MetadataRow field that behaves like the model's own."""
+    field = MetadataRow.model_fields[field_name]
+    field_validators = [
+        _FIELD_VALIDATOR_TYPES[decorator.info.mode](getattr(MetadataRow, decorator.cls_var_name))
+        for decorator in MetadataRow.__pydantic_decorators__.field_validators.values()
+        if field_name in decorator.info.fields or "*" in decorator.info.fields
+    ]
+    config = ConfigDict(
+        arbitrary_types_allowed=True,
+        coerce_numbers_to_str=MetadataRow.model_config.get("coerce_numbers_to_str", False),
+    )
+    annotation: Any = Annotated[(field.annotation, *field.metadata, *field_validators)]
+    return TypeAdapter(annotation, config=config)
+
+
+def _coerce_value(field_name: str, value: Any) -> tuple[Any, list[ErrorDetails] | None]:
+    lookup = _value_lookups().get(field_name)
+    if lookup is not None:
+        try:
+            return lookup[value], None
+        except (KeyError, TypeError):
+            if isinstance(value, str) and (member := lookup.get(value.strip())) is not None:
+                return member, None
+
+    try:
+        return _field_adapter(field_name).validate_python(value), None
+    except ValidationError as e:
+        return None, [
+            cast("ErrorDetails", {**error, "loc": (field_name, *error["loc"])})
+            for error in e.errors()
+        ]
+
+
+def _coerce_key(key: tuple[str, type, Any]) -> tuple[Any, list[ErrorDetails] | None]:
+    field_name, _, value = key
+    return _coerce_value(field_name, value)
+
+
+def _field_type(field_name: str) -> Any:
+    """Return the type a field produces, e.g. Decimal for Annotated[Decimal, ...] | None."""
+    annotation = MetadataRow.model_fields[field_name].annotation
+    field_type = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if get_origin(field_type) is Annotated:
+        field_type = get_args(field_type)[0]
+    return field_type
+
+
+# The normalized lookups of the enum fields, see NormalizedStrEnum
+_ENUM_LOOKUPS: dict[str, Mapping[str, Any]] = {
+    field_name: field_type.normalized_lookup(ignore_case=field_name in _LOWERCASED_FIELDS)
+    for field_name in _STRUCTURED_FIELDS
+    if isinstance(field_type := _field_type(field_name), type)
+    and issubclass(field_type, NormalizedStrEnum)
+}
+
+# The fields whose raw values are looked up in a spelling table, see _spelling_table
+_SPELLING_FIELDS = tuple(
+    field_name for field_name in _STRUCTURED_FIELDS if _field_type(field_name) in {bool, int}
+)
+
+# The spellings of booleans contributors send, each also in upper case and capitalized
+_BOOLEAN_SPELLINGS = ("true", "false", "yes", "no", "y", "n", "t", "f", "on", "off", "1", "0")
+
+# The integers spelled out in the tables, covering every age and most acquisition days
+_INTEGER_SPELLINGS = range(1000)
+
+
+@cache
+def _spelling_table(field_name: str) -> Mapping[str, Any]:
+    """
+    Map the spellings contributors send for a boolean or integer field to their values.
+
+    The table holds the spellings which validate, e.g. "85+" for age, coerced as the field
+    coerces them, so looking one up gives the same value as validating it.
+    """
+    if _field_type(field_name) is bool:
+        spellings = [
+            variant
+            for spelling in _BOOLEAN_SPELLINGS
+            for variant in (spelling, spelling.upper(), spelling.capitalize())
+        ]
+    else:
+        spellings = [*map(str, _INTEGER_SPELLINGS), "85+"]
+
+    adapter = _field_adapter(field_name)
+    table: dict[str, Any] = {}
+    for spelling in spellings:
+        try:
+            value = adapter.validate_python(spelling)
+        except ValidationError:
+            continue
+        table[spelling] = value
+
+    return MappingProxyType(table)
+
+
+@cache
+def _value_lookups() -> dict[str, Mapping[str, Any]]:
+    """Return the lookups of the enum fields and the spelling tables, keyed by field name."""
+    return {
+        **_ENUM_LOOKUPS,
+        **{field_name: _spelling_table(field_name) for field_name in _SPELLING_FIELDS},
+    }
+
+
+@cache
+def _trusted_coercer(field_name: str) -> Callable[[Any], tuple[Any, list[ErrorDetails] | None]]:
+    """
+    Build a coercer which trusts values already of the type the field produces.
+
+    Enum fields accept the values of their normalized lookup, which are looked up directly.
+    """
+    field_type = _field_type(field_name)
+
+    if field_name in _ENUM_LOOKUPS:
+        members: Mapping[Any, Any] = _ENUM_LOOKUPS[field_name]
+    elif get_origin(field_type) is Literal:
+        members = {value: value for value in get_args(field_type)}
+    else:
+        members = {}
+
+    def coerce(value: Any) -> tuple[Any, list[ErrorDetails] | None]:
+        if value is None:
+            return None, None
+
+        if members:
+            try:
+                return members[value], None
+            except (KeyError, TypeError):
+                pass
+        # empty strings are dropped by MetadataRow.strip
+        elif type(value) is field_type and value != "":
+            return value, None
+
+        return _coerce_value(field_name, value)
+
+    return coerce
+
+
+# The private attributes a newly constructed row starts out with
+_PRIVATE_DEFAULTS = MetadataRow.model_construct().__pydantic_private__
+
+
+def _as_line_errors(errors: list[ErrorDetails]) -> list[InitErrorDetails]:
+    # ErrorDetails are a superset of InitErrorDetails, the message being regenerated from the
+    # type and context.
+    return cast("list[InitErrorDetails]", errors)
+
+
+class CoercionCache(LRUCache[tuple[str, type, Any], tuple[Any, list[ErrorDetails] | None]]):
+    """
+    A bounded cache of coerced field values, keyed by field name and raw value.
+
+    Both successfully coerced values and field-level errors are cached. Contributor uploads
+    are highly repetitive, so a cache shared across rows (or across chunks of a large file)
+    avoids repeating the same coercion for most values.
+
+    Values of enum, boolean and integer fields are looked up in precomputed tables instead of
+    being cached. With track_spellings, the spellings of boolean and integer values are also
+    counted, see spelling_usage.
+    """
+
+    def __init__(self, maxsize: int | None = 4096, *, track_spellings: bool = False) -> None:
+        super().__init__(maxsize)
+        self._spelling_usage: dict[str, dict[str, int]] | None = (
+            {field_name: {} for field_name in _SPELLING_FIELDS} if track_spellings else None
+        )
+
+    def spelling_usage(self) -> dict[str, Counter[str]]:
+        """
+        Return how often each spelling of the boolean and integer fields was coerced.
+
+        This includes spellings which aren't in the tables, e.g. "Oui", which are a sign the
+        tables should grow. Rows coerced in worker processes aren't counted.
+        """
+        if self._spelling_usage is None:
+            raise RuntimeError("Spellings are only counted by a cache with track_spellings.")
+
+        return {
+            field_name: Counter(usage)
+            for field_name, usage in self._spelling_usage.items()
+            if usage
+        }
+
+    def clear(self) -> None:
+        super().clear()
+        for usage in (self._spelling_usage or {}).values():
+            usage.clear()
+
+    def _count_spellings(self, values: Mapping[str, Any]) -> None:
+        if self._spelling_usage is None:
+            return
+
+        for field_name, usage in self._spelling_usage.items():
+            value = values.get(field_name)
+            # empty values are missing values rather than spellings
+            if type(value) is str and value:
+                usage[value] = usage.get(value, 0) + 1
+
+    def _count_column_spellings(self, field_name: str, values: Iterable[Any]) -> None:
+        if self._spelling_usage is None or field_name not in self._spelling_usage:
+            return
+
+        usage = self._spelling_usage[field_name]
+        for value, count in Counter(v for v in values if type(v) is str and v).items():
+            usage[value] = usage.get(value, 0) + count
+
+    def coerce(self, field_name: str, value: Any) -> tuple[Any, list[ErrorDetails] | None]:
+        # Values are keyed by type as well since e.g. 1 and 1.0 are equal, but coerce to "1" and
+        # "1.0" respectively when the field is a string.
+        return self.get_or_compute((field_name, type(value), value), _coerce_key)
+
+    def coerce_row(self, values: Mapping[str, Any]) -> tuple[dict[str, Any], list[ErrorDetails]]:
+        """
+        Coerce every structured field of a row, returning the coerced values and any errors.
+
+        This is equivalent to calling coerce for each field, but avoids the per-call overhead on
+        cache hits since it's called for every row of an upload.
+        """
+        self._count_spellings(values)
+
+        entries = self._entries
+        lookups = _value_lookups()
+        coerced: dict[str, Any] = {}
+        errors: list[ErrorDetails] = []
+
+        for field_name, value in values.items():
+            if field_name == "unstructured":
+                continue
+
+            # looked up values don't take up room in the cache
+            lookup = lookups.get(field_name)
+            if lookup is not None:
+                try:
+                    coerced[field_name] = lookup[value]
+                except (KeyError, TypeError):
+                    pass
+                else:
+                    continue
+
+            key = (field_name, type(value), value)
+            try:
+                outcome = entries[key]
+            except (KeyError, TypeError):
+                outcome = self.coerce(field_name, value)
+            else:
+                self._hits += 1
+                entries.move_to_end(key)
+
+            coerced[field_name], field_errors = outcome
+            if field_errors:
+                errors.extend(field_errors)
+
+        return coerced, errors
+
+
+def _construct_row(
+    coerced: dict[str, Any],
+    *,
+    ignore_rcm_model_checks: bool,
+    fields_set: set[str] | None = None,
+) -> MetadataRow:
+    """
+    Build a MetadataRow from already coerced values without running any validation.
+
+    This mirrors model_construct, which is comparatively slow since it resolves the default of
+    every unset field on each call. The fields set default to those of coerced.
+    """
+    row = MetadataRow.__new__(MetadataRow)
+    object.__setattr__(row, "__dict__", {**_FIELD_DEFAULTS, **coerced})
+    object.__setattr__(
+        row, "__pydantic_fields_set__", set(coerced) if fields_set is None else fields_set
+    )
+    object.__setattr__(row, "__pydantic_extra__", None)
+    object.__setattr__(
+        row, "__pydantic_private__", None if _PRIVATE_DEFAULTS is None else dict(_PRIVATE_DEFAULTS)
+    )
+    object.__setattr__(row, "_ignore_rcm_model_checks", ignore_rcm_model_checks)
+    object.__setattr__(
+        row, "_levels", _resolve_levels(coerced.get("diagnosis"), coerced.get("anatom_site"))
+    )
+    return row
+
+
+def _prepare_changes(row: MetadataRow, changes: Mapping[str, Any]) -> dict[str, Any]:
+    """Split changes to a row as handle_hierarchical_modes_and_unstructured_fields would."""
+    if _ALL_HIERARCHICAL_KEYS.isdisjoint(changes):
+        unstructured: dict[str, Any] = {}
+        prepared = {"unstructured": unstructured}
+        for field_name, value in changes.items():
+            if field_name in _STRUCTURED_FIELD_NAMES:
+                prepared[field_name] = value
+            else:
+                unstructured[field_name] = value
+        return prepared
+
+    # levels being edited replace those of the row, as they would when revalidating its dumped
+    # levels, whereas a value of the field itself replaces all of them
+    current = {
+        key: getattr(row, key)
+        for field_name in _HIERARCHICAL_FIELDS
+        if field_name not in changes and not _HIERARCHICAL_KEYS[field_name].isdisjoint(changes)
+        for key in (f"{field_name}_{i}" for i in range(1, 6))
+    }
+    return MetadataRow.handle_hierarchical_modes_and_unstructured_fields({**current, **changes})  # type: ignore[no-any-return, operator]
+
+
+def _raise_field_errors(errors: list[ErrorDetails]) -> NoReturn:
+    # pydantic reports errors in the order fields are defined
+    errors.sort(key=lambda error: _STRUCTURED_FIELDS.index(str(error["loc"][0])))
+    raise ValidationError.from_exception_data(MetadataRow.__name__, _as_line_errors(errors))
+
+
+def _build_row(
+    prepared: dict[str, Any],
+    coerced: dict[str, Any],
+    errors: list[ErrorDetails],
+    *,
+    ignore_rcm_model_checks: bool,
+) -> MetadataRow:
+    """
+    Finish validating a row whose fields were coerced outside of pydantic.
+
+    prepared is the output of handle_hierarchical_modes_and_unstructured_fields, and is what
+    pydantic reports as the input of model level errors.
+    """
+    if errors:
+        _raise_field_errors(errors)
+
+    row = _construct_row(
+        {**coerced, "unstructured": prepared["unstructured"]},
+        ignore_rcm_model_checks=ignore_rcm_model_checks,
+    )
+
+    # model validators only run once every field is valid, and the first to fail is reported
+    for rule in _CROSS_FIELD_RULES:
+        try:
+            getattr(row, rule.name)()
+        except PydanticCustomError as e:
+            raise ValidationError.from_exception_data(
+                MetadataRow.__name__, [InitErrorDetails(type=e, loc=(), input=prepared)]
+            ) from None
+
+    return row
+
+
+def _validate_prepared(
+    prepared: dict[str, Any], cache: CoercionCache, *, ignore_rcm_model_checks: bool = False
+) -> MetadataRow:
+    """
+    Validate a row already split into structured and unstructured values, see validate_with_cache.
+
+    prepared is in the form handle_hierarchical_modes_and_unstructured_fields gives.
+    """
+    coerced, errors = cache.coerce_row(prepared)
+    return _build_row(prepared, coerced, errors, ignore_rcm_model_checks=ignore_rcm_model_checks)
+
+
+type _MeasurementParser = Callable[[Iterable[str | None]], tuple[list[Decimal | None], list[bool]]]
+
+# Fields whose raw strings can be parsed a column at a time, see ClinSizeLongDiamMm
+_MEASUREMENT_PARSERS: dict[str, _MeasurementParser] = {
+    "clin_size_long_diam_mm": ClinSizeLongDiamMm.parse_measurements,
+    "mel_thick_mm": MelThickMm.parse_measurements,
+}
+
+
+def _coerce_measurement_column(
+    field_name: str,
+    values: Sequence[str | None],
+    parse_measurements: _MeasurementParser,
+    coercion_cache: CoercionCache | None,
+) -> tuple[list[Any], dict[int, list[ErrorDetails]]]:
+    coerced, invalid = parse_measurements(values)
+
+    # only invalid values are validated individually, for their errors
+    errors: dict[int, list[ErrorDetails]] = {}
+    for i in compress(range(len(values)), invalid):
+        coerced[i], error = (
+            coercion_cache.coerce(field_name, values[i])
+            if coercion_cache is not None
+            else _coerce_value(field_name, values[i])
+        )
+        if error:
+            errors[i] = error
+
+    return coerced, errors
+
+
+def _coerce_column(
+    field_name: str, values: Sequence[Any], coercion_cache: CoercionCache | None
+) -> tuple[list[Any], dict[int, list[ErrorDetails]]]:
+    """Coerce a column of raw values, validating each distinct value only once."""
+    parse_measurements = _MEASUREMENT_PARSERS.get(field_name)
+    if parse_measurements is not None and all(
+        value is None or type(value) is str for value in values
+    ):
+        return _coerce_measurement_column(field_name, values, parse_measurements, coercion_cache)
+
+    # Values are keyed by type as well since e.g. 1 and 1.0 are equal, but coerce to "1" and
+    # "1.0" respectively when the field is a string.
+    homogeneous = len(set(map(type, values))) <= 1
+    keys: Sequence[Any] = (
+        values if homogeneous else list(zip(map(type, values), values, strict=True))
+    )
+
+    try:
+        distinct = dict.fromkeys(keys)
+    except TypeError:
+        # unhashable values (e.g. lists) can't be deduplicated
+        outcomes = [_coerce_value(field_name, value) for value in values]
+        errors = {i: error for i, (_, error) in enumerate(outcomes) if error}
+        return [coerced for coerced, _ in outcomes], errors
+
+    if coercion_cache is not None:
+        coercion_cache._count_column_spellings(field_name, values)  # noqa: SLF001
+
+    coerced_by_key: dict[Any, Any] = {}
+    errors_by_key: dict[Any, list[ErrorDetails]] = {}
+    for key in distinct:
+        value = key if homogeneous else key[1]
+        coerced, error = (
+            coercion_cache.coerce(field_name, value)
+            if coercion_cache is not None
+            else _coerce_value(field_name, value)
+        )
+        coerced_by_key[key] = coerced
+        if error:
+            errors_by_key[key] = error
+
+    errors = (
+        {i: errors_by_key[key] for i, key in enumerate(keys) if key in errors_by_key}
+        if errors_by_key
+        else {}
+    )
+    return list(map(coerced_by_key.__getitem__, keys)), errors
+
+
+def _cross_field_rule_evaluator(
+    rule: _CrossFieldRule, *, ignore_rcm_model_checks: bool
+) -> Callable[[tuple[Any, ...]], PydanticCustomError | None]:
+    # Rules are evaluated against a partially constructed row so the logic in MetadataRow
+    # remains the single source of truth.
+    probe = MetadataRow.model_construct()
+    object.__setattr__(probe, "_ignore_rcm_model_checks", ignore_rcm_model_checks)
+    validator = getattr(probe, rule.name)
+
+    def evaluate(values: tuple[Any, ...]) -> PydanticCustomError | None:
+        probe.__dict__.update(zip(rule.fields, values, strict=True))
+        try:
+            validator()
+        except PydanticCustomError as e:
+            return e
+        return None
+
+    return evaluate
+
+
+@dataclass()
+class ColumnarValidationResult:
+    num_rows: int
+    # the validated value of every structured field, None for rows which failed validation
+    columns: dict[str, list[Any]]
+    unstructured: dict[str, list[Any]]
+    # the errors of each row which failed validation, keyed by row index
+    errors: dict[int, list[ErrorDetails]]
+
+    @property
+    def valid(self) -> list[bool]:
+        return [i not in self.errors for i in range(self.num_rows)]
+
+    def hierarchy_codes(self, field_name: Literal["diagnosis", "anatom_site"]) -> array[int]:
+        """Return a hierarchical column as integer codes, see HierarchyCodes."""
+        enum = DiagnosisEnum if field_name == "diagnosis" else AnatomSiteEnum
+        return enum.codes().encode_many(self.columns[field_name])
+
+
+def _combine_hierarchical_columns(raw: dict[str, Sequence[Any]], num_rows: int) -> None:
+    """Apply handle_hierarchical_modes_and_unstructured_fields to whole columns."""
+    for field_name in _HIERARCHICAL_FIELDS:
+        level_names = [f"{field_name}_{i}" for i in range(1, 6)]
+        if not any(level_name in raw for level_name in level_names):
+            continue
+
+        levels = [raw.pop(level_name, [""] * num_rows) for level_name in level_names]
+        raw[field_name] = [
+            single_value or _join_hierarchical_levels(levels[j][i] or "" for j in range(5))
+            for i, single_value in enumerate(raw.get(field_name, [None] * num_rows))
+        ]
+
+
+def _apply_cross_field_rules(
+    validated: dict[str, list[Any]],
+    errors: dict[int, list[ErrorDetails]],
+    row_input: Callable[[int], dict[str, Any]],
+    *,
+    ignore_rcm_model_checks: bool,
+) -> None:
+    # model validators only run for rows where every field is valid, and the first rule to fail
+    # is the only one reported.
+    failed = set(errors)
+    num_rows = len(validated[_STRUCTURED_FIELDS[0]])
+
+    for rule in _CROSS_FIELD_RULES:
+        triggers = [validated[field_name] for field_name in rule.triggers]
+        triggered = compress(range(num_rows), map(any, zip(*triggers, strict=True)))
+        candidates = [i for i in triggered if i not in failed]
+        keys = list(
+            zip(
+                *[
+                    list(map(validated[field_name].__getitem__, candidates))
+                    for field_name in rule.fields
+                ],
+                strict=True,
+            )
+        )
+
+        evaluate = _cross_field_rule_evaluator(
+            rule, ignore_rcm_model_checks=ignore_rcm_model_checks
+        )
+        outcomes = {key: evaluate(key) for key in set(keys)}
+        if not any(outcomes.values()):
+            continue
+
+        for i, key in zip(candidates, keys, strict=True):
+            rule_error = outcomes[key]
+            if rule_error:
+                failed.add(i)
+                errors[i] = ValidationError.from_exception_data(
+                    MetadataRow.__name__,
+                    [InitErrorDetails(type=rule_error, loc=(), input=row_input(i))],
+                ).errors()
+
+
+def validate_columns(
+    columns: Mapping[str, Sequence[Any]],
+    *,
+    ignore_rcm_model_checks: bool = False,
+    coercion_cache: CoercionCache | None = None,
+) -> ColumnarValidationResult:
+    """
+    Validate metadata column by column, producing the same results as MetadataRow.
+
+    Each distinct value of a column is only coerced once, and the cross-field rules are
+    evaluated once per distinct combination of the fields they read. This is substantially
+    faster than validating each row individually for large and repetitive uploads. Passing a
+    coercion_cache additionally shares coerced values across calls.
+    """
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length.")
+    num_rows = lengths.pop() if lengths else 0
+
+    raw = dict(columns)
+    _combine_hierarchical_columns(raw, num_rows)
+    structured = {
+        field_name: raw[field_name] for field_name in _STRUCTURED_FIELDS if field_name in raw
+    }
+    unstructured = {
+        column: list(values) for column, values in raw.items() if column not in structured
+    }
+
+    validated: dict[str, list[Any]] = {}
+    errors: dict[int, list[ErrorDetails]] = {}
+    for field_name in _STRUCTURED_FIELDS:
+        if field_name not in structured:
+            validated[field_name] = [None] * num_rows
+            continue
+
+        validated[field_name], field_errors = _coerce_column(
+            field_name, structured[field_name], coercion_cache
+        )
+        for i, error in field_errors.items():
+            # errors are shared between rows with the same value, so they're copied for each
+            errors.setdefault(i, []).extend(cast("ErrorDetails", dict(e)) for e in error)
+
+    def row_input(i: int) -> dict[str, Any]:
+        # the input pydantic reports for model level errors
+        return {
+            **{field_name: values[i] for field_name, values in structured.items()},
+            "unstructured": {column: values[i] for column, values in unstructured.items()},
+        }
+
+    _apply_cross_field_rules(
+        validated, errors, row_input, ignore_rcm_model_checks=ignore_rcm_model_checks
+    )
+
+    for values in validated.values():
+        for i in errors:
+            values[i] = None
+
+    return ColumnarValidationResult(
+        num_rows=num_rows,
+        columns=validated,
+        unstructured=unstructured,
+        errors=dict(sorted(errors.items())),
+    )
+
+
+@cache
+def schema_fingerprint() -> str:
+    """
+    Return a fingerprint of the schema rows are validated against.
+
+    This changes whenever the fields of MetadataRow or the values they accept do, including the
+    members of DiagnosisEnum and AnatomSiteEnum, and with each release of isic-metadata since
+    validation can change without the schema changing. Anything storing validated values beyond
+    the life of a process should also store this and check it before reusing them.
+    """
+    try:
+        package_version = importlib.metadata.version("isic-metadata")
+    except importlib.metadata.PackageNotFoundError:
+        package_version = ""
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(MetadataRow.model_json_schema(), sort_keys=True).encode())
+    digest.update(DiagnosisEnum.codes().fingerprint.encode())
+    digest.update(AnatomSiteEnum.codes().fingerprint.encode())
+    digest.update(package_version.encode())
+    return digest.hexdigest()[:16]
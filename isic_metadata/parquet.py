@@ -0,0 +1,173 @@
+"""
+Parquet storage of validated metadata, which requires the arrow extra.
+
+Files hold one column per structured field of MetadataRow, see ARROW_SCHEMA. Keyword fields
+are dictionary encoded, so e.g. the full path of each diagnosis is stored once per row group.
+This module isn't imported by isic_metadata itself, so pyarrow remains optional.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from typing import TYPE_CHECKING, Any, Self, cast
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from isic_metadata.anatom_site_hierarchical import AnatomSiteEnum
+from isic_metadata.arrow import ARROW_SCHEMA, rows_to_arrow
+from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+from isic_metadata.registry import FIELD_REGISTRY
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from pathlib import Path
+    from types import TracebackType
+
+    from isic_metadata.metadata import MetadataRow
+
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+_HIERARCHIES: dict[str, type[DiagnosisEnum | AnatomSiteEnum]] = {
+    "diagnosis": DiagnosisEnum,
+    "anatom_site": AnatomSiteEnum,
+}
+
+# The fields searched as keywords, along with the full hierarchical values their levels are
+# derived from
+_DICTIONARY_FIELDS = [
+    field_name
+    for field_name in ARROW_SCHEMA.names
+    if field_name in _HIERARCHIES
+    or (
+        field_name in FIELD_REGISTRY
+        and (search := FIELD_REGISTRY[field_name].search) is not None
+        and search.es_property.get("type") == "keyword"
+    )
+]
+
+
+class MetadataParquetWriter:
+    """
+    Write validated metadata to a Parquet file, one row group at a time.
+
+    Rows are buffered until there are enough for a row group, so rows can be written as they're
+    validated, e.g. from a ValidationStream, without holding the whole upload in memory.
+    """
+
+    def __init__(
+        self, where: str | Path | pa.NativeFile, *, row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+    ) -> None:
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be at least 1.")
+
+        self.row_group_size = row_group_size
+        self._pending: list[MetadataRow] = []
+        # Arrow stores its own schema in the file by default, but pyarrow then doesn't use the
+        # statistics of dictionary columns to skip row groups. Files are always read with
+        # ARROW_SCHEMA, so those columns are dictionary arrays once read regardless.
+        self._writer = pq.ParquetWriter(
+            where,
+            ARROW_SCHEMA,
+            use_dictionary=_DICTIONARY_FIELDS,
+            compression="zstd",
+            store_schema=False,
+        )
+
+    def write_rows(self, rows: Iterable[MetadataRow]) -> None:
+        pending = self._pending
+        for row in rows:
+            pending.append(row)
+            if len(pending) == self.row_group_size:
+                self._flush_rows()
+
+    def write_table(self, table: pa.Table | pa.RecordBatch) -> None:
+        """Write a table of validated metadata, e.g. ArrowValidationResult.table."""
+        self._flush_rows()
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+
+        self._writer.write_table(
+            table.select(ARROW_SCHEMA.names).cast(ARROW_SCHEMA), self.row_group_size
+        )
+
+    def _flush_rows(self) -> None:
+        if self._pending:
+            self._writer.write_table(rows_to_arrow(self._pending), self.row_group_size)
+            self._pending.clear()
+
+    def close(self) -> None:
+        self._flush_rows()
+        self._writer.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _filter_expression(field_name: str, value: Any) -> ds.Expression:
+    values = (
+        list(value) if isinstance(value, Collection) and not isinstance(value, str) else [value]
+    )
+
+    hierarchical_field, _, level = field_name.rpartition("_")
+    if hierarchical_field in _HIERARCHIES and level.isdigit():
+        # levels aren't stored, so they're matched through the full values they're derived from
+        codes = _HIERARCHIES[hierarchical_field].codes()
+        matches = set(values)
+        field_name = hierarchical_field
+        values = [
+            member
+            for member, levels in zip(codes.members, codes.levels, strict=True)
+            if levels[int(level) - 1] in matches
+        ]
+
+    value_type = ARROW_SCHEMA.field(field_name).type
+    if pa.types.is_dictionary(value_type):
+        value_type = value_type.value_type
+    return pc.field(field_name).isin(pa.array(values, value_type))
+
+
+def read_parquet(
+    source: str | Path | list[str] | list[Path],
+    *,
+    columns: Sequence[str] | None = None,
+    filters: Mapping[str, Any] | None = None,
+    batch_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Read validated metadata from Parquet files, or directories of them, one batch at a time.
+
+    columns limits the fields which are read. filters maps fields of the registry to a value, or
+    a collection of values, which rows must have. Filters are pushed down to the files, so row
+    groups whose statistics rule out any match are skipped. The levels of hierarchical fields,
+    e.g. diagnosis_2, can be filtered on, and expanded from a batch with e.g.
+    DiagnosisEnum.expand_levels(batch["diagnosis"]).
+    """
+    columns = list(ARROW_SCHEMA.names if columns is None else columns)
+    unknown_columns = [column for column in columns if column not in ARROW_SCHEMA.names]
+    if unknown_columns:
+        raise ValueError(f"Unknown columns: {', '.join(unknown_columns)}.")
+
+    expression = None
+    for field_name, value in (filters or {}).items():
+        if field_name not in FIELD_REGISTRY:
+            raise ValueError(f"{field_name} can't be filtered on, it isn't a registry field.")
+
+        field_expression = _filter_expression(field_name, value)
+        expression = field_expression if expression is None else expression & field_expression
+
+    dataset = ds.dataset(source, schema=ARROW_SCHEMA, format="parquet")
+    return cast(
+        "Iterator[pa.RecordBatch]",
+        dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size),
+    )
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# The code of a row which doesn't have a value in a column
+_ABSENT = -1
+
+# The typecodes codes are stored with, each used until a column has more distinct values than it
+# can hold
+_TYPECODES = (("b", 2**7 - 1), ("h", 2**15 - 1), ("i", 2**31 - 1))
+
+
+class _Column:
+    """The values of one unstructured column, each distinct value being stored once."""
+
+    __slots__ = ("codes", "positions", "typecode", "values")
+
+    def __init__(self) -> None:
+        self.typecode = 0
+        # the code of each row, rows beyond the end not having a value
+        self.codes: array[int] = array(_TYPECODES[0][0])
+        self.values: list[Any] = []
+        # the code of each distinct value, only kept while rows are added
+        self.positions: dict[Any, int] | None = {}
+
+    def add(self, index: int, value: Any) -> None:
+        positions = self.positions
+        if positions is None:
+            raise RuntimeError("Rows can't be added once the columns are sealed.")
+
+        try:
+            code = positions[value]
+        except KeyError:
+            code = positions[value] = self._add_value(value)
+        except TypeError:
+            # unhashable values, e.g. lists of surplus CSV cells, are stored once per row
+            code = self._add_value(value)
+
+        codes = self.codes
+        if len(codes) < index:
+            codes.extend([_ABSENT] * (index - len(codes)))
+        codes.append(code)
+
+    def _add_value(self, value: Any) -> int:
+        code = len(self.values)
+        if code > _TYPECODES[self.typecode][1]:
+            self.typecode += 1
+            self.codes = array(_TYPECODES[self.typecode][0], self.codes)
+
+        self.values.append(value)
+        return code
+
+
+class UnstructuredColumns:
+    """
+    The unstructured values of a batch of rows, stored column by column.
+
+    Column names are stored once for the batch, and each column stores its distinct values once
+    along with a compact array of codes, one per row, so a cell costs as little as a byte. Rows
+    read their values through an UnstructuredRow, a read-only mapping which takes the place of a
+    dict per row.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        self._num_rows = 0
+        self._columns: dict[str, _Column] = {key: _Column() for key in keys}
+        # the columns of the keys given, see append_values
+        self._initial_columns = tuple(self._columns.values())
+
+    def __len__(self) -> int:
+        return self._num_rows
+
+    def keys(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    def append(self, values: Mapping[str, Any]) -> UnstructuredRow:
+        """Add the unstructured values of a row, returning a view of them."""
+        index = self._num_rows
+        columns = self._columns
+        for key, value in values.items():
+            try:
+                column = columns[key]
+            except KeyError:
+                column = columns[key] = _Column()
+            column.add(index, value)
+
+        self._num_rows += 1
+        return UnstructuredRow(columns, index)
+
+    def append_values(self, values: Sequence[Any]) -> UnstructuredRow:
+        """Add a row with a value for each of the keys the columns were created with, in order."""
+        index = self._num_rows
+        for column, value in zip(self._initial_columns, values, strict=True):
+            column.add(index, value)
+
+        self._num_rows += 1
+        return UnstructuredRow(self._columns, index)
+
+    def row(self, index: int) -> UnstructuredRow:
+        if not 0 <= index < self._num_rows:
+            raise IndexError(index)
+
+        return UnstructuredRow(self._columns, index)
+
+    def column(self, key: str) -> list[Any]:
+        """Return the values of a column, None for rows without a value."""
+        column = self._columns[key]
+        values = [*column.values, None]
+        codes = column.codes
+        return [values[code] for code in codes] + [None] * (self._num_rows - len(codes))
+
+    def seal(self) -> None:
+        """Drop what's only needed to add rows, once every row of the batch is added."""
+        for column in self._columns.values():
+            column.positions = None
+
+
+class UnstructuredRow(Mapping[str, Any]):
+    """
+    A read-only view of the unstructured values of one row of an UnstructuredColumns.
+
+    This compares equal to a dict of the same values. Copying or pickling a view gives a dict, so
+    a row never carries the rest of its batch along with it.
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: dict[str, _Column], index: int) -> None:
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._columns[key]
+        codes = column.codes
+        index = self._index
+        if index < len(codes) and (code := codes[index]) != _ABSENT:
+            return column.values[code]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._index
+        for key, column in self._columns.items():
+            codes = column.codes
+            if index < len(codes) and codes[index] != _ABSENT:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self) -> tuple[type[dict[str, Any]], tuple[dict[str, Any]]]:
+        return dict, (dict(self),)
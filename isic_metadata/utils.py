@@ -8,6 +8,11 @@ if TYPE_CHECKING:
     from collections.abc import Sequence
 
 
+# Columns of an upload which are neither fields nor unstructured metadata
+RESERVED_COLUMNS = frozenset({"filename", "isic_id"})
+
+_NOT_UNSTRUCTURED_COLUMNS = frozenset(MetadataRow.model_fields) | RESERVED_COLUMNS
+
+
 def get_unstructured_columns(column_names: Sequence[str]) -> list[str]:
-    reserved_columns = {"filename", "isic_id"}
-    return sorted(set(column_names) - set(MetadataRow.model_fields.keys()) - reserved_columns)
+    return sorted(set(column_names) - _NOT_UNSTRUCTURED_COLUMNS)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from decimal import Decimal
+import itertools
+from typing import Any
+
+from hypothesis import given
+from hypothesis import strategies as st
+import pyarrow as pa
+from pydantic import ValidationError
+
+from isic_metadata.arrow import ARROW_ERRORS_SCHEMA, ARROW_SCHEMA, validate_arrow
+from isic_metadata.fields import ImageTypeEnum
+from isic_metadata.metadata import MetadataRow
+
+# A pool of raw values per column as they'd be read from a CSV, mixing valid, invalid and blank
+# values.
+COLUMN_VALUES: dict[str, list[str | None]] = {
+    "age": ["54", " 85+", "102", "-1", "foo", "", None],
+    "sex": ["male", " FEMALE ", "other", ""],
+    "diagnosis": ["Melanoma Invasive", "Nevus", "Benign", "not a diagnosis", ""],
+    "anatom_site": ["Scalp", "Head and neck:Head", "nowhere", " "],
+    "diagnosis_confirm_type": ["histopathology", "Single image expert consensus", ""],
+    "clin_size_long_diam_mm": ["4mm", "3.25 CM", "12um", "1000 mm", "big", ""],
+    "mel_thick_mm": [".33mm", "1.5", "thick", ""],
+    "mel_ulcer": ["true", "False", "maybe", ""],
+    "concomitant_biopsy": ["True", "0", ""],
+    "image_type": ["dermoscopic", "RCM: tile", "TBP tile: overview", "clinical: overview", ""],
+    "dermoscopic_type": ["contact polarized", ""],
+    "tbp_tile_type": ["3D: XP", ""],
+    "rcm_case_id": ["case1", ""],
+    "patient_id": ["IP_1", " IP_2", ""],
+    "extra": ["anything", ""],
+}
+
+
+def row_errors(values: dict[str, Any]) -> list[tuple[str | None, str, str]]:
+    try:
+        MetadataRow.model_validate(values)
+    except ValidationError as e:
+        return [
+            (str(error["loc"][0]) if error["loc"] else None, error["type"], error["msg"])
+            for error in e.errors()
+        ]
+    return []
+
+
+@given(
+    rows=st.lists(
+        st.fixed_dictionaries(
+            # always include one column so the number of rows is known
+            {"extra": st.sampled_from(COLUMN_VALUES["extra"])},
+            optional={k: st.sampled_from(v) for k, v in COLUMN_VALUES.items() if k != "extra"},
+        ),
+        min_size=1,
+        max_size=20,
+    ),
+    num_chunks=st.integers(min_value=1, max_value=3),
+)
+def test_validate_arrow_matches_metadata_row(rows: list[dict[str, Any]], num_chunks: int) -> None:
+    columns = {
+        column: pa.array([row.get(column) for row in rows], pa.string())
+        for column in sorted({k for row in rows for k in row})
+    }
+    bounds = [i * len(rows) // num_chunks for i in range(num_chunks + 1)]
+    batch = pa.record_batch(columns)
+    table = pa.Table.from_batches(
+        [batch.slice(start, stop - start) for start, stop in itertools.pairwise(bounds)]
+    )
+    result = validate_arrow(table)
+
+    assert result.table.schema == ARROW_SCHEMA
+    assert result.errors.schema == ARROW_ERRORS_SCHEMA
+    assert result.unstructured.column_names == ["extra"]
+
+    errors = result.errors.to_pylist()
+    validated = result.table.to_pylist()
+    for i in range(len(rows)):
+        values = {column: column_values[i].as_py() for column, column_values in columns.items()}
+        expected_errors = row_errors(dict(values))
+
+        assert [
+            (error["field"], error["type"], error["message"])
+            for error in errors
+            if error["row"] == i
+        ] == expected_errors
+        assert result.valid[i].as_py() is not expected_errors
+
+        if not expected_errors:
+            metadata = MetadataRow.model_validate(dict(values))
+            assert validated[i] == {
+                field_name: getattr(metadata, field_name) for field_name in ARROW_SCHEMA.names
+            }
+
+
+def buffer_addresses(column: pa.ChunkedArray) -> list[int | None]:
+    return [
+        buffer.address if buffer else None for chunk in column.chunks for buffer in chunk.buffers()
+    ]
+
+
+def test_validate_arrow_keeps_unchanged_columns() -> None:
+    table = pa.table(
+        {
+            "patient_id": pa.array(["IP_1", "IP_2", None]),
+            "lesion_id": pa.array(["IL_1", " IL_2", None]),
+            "acquisition_day": pa.array([1, 2, None]),
+            "melanocytic": pa.array([True, False, None]),
+            "image_type": pa.DictionaryArray.from_arrays(
+                pa.array([0, 1, None], pa.int32()), [member.value for member in ImageTypeEnum]
+            ),
+            "age": pa.array([54, 90, None]),
+        }
+    )
+    result = validate_arrow(table)
+
+    assert result.errors.num_rows == 0
+    for field_name in ["patient_id", "acquisition_day", "melanocytic", "image_type"]:
+        assert buffer_addresses(result.table[field_name]) == buffer_addresses(table[field_name])
+
+    # stripped and clamped values are copied
+    assert result.table["lesion_id"].to_pylist() == ["IL_1", "IL_2", None]
+    assert result.table["age"].to_pylist() == [54, 85, None]
+
+
+def test_validate_arrow_typed_columns() -> None:
+    result = validate_arrow(
+        pa.record_batch(
+            {
+                "sex": ["male", " FEMALE", None],
+                "clin_size_long_diam_mm": ["4mm", "3.25 CM", None],
+                "diagnosis": ["Nevus", None, "Benign"],
+            }
+        )
+    )
+
+    assert result.table["sex"].type == pa.dictionary(pa.int32(), pa.string())
+    assert result.table["sex"].to_pylist() == ["male", "female", None]
+    assert result.table["clin_size_long_diam_mm"].to_pylist() == [
+        Decimal("4.00"),
+        Decimal("32.50"),
+        None,
+    ]
+    assert result.table["diagnosis"].to_pylist() == [
+        "Benign:Benign melanocytic proliferations:Nevus",
+        None,
+        "Benign",
+    ]
+
+
+def test_validate_arrow_hierarchical_levels() -> None:
+    result = validate_arrow(
+        pa.record_batch(
+            {
+                "diagnosis_1": ["Benign", "Malignant"],
+                "diagnosis_2": ["Benign melanocytic proliferations", ""],
+            }
+        )
+    )
+    assert result.table["diagnosis"].to_pylist() == [
+        "Benign:Benign melanocytic proliferations",
+        "Malignant",
+    ]
+    assert result.unstructured.num_columns == 0
+
+
+def test_validate_arrow_ignore_rcm_model_checks() -> None:
+    batch = pa.record_batch({"rcm_case_id": ["foo"]})
+
+    assert validate_arrow(batch).errors.to_pylist() == [
+        {
+            "row": 0,
+            "field": None,
+            "type": "missing_field",
+            "message": row_errors({"rcm_case_id": "foo"})[0][2],
+        }
+    ]
+    assert validate_arrow(batch, ignore_rcm_model_checks=True).errors.num_rows == 0
+
+
+def test_validate_arrow_no_rows() -> None:
+    result = validate_arrow(pa.table({"age": pa.array([], pa.string())}))
+    assert result.table.num_rows == 0
+    assert len(result.valid) == 0
+    assert result.errors.num_rows == 0
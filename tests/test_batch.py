@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import json
+from typing import Any
+
+from hypothesis import given
+from hypothesis import strategies as st
 from pydantic import ValidationError
 import pytest
 
-from isic_metadata.metadata import MetadataBatch, MetadataRow
+from isic_metadata.metadata import BatchCheckState, MetadataBatch, MetadataRow
 
 
 def test_batch() -> None:
@@ -78,3 +85,136 @@ def test_blank_rcm_cases_dont_belong_to_same_lesion() -> None:
             MetadataRow(rcm_case_id="", lesion_id="barlesion"),
         ]
     )
+
+
+def test_batch_raises_first_violation_only() -> None:
+    with pytest.raises(ValidationError) as excinfo:
+        MetadataBatch(
+            items=[
+                MetadataRow(
+                    lesion_id="l1",
+                    patient_id="p1",
+                    rcm_case_id="c1",
+                    image_type="RCM: macroscopic",
+                    _ignore_rcm_model_checks=True,
+                ),
+                MetadataRow(
+                    lesion_id="l2",
+                    patient_id="p1",
+                    rcm_case_id="c1",
+                    image_type="RCM: macroscopic",
+                    _ignore_rcm_model_checks=True,
+                ),
+                MetadataRow(lesion_id="l2", patient_id="p2"),
+            ]
+        )
+    assert [error["type"] for error in excinfo.value.errors()] == ["one_lesion_multiple_patients"]
+    assert excinfo.value.errors()[0]["ctx"] == {"examples": ["l2"]}
+
+
+def reference_batch_errors(rows: list[MetadataRow]) -> list[tuple[str, list[str]]]:
+    # the checks MetadataBatch originally performed, one loop each
+    lesion_to_patients: dict[str, set[str]] = defaultdict(set)
+    rcm_case_to_macroscopic: dict[str, int] = defaultdict(int)
+    rcm_case_to_lesions: dict[str, set[str]] = defaultdict(set)
+    for row in rows:
+        if row.patient_id and row.lesion_id:
+            lesion_to_patients[row.lesion_id].add(row.patient_id)
+        if row.rcm_case_id and row.image_type == "RCM: macroscopic":
+            rcm_case_to_macroscopic[row.rcm_case_id] += 1
+        if row.rcm_case_id and row.lesion_id:
+            rcm_case_to_lesions[row.rcm_case_id].add(row.lesion_id)
+
+    errors = [
+        ("one_lesion_multiple_patients", [k for k, v in lesion_to_patients.items() if len(v) > 1]),
+        ("rcm_multiple_macroscopics", [k for k, v in rcm_case_to_macroscopic.items() if v > 1]),
+        (
+            "one_rcm_case_multiple_lesions",
+            [k for k, v in rcm_case_to_lesions.items() if len(v) > 1],
+        ),
+    ]
+    return [(type_, examples[:5]) for type_, examples in errors if examples]
+
+
+batch_rows = st.lists(
+    st.builds(
+        lambda values: MetadataRow(**values, _ignore_rcm_model_checks=True),
+        st.fixed_dictionaries(
+            {},
+            optional={
+                "lesion_id": st.sampled_from(["", "l1", "l2", "l3"]),
+                "patient_id": st.sampled_from(["", "p1", "p2"]),
+                "rcm_case_id": st.sampled_from(["", "c1", "c2"]),
+                "image_type": st.sampled_from(["RCM: macroscopic", "RCM: tile", "dermoscopic"]),
+            },
+        ),
+    ),
+    max_size=12,
+)
+
+
+def state_errors(state: BatchCheckState) -> list[tuple[str, Any]]:
+    return [(error["type"], error["ctx"]["examples"]) for error in state.finalize()]
+
+
+@given(rows=batch_rows, chunk_size=st.integers(min_value=1, max_value=5))
+def test_batch_state_matches_reference(rows: list[MetadataRow], chunk_size: int) -> None:
+    state = BatchCheckState()
+    state.update(rows)
+    assert state_errors(state) == reference_batch_errors(rows)
+
+    merged = BatchCheckState()
+    for i in range(0, len(rows), chunk_size):
+        chunk_state = BatchCheckState()
+        chunk_state.update(rows[i : i + chunk_size])
+        merged.merge(chunk_state)
+    assert state_errors(merged) == reference_batch_errors(rows)
+
+
+def shard_state(shard: list[dict[str, str]]) -> dict[str, Any]:
+    state = BatchCheckState()
+    state.update(MetadataRow(**values, _ignore_rcm_model_checks=True) for values in shard)
+    return state.to_dict()
+
+
+def test_batch_check_state_across_processes() -> None:
+    shards = [
+        [
+            {"lesion_id": "l1", "patient_id": "p1"},
+            {"rcm_case_id": "c1", "lesion_id": "l1", "image_type": "RCM: macroscopic"},
+        ],
+        [{"lesion_id": "l2", "patient_id": "p2"}],
+        [
+            {"lesion_id": "l1", "patient_id": "p2"},
+            {"rcm_case_id": "c1", "lesion_id": "l2", "image_type": "RCM: macroscopic"},
+        ],
+    ]
+
+    # each process stands in for a node, sending its state to the coordinator as JSON
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        states = [json.loads(json.dumps(state)) for state in executor.map(shard_state, shards)]
+
+    coordinator = BatchCheckState()
+    for state in states:
+        coordinator.merge(BatchCheckState.from_dict(state))
+
+    rows = [
+        MetadataRow(**values, _ignore_rcm_model_checks=True) for shard in shards for values in shard
+    ]
+    expected = BatchCheckState()
+    expected.update(rows)
+    assert coordinator.finalize() == expected.finalize()
+    assert [(error["type"], error["ctx"]) for error in coordinator.finalize()] == [
+        ("one_lesion_multiple_patients", {"examples": ["l1"]}),
+        ("rcm_multiple_macroscopics", {"examples": ["c1"]}),
+        ("one_rcm_case_multiple_lesions", {"examples": ["c1"]}),
+    ]
+
+    with pytest.raises(ValidationError) as excinfo:
+        MetadataBatch(items=rows)
+    assert excinfo.value.errors()[0]["type"] == coordinator.finalize()[0]["type"]
+
+
+def test_batch_check_state_from_dict_mismatch() -> None:
+    with pytest.raises(ValueError, match="doesn't match"):
+        BatchCheckState.from_dict({"checks": []})
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+from hypothesis import given
+from hypothesis import strategies as st
+from pydantic import ValidationError
+import pytest
+
+from isic_metadata.cache import CacheInfo, LRUCache, bounded_cache
+from isic_metadata.metadata import CoercionCache, MetadataRow, validate_columns
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, str] = LRUCache(maxsize=2)
+    cache.get_or_compute("a", str.upper)
+    cache.get_or_compute("b", str.upper)
+    cache.get_or_compute("a", str.upper)
+    cache.get_or_compute("c", str.upper)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.cache_info() == CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+
+    cache.clear()
+    assert cache.cache_info() == CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_lru_cache_resize_evicts() -> None:
+    cache: LRUCache[str, str] = LRUCache(maxsize=3)
+    for key in "abc":
+        cache.get_or_compute(key, str.upper)
+
+    cache.resize(1)
+    assert len(cache) == 1
+    assert "c" in cache
+
+    with pytest.raises(ValueError, match="non-negative"):
+        cache.resize(-1)
+
+
+def test_bounded_cache() -> None:
+    calls = []
+
+    @bounded_cache(maxsize=2)
+    def upper(value: str) -> str:
+        calls.append(value)
+        return value.upper()
+
+    assert upper("a") == "A"
+    assert upper("a") == "A"
+    assert calls == ["a"]
+
+    upper.cache_warm(["b", "c"])
+    assert upper.cache_info() == CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+
+    upper.cache_resize(1)
+    assert upper.cache_info().currsize == 1
+
+    upper.cache_clear()
+    assert upper.cache_info() == CacheInfo(hits=0, misses=0, maxsize=1, currsize=0)
+
+
+def test_coercion_cache_caches_values_and_errors() -> None:
+    cache = CoercionCache()
+    assert cache.coerce("age", "85+") == (85, None)
+    assert cache.coerce("age", "85+") == (85, None)
+
+    _, errors = cache.coerce("age", "foo")
+    assert errors
+    assert errors[0]["loc"] == ("age",)
+    assert cache.coerce("age", "foo")[1] == errors
+
+    assert cache.cache_info().hits == 2
+    assert cache.cache_info().misses == 2
+
+
+def test_coercion_cache_keys_by_type() -> None:
+    cache = CoercionCache()
+    assert cache.coerce("patient_id", 1) == ("1", None)
+    assert cache.coerce("patient_id", 1.0) == ("1.0", None)
+
+
+ROW_VALUES: dict[str, list[Any]] = {
+    "age": ["54", "85+", "90", " 7", "-1", "foo"],
+    "sex": ["male", " FEMALE ", "other"],
+    "diagnosis": ["Melanoma Invasive", "Nevus", "nope", ""],
+    "diagnosis_1": ["Benign", "Malignant"],
+    "clin_size_long_diam_mm": ["4mm", "3.25 CM", "big"],
+    "mel_ulcer": ["true", "False", "maybe", "YES", " 0 "],
+    "melanocytic": ["1", "Off", "oui", True],
+    "acquisition_day": ["12", "5000", "1.5"],
+    "image_type": ["dermoscopic", "RCM: tile", "TBP tile: overview", "clinical: overview"],
+    "dermoscopic_type": ["contact polarized"],
+    "tbp_tile_type": ["3D: XP"],
+    "rcm_case_id": ["case1"],
+    "patient_id": ["IP_1", 12],
+    "extra": ["anything"],
+}
+
+
+@given(
+    rows=st.lists(
+        st.fixed_dictionaries({}, optional={k: st.sampled_from(v) for k, v in ROW_VALUES.items()}),
+        max_size=10,
+    )
+)
+def test_validate_with_cache_matches_model_validate(rows: list[dict[str, Any]]) -> None:
+    cache = CoercionCache(maxsize=8)
+
+    for values in rows:
+        try:
+            expected = MetadataRow.model_validate(dict(values))
+        except ValidationError as e:
+            expected_errors = e.errors()
+        else:
+            metadata = MetadataRow.validate_with_cache(values, cache)
+            assert metadata == expected
+            assert metadata.model_fields_set == expected.model_fields_set
+            assert metadata.model_dump() == expected.model_dump()
+            continue
+
+        with pytest.raises(ValidationError) as excinfo:
+            MetadataRow.validate_with_cache(values, cache)
+        assert excinfo.value.errors() == expected_errors
+
+
+def test_validate_with_cache_ignore_rcm_model_checks() -> None:
+    cache = CoercionCache()
+    with pytest.raises(ValidationError):
+        MetadataRow.validate_with_cache({"rcm_case_id": "foo"}, cache)
+    MetadataRow.validate_with_cache({"rcm_case_id": "foo"}, cache, _ignore_rcm_model_checks=True)
+
+
+def test_validate_columns_with_coercion_cache() -> None:
+    cache = CoercionCache()
+    validate_columns({"sex": ["male", "female"]}, coercion_cache=cache)
+    validate_columns({"sex": ["male"]}, coercion_cache=cache)
+    assert cache.cache_info().hits == 1
+
+
+def test_coercion_cache_spelling_usage() -> None:
+    cache = CoercionCache(track_spellings=True)
+    for values in [{"melanocytic": "True", "age": "85+"}, {"melanocytic": "Oui"}, {}]:
+        cache.coerce_row(values)
+    validate_columns({"melanocytic": ["True", "no", None]}, coercion_cache=cache)
+
+    assert cache.spelling_usage() == {
+        "age": Counter({"85+": 1}),
+        "melanocytic": Counter({"True": 2, "Oui": 1, "no": 1}),
+    }
+
+    cache.clear()
+    assert cache.spelling_usage() == {}
+
+    with pytest.raises(RuntimeError):
+        CoercionCache().spelling_usage()
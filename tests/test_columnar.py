@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Any
+
+from hypothesis import given
+from hypothesis import strategies as st
+from pydantic import ValidationError
+import pytest
+
+from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+from isic_metadata.metadata import (
+    _CROSS_FIELD_RULES,
+    MetadataRow,
+    validate_columns,
+)
+
+# A pool of raw values per column, mixing valid, invalid and blank values.
+COLUMN_VALUES: dict[str, list[Any]] = {
+    "age": ["54", " 85+", "102", "-1", "foo", "", None, 30],
+    "sex": ["male", " FEMALE ", "other", ""],
+    "diagnosis": ["Melanoma Invasive", "Nevus", "Benign", "not a diagnosis", ""],
+    "anatom_site": ["Scalp", "Head and neck:Head", "nowhere", " "],
+    "diagnosis_confirm_type": ["histopathology", "Single image expert consensus", ""],
+    "clin_size_long_diam_mm": ["4mm", "3.25 CM", "12um", "1000 mm", "big", ""],
+    "mel_thick_mm": [".33mm", "1.5", "thick", ""],
+    "mel_ulcer": ["true", "False", "maybe", ""],
+    "concomitant_biopsy": ["True", "0", ""],
+    "image_type": ["dermoscopic", "RCM: tile", "TBP tile: overview", "clinical: overview", ""],
+    "dermoscopic_type": ["contact polarized", ""],
+    "tbp_tile_type": ["3D: XP", ""],
+    "rcm_case_id": ["case1", ""],
+    "patient_id": ["IP_1", 12, 12.0, ""],
+    "extra": ["anything", ""],
+}
+
+
+def row_errors(values: dict[str, Any]) -> list[dict[str, Any]] | None:
+    try:
+        MetadataRow.model_validate(values)
+    except ValidationError as e:
+        return [{k: v for k, v in error.items() if k != "url"} for error in e.errors()]
+    return None
+
+
+def columnar_errors(errors: list[Any]) -> list[dict[str, Any]]:
+    return [{k: v for k, v in error.items() if k != "url"} for error in errors]
+
+
+@given(
+    rows=st.lists(
+        st.fixed_dictionaries(
+            # always include one column so the number of rows is known
+            {"extra": st.sampled_from(COLUMN_VALUES["extra"])},
+            optional={k: st.sampled_from(v) for k, v in COLUMN_VALUES.items() if k != "extra"},
+        ),
+        min_size=1,
+        max_size=20,
+    )
+)
+def test_validate_columns_matches_metadata_row(rows: list[dict[str, Any]]) -> None:
+    columns = {
+        column: [row.get(column) for row in rows] for column in {k for row in rows for k in row}
+    }
+    result = validate_columns(columns)
+
+    for i in range(len(rows)):
+        values = {column: column_values[i] for column, column_values in columns.items()}
+        expected_errors = row_errors(dict(values))
+
+        if expected_errors:
+            assert columnar_errors(result.errors[i]) == expected_errors
+            assert all(column_values[i] is None for column_values in result.columns.values())
+        else:
+            assert i not in result.errors
+            metadata = MetadataRow.model_validate(dict(values))
+            for field_name, column_values in result.columns.items():
+                assert column_values[i] == getattr(metadata, field_name)
+                assert type(column_values[i]) is type(getattr(metadata, field_name))
+            assert {
+                column: column_values[i] for column, column_values in result.unstructured.items()
+            } == metadata.unstructured
+
+
+def test_validate_columns_hierarchical_levels() -> None:
+    result = validate_columns(
+        {
+            "diagnosis": ["", "Nevus", None],
+            "diagnosis_1": ["Benign", "Malignant", "Benign"],
+            "diagnosis_2": ["Benign melanocytic proliferations", "", ""],
+        }
+    )
+    assert not result.errors
+    assert result.columns["diagnosis"] == [
+        "Benign:Benign melanocytic proliferations",
+        "Benign:Benign melanocytic proliferations:Nevus",
+        "Benign",
+    ]
+    assert "diagnosis_1" not in result.unstructured
+
+
+def test_validate_columns_ignore_rcm_model_checks() -> None:
+    assert validate_columns({"rcm_case_id": ["foo"]}).errors
+    assert not validate_columns({"rcm_case_id": ["foo"]}, ignore_rcm_model_checks=True).errors
+
+
+def test_validate_columns_valid_mask() -> None:
+    result = validate_columns({"age": ["1", "foo", "3"]})
+    assert result.valid == [True, False, True]
+    assert result.columns["age"] == [1, None, 3]
+
+
+def test_validate_columns_mismatched_lengths() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        validate_columns({"age": ["1"], "sex": []})
+
+
+def test_cross_field_rules_cover_model_validators() -> None:
+    model_validators = [
+        name
+        for name, decorator in MetadataRow.__pydantic_decorators__.model_validators.items()
+        if decorator.info.mode == "after"
+    ]
+    assert [rule.name for rule in _CROSS_FIELD_RULES] == model_validators
+
+
+def test_validate_columns_hierarchy_codes() -> None:
+    result = validate_columns({"diagnosis": ["Nevus", "", "not a diagnosis"]})
+
+    codes = result.hierarchy_codes("diagnosis")
+    assert DiagnosisEnum.codes().decode_many(codes) == [
+        DiagnosisEnum.benign_benign_melanocytic_proliferations_nevus,
+        None,
+        None,
+    ]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import Any
+
+from hypothesis import given, reject
+from hypothesis import strategies as st
+from pydantic import ValidationError
+import pytest
+
+from isic_metadata.metadata import CoercionCache, MetadataRow
+
+# A pool of raw values per column, mixing valid, invalid and blank values.
+ROW_VALUES: dict[str, list[Any]] = {
+    "age": ["54", "85+", "-1"],
+    "sex": ["male", " FEMALE ", "other"],
+    "diagnosis": ["Melanoma Invasive", "Nevus", "nope", ""],
+    "anatom_site": ["Scalp", "Head and neck:Head", ""],
+    "diagnosis_confirm_type": ["histopathology", ""],
+    "mel_thick_mm": [".33mm", "thick", ""],
+    "mel_ulcer": ["true", "False", "maybe"],
+    "concomitant_biopsy": ["True", "0"],
+    "image_type": ["dermoscopic", "RCM: tile", "TBP tile: overview", "clinical: overview"],
+    "dermoscopic_type": ["contact polarized", ""],
+    "rcm_case_id": ["case1"],
+    "tbp_tile_type": ["3D: XP"],
+    "extra": ["anything"],
+}
+
+# Values an edit may set besides those of a row.
+CHANGE_VALUES: dict[str, list[Any]] = {**ROW_VALUES, "other": ["x"]}
+
+# Hierarchical levels an edit may set, as a row read back from the database would have them.
+LEVEL_VALUES: dict[str, list[Any]] = {
+    "diagnosis_1": ["Benign", "Malignant"],
+    "diagnosis_2": ["Benign melanocytic proliferations", "Melanoma Invasive", ""],
+    "diagnosis_3": ["Nevus", None],
+    "anatom_site_1": ["Head and neck"],
+    "anatom_site_2": ["Head", None],
+}
+
+
+def _changes(values: dict[str, list[Any]]) -> st.SearchStrategy[dict[str, Any]]:
+    # a change of up to a few values
+    return st.lists(
+        st.sampled_from(list(values)).flatmap(
+            lambda k: st.tuples(st.just(k), st.sampled_from(values[k]))
+        ),
+        max_size=3,
+    ).map(dict)
+
+
+ROWS = st.fixed_dictionaries({}, optional={k: st.sampled_from(v) for k, v in ROW_VALUES.items()})
+
+
+def _errors(e: ValidationError) -> list[dict[str, Any]]:
+    # a cross-field error's input is every value of the row, which is only known once coerced
+    return [{**error, "input": None} if error["loc"] == () else dict(error) for error in e.errors()]
+
+
+@given(values=ROWS, changes=_changes(CHANGE_VALUES))
+def test_with_changes_matches_model_validate(
+    values: dict[str, Any], changes: dict[str, Any]
+) -> None:
+    try:
+        metadata = MetadataRow.model_validate(dict(values))
+    except ValidationError:
+        reject()
+
+    try:
+        expected = MetadataRow.model_validate({**values, **changes})
+    except ValidationError as e:
+        expected_errors = _errors(e)
+    else:
+        for cache in [None, CoercionCache()]:
+            edited = metadata.with_changes(changes, cache)
+            assert edited == expected
+            assert edited.model_fields_set == expected.model_fields_set
+            assert edited.model_dump() == expected.model_dump()
+        return
+
+    with pytest.raises(ValidationError) as excinfo:
+        metadata.with_changes(changes)
+    assert _errors(excinfo.value) == expected_errors
+
+
+# a change of the field itself replaces the row's levels, so isn't combined with its dumped ones
+@given(
+    values=ROWS,
+    changes=_changes(
+        {
+            **{k: v for k, v in CHANGE_VALUES.items() if k not in {"diagnosis", "anatom_site"}},
+            **LEVEL_VALUES,
+        }
+    ),
+)
+def test_with_changes_levels_match_model_validate(
+    values: dict[str, Any], changes: dict[str, Any]
+) -> None:
+    try:
+        metadata = MetadataRow.model_validate(dict(values))
+    except ValidationError:
+        reject()
+
+    # levels are edited as though the row were revalidated from its dumped levels
+    try:
+        expected = MetadataRow.model_validate({**metadata.model_dump(), **changes})
+    except ValidationError as e:
+        expected_errors = _errors(e)
+    else:
+        edited = metadata.with_changes(changes)
+        assert edited.model_dump() == expected.model_dump()
+        assert edited.diagnosis == expected.diagnosis
+        assert edited.anatom_site == expected.anatom_site
+        return
+
+    with pytest.raises(ValidationError) as excinfo:
+        metadata.with_changes(changes)
+    assert _errors(excinfo.value) == expected_errors
+
+
+def test_with_changes_level() -> None:
+    metadata = MetadataRow.model_validate({"diagnosis": "Benign:Benign melanocytic proliferations"})
+
+    edited = metadata.with_changes({"diagnosis_3": "Nevus"})
+    assert edited.diagnosis == "Benign:Benign melanocytic proliferations:Nevus"
+    assert edited == MetadataRow.model_validate({**metadata.model_dump(), "diagnosis_3": "Nevus"})
+
+
+def test_with_changes_error_input() -> None:
+    metadata = MetadataRow.model_validate({"diagnosis": "Melanoma Invasive", "mel_ulcer": "true"})
+
+    with pytest.raises(ValidationError) as excinfo:
+        metadata.with_changes({"diagnosis": "Nevus", "other": "x"})
+    [error] = excinfo.value.errors()
+    assert "mel_ulcer is incompatible with diagnosis" in error["msg"]
+    assert error["input"] == {
+        "diagnosis": "Nevus",
+        "mel_ulcer": True,
+        "unstructured": {"other": "x"},
+    }
+
+
+def test_with_changes_keeps_ignore_rcm_model_checks() -> None:
+    metadata = MetadataRow(rcm_case_id="foo", _ignore_rcm_model_checks=True)
+    assert metadata.with_changes({"image_type": "dermoscopic"}).image_type == "dermoscopic"
+
+    with pytest.raises(ValidationError):
+        MetadataRow(rcm_case_id="foo").with_changes({"image_type": "dermoscopic"})
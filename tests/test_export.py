@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+from isic_metadata.export import RECORD_KEYS, dump_columns, dump_ndjson, dump_rows
+from isic_metadata.metadata import MetadataBatch, MetadataRow
+
+
+@pytest.fixture
+def rows() -> list[MetadataRow]:
+    rows = [
+        MetadataRow.model_validate(
+            {
+                "age": "54",
+                "sex": "male",
+                "diagnosis": "Nevus",
+                "anatom_site": "Scalp",
+                "clin_size_long_diam_mm": "4.50mm",
+                "image_type": "dermoscopic",
+                "dermoscopic_type": "contact polarized",
+                "patient_id": 'IP_"1"\n',
+                "lesion_id": "IL_1",
+                "notes": "unstructured values aren't dumped",
+            }
+        ),
+        MetadataRow.model_validate({"diagnosis": "Melanoma in situ", "mel_thick_mm": "1.0"}),
+        MetadataRow.model_validate({"anatom_site": "Head and neck:Head", "melanocytic": "false"}),
+        MetadataRow(),
+        MetadataRow.model_construct(diagnosis=DiagnosisEnum.malignant, age=30),
+    ]
+
+    # the levels of a mutated row follow its new value
+    rows[1].diagnosis = DiagnosisEnum.benign
+    rows[1].mel_thick_mm = Decimal("1.00")
+    return rows
+
+
+def test_dump_rows_matches_model_dump(rows: list[MetadataRow]) -> None:
+    records = dump_rows(rows)
+
+    assert records == [row.model_dump() for row in rows]
+    assert [list(record) for record in records] == [list(row.model_dump()) for row in rows]
+    assert list(records[0]) == list(RECORD_KEYS)
+
+
+def test_dump_ndjson_matches_model_dump_json(rows: list[MetadataRow]) -> None:
+    assert dump_ndjson(rows) == b"".join(row.model_dump_json().encode() + b"\n" for row in rows)
+
+
+def test_dump_columns(rows: list[MetadataRow]) -> None:
+    columns = dump_columns(rows)
+
+    assert list(columns) == list(RECORD_KEYS)
+    for key, column in columns.items():
+        assert column == [row.model_dump()[key] for row in rows]
+
+
+def test_dump_batch() -> None:
+    batch = MetadataBatch(items=[MetadataRow(lesion_id="l1"), MetadataRow(lesion_id="l2")])
+
+    assert dump_rows(batch) == [row.model_dump() for row in batch.items]
+    assert dump_columns(batch)["lesion_id"] == ["l1", "l2"]
+
+
+def test_dump_no_rows() -> None:
+    assert dump_rows([]) == []
+    assert dump_ndjson([]) == b""
+    assert dump_columns([]) == {key: [] for key in RECORD_KEYS}
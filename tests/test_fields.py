@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from hypothesis import given
 from hypothesis import strategies as st
@@ -9,7 +9,22 @@ from pydantic import ValidationError
 import pytest
 
 from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
-from isic_metadata.metadata import MetadataRow, convert_errors
+from isic_metadata.fields import (
+    ClinSizeLongDiamMm,
+    DiagnosisConfirmTypeEnum,
+    ImageTypeEnum,
+    MelThickMm,
+)
+from isic_metadata.metadata import (
+    _ENUM_LOOKUPS,
+    CoercionCache,
+    MetadataRow,
+    _field_adapter,
+    convert_errors,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 
 @pytest.mark.parametrize(
@@ -91,6 +106,16 @@ def test_mel_thick_mm(raw: str, parsed: float) -> None:
     assert metadata.mel_thick_mm == parsed
 
 
+@pytest.mark.parametrize(
+    ("raw", "dumped"), [("3mm", "3.0"), ("1.50000mm", "1.5"), ("0.10 mm", "0.1"), (".33mm", "0.33")]
+)
+def test_mel_thick_mm_dumped(raw: str, dumped: str) -> None:
+    # values are stored with the digits they had when they were parsed as floats
+    metadata = MetadataRow.model_validate({"diagnosis": "Melanoma Invasive", "mel_thick_mm": raw})
+    assert metadata.model_dump(mode="json")["mel_thick_mm"] == dumped
+    assert str(MelThickMm.parse_measurements([raw])[0][0]) == dumped
+
+
 def test_mel_thick_mm_invalid() -> None:
     with pytest.raises(ValidationError) as excinfo:
         MetadataRow.model_validate({"mel_thick_mm": "foo"})
@@ -117,3 +142,109 @@ def test_clin_size_long_diam_mm_invalid() -> None:
         MetadataRow.model_validate({"clin_size_long_diam_mm": "foo"})
     assert len(excinfo.value.errors()) == 1
     assert "Unable to parse value as a number" in convert_errors(excinfo.value)[0]["msg"]
+
+
+@pytest.mark.parametrize(
+    ("raw", "parsed"),
+    [
+        ("4mm", Decimal("4.0")),
+        ("1.5 CM", Decimal("15.0")),
+        ("150um", Decimal("0.2")),
+        # rounded exactly, half up, so positive measurements never round to 0
+        ("0.35mm", Decimal("0.4")),
+        ("0.25mm", Decimal("0.3")),
+        ("0.45mm", Decimal("0.5")),
+        ("0.05mm", Decimal("0.1")),
+        ("50um", Decimal("0.1")),
+        ("3.25", Decimal("3.25")),
+    ],
+)
+def test_clin_size_long_diam_mm_units(raw: str, parsed: Decimal) -> None:
+    metadata = MetadataRow.model_validate({"clin_size_long_diam_mm": raw})
+    assert metadata.clin_size_long_diam_mm == parsed
+
+
+@pytest.mark.parametrize(
+    ("field_name", "parse_measurements", "raw"),
+    [
+        (
+            "clin_size_long_diam_mm",
+            ClinSizeLongDiamMm.parse_measurements,
+            ["4mm", " 3.25 CM", "12um", "0.35mm", "999.99", "1000 mm", "1e2cm", "infmm"],
+        ),
+        (
+            "mel_thick_mm",
+            MelThickMm.parse_measurements,
+            [".33mm", "1.5", "14.2   MM", "1.50000", "0.001", "1.2.3mm", "1e1", "1000"],
+        ),
+    ],
+)
+def test_parse_measurements(
+    field_name: str,
+    parse_measurements: Callable[[list[str | None]], tuple[list[Decimal | None], list[bool]]],
+    raw: list[str],
+) -> None:
+    values: list[str | None] = [*raw, "foo", "", None, "4mm"]
+    parsed, invalid = parse_measurements(values)
+
+    for value, parsed_value, is_invalid in zip(values, parsed, invalid, strict=True):
+        try:
+            metadata = MetadataRow.model_validate(
+                {field_name: value, "diagnosis": "Melanoma Invasive"}
+            )
+        except ValidationError:
+            assert is_invalid
+            assert parsed_value is None
+        else:
+            assert not is_invalid
+            assert parsed_value == getattr(metadata, field_name)
+
+
+@given(
+    st.one_of(st.decimals(places=3, allow_nan=False), st.floats(allow_nan=False)).flatmap(
+        lambda number: st.sampled_from([f"{number}", f"{number}mm", f"{number} cm", f"{number}um"])
+    )
+)
+def test_parse_measurements_matches_rows(value: str) -> None:
+    (parsed,), (invalid,) = ClinSizeLongDiamMm.parse_measurements([value])
+    try:
+        metadata = MetadataRow.model_validate({"clin_size_long_diam_mm": value})
+    except ValidationError:
+        assert invalid
+    else:
+        assert parsed == metadata.clin_size_long_diam_mm
+
+
+@pytest.mark.parametrize("field_name", sorted(_ENUM_LOOKUPS))
+def test_normalized_lookup_matches_validation(field_name: str) -> None:
+    for raw, member in _ENUM_LOOKUPS[field_name].items():
+        assert _field_adapter(field_name).validate_python(raw) is member
+
+
+def test_normalized_lookup() -> None:
+    assert (
+        DiagnosisEnum.normalized_lookup()["Nevus"]
+        == DiagnosisEnum.benign_benign_melanocytic_proliferations_nevus
+    )
+    assert (
+        DiagnosisConfirmTypeEnum.normalized_lookup(ignore_case=True)["Histopathology"]
+        == DiagnosisConfirmTypeEnum.histopathology
+    )
+    assert "Histopathology" not in DiagnosisConfirmTypeEnum.normalized_lookup()
+    # values with capitals are never accepted by fields which lowercase them
+    assert "TBP tile: close-up" not in ImageTypeEnum.normalized_lookup(ignore_case=True)
+
+
+@pytest.mark.parametrize(
+    ("field_name", "value", "expected"),
+    [
+        ("image_type", " dermoscopic ", ImageTypeEnum.dermoscopic),
+        ("image_type", "Dermoscopic", None),
+        ("diagnosis_confirm_type", "HISTOPATHOLOGY ", DiagnosisConfirmTypeEnum.histopathology),
+    ],
+)
+def test_coercion_cache_enum_values(field_name: str, value: str, expected: Any) -> None:
+    coerced, errors = CoercionCache().coerce_row({field_name: value})
+    assert coerced[field_name] == expected
+    if expected is None:
+        assert [error["type"] for error in errors] == ["enum"]
@@ -10,20 +10,20 @@ from isic_metadata.metadata import MetadataRow
 @pytest.mark.parametrize(
     ("value", "expected"),
     [
-        ("Head and neck", ["Head and neck", None, None, None, None]),
-        ("Head and neck:Head", ["Head and neck", "Head", None, None, None]),
-        ("Head and neck:Head:Scalp", ["Head and neck", "Head", "Scalp", None, None]),
+        ("Head and neck", ("Head and neck", None, None, None, None)),
+        ("Head and neck:Head", ("Head and neck", "Head", None, None, None)),
+        ("Head and neck:Head:Scalp", ("Head and neck", "Head", "Scalp", None, None)),
         (
             "Head and neck:Head:Scalp:Frontal scalp",
-            ["Head and neck", "Head", "Scalp", "Frontal scalp", None],
+            ("Head and neck", "Head", "Scalp", "Frontal scalp", None),
         ),
         (
             "Head and neck:Head:Ear:Pinna:Helix of pinna",
-            ["Head and neck", "Head", "Ear", "Pinna", "Helix of pinna"],
+            ("Head and neck", "Head", "Ear", "Pinna", "Helix of pinna"),
         ),
     ],
 )
-def test_levels_at_each_depth(value: str, expected: list[str | None]) -> None:
+def test_levels_at_each_depth(value: str, expected: tuple[str | None, ...]) -> None:
     assert AnatomSiteEnum.levels(value) == expected
 
 
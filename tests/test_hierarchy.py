@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from isic_metadata.anatom_site_hierarchical import AnatomSiteEnum
+from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+from isic_metadata.hierarchy import (
+    CACHE_MAXSIZE,
+    NO_CODE,
+    AmbiguousTerminalValueWarning,
+    HierarchyCodes,
+    HierarchyIndex,
+    terminal_value_index,
+)
+from isic_metadata.metadata import MetadataRow
+
+
+def test_terminal_value_index() -> None:
+    assert terminal_value_index(["a:b:c", "a:b", "a"]) == {"c": "a:b:c", "b": "a:b", "a": "a"}
+
+
+def test_terminal_value_index_warns_on_ambiguous_values() -> None:
+    with pytest.warns(AmbiguousTerminalValueWarning, match="'c' -> \\['a:b:c', 'x:c'\\]"):
+        index = terminal_value_index(["a:b:c", "x:c", "a:b"])
+
+    assert index["c"] == "a:b:c"
+
+
+@pytest.mark.parametrize("enum", [AnatomSiteEnum, DiagnosisEnum])
+def test_accept_terminal_values_matches_linear_scan(
+    enum: type[AnatomSiteEnum | DiagnosisEnum],
+) -> None:
+    for member in enum:
+        terminal_value = member.split(":")[-1]
+        expected = next(
+            m for m in enum.reverse_ordered_hierarchy() if m.split(":")[-1] == terminal_value
+        )
+        assert enum.accept_terminal_values(terminal_value) is expected
+
+    assert enum.accept_terminal_values("not a terminal value") == "not a terminal value"
+
+
+def test_levels_are_immutable() -> None:
+    assert isinstance(DiagnosisEnum.levels("Benign"), tuple)
+
+    with pytest.raises(TypeError):
+        DiagnosisEnum.as_dict("Benign")["diagnosis_1"] = "Malignant"  # type: ignore[index]
+
+
+def test_hierarchy_caches_are_bounded() -> None:
+    for i in range(CACHE_MAXSIZE * 2):
+        AnatomSiteEnum.levels(f"junk {i}")
+        DiagnosisEnum.as_dict(f"junk {i}")
+
+    assert AnatomSiteEnum.levels.cache_info().currsize == CACHE_MAXSIZE
+    assert DiagnosisEnum.as_dict.cache_info().currsize == CACHE_MAXSIZE
+
+    AnatomSiteEnum.levels.cache_clear()
+    DiagnosisEnum.as_dict.cache_clear()
+    DiagnosisEnum.levels.cache_clear()
+
+
+def test_hierarchy_index() -> None:
+    index = HierarchyIndex.build(["a", "a:b", "a:b:c", "a:d", "e"])
+
+    assert index.nodes == ("a", "a:b", "a:b:c", "a:d", "e")
+    assert index.is_descendant("a:b:c", "a")
+    assert index.is_descendant("a:d", "a")
+    assert not index.is_descendant("a", "a")
+    assert not index.is_descendant("a:d", "a:b")
+    assert not index.is_descendant("e", "a")
+    assert not index.is_descendant("missing", "a")
+    assert index.ancestors("a:b:c") == ("a", "a:b")
+    assert index.ancestors("e") == ()
+    assert index.descendants("a") == ("a:b", "a:b:c", "a:d")
+    assert index.descendants("a:d") == ()
+    assert index.depth("a:b:c") == 3
+
+    with pytest.raises(ValueError, match="not a member"):
+        index.depth("missing")
+
+
+def test_hierarchy_index_requires_parents() -> None:
+    with pytest.raises(ValueError, match="parent"):
+        HierarchyIndex.build(["a", "b:c"])
+
+
+@pytest.mark.parametrize("enum", [AnatomSiteEnum, DiagnosisEnum])
+def test_enum_hierarchy_matches_prefixes(enum: type[AnatomSiteEnum | DiagnosisEnum]) -> None:
+    index = enum.hierarchy()
+    assert set(index.nodes) == set(enum)
+
+    for member in enum:
+        assert index.ancestors(member) == tuple(
+            enum(":".join(member.split(":")[:i])) for i in range(1, member.count(":") + 1)
+        )
+        assert set(index.descendants(member)) == {
+            other for other in enum if other.startswith(f"{member}:")
+        }
+        assert index.depth(member) == len(member.split(":"))
+
+
+def test_is_melanoma() -> None:
+    melanoma = DiagnosisEnum.malignant_malignant_melanocytic_proliferations_melanoma
+    assert {diagnosis for diagnosis in DiagnosisEnum if DiagnosisEnum.is_melanoma(diagnosis)} == {
+        diagnosis for diagnosis in DiagnosisEnum if diagnosis.startswith(melanoma)
+    } | {DiagnosisEnum.malignant_collision_at_least_one_malignant_proliferation}
+    assert not DiagnosisEnum.is_melanoma("junk")
+
+
+def test_hierarchy_codes() -> None:
+    codes = HierarchyCodes.build(["a", "a:b", "a:b:c", "d"])
+
+    assert codes.encode("a:b:c") == 2
+    assert codes.decode(2) == "a:b:c"
+    assert codes.levels[2] == ("a", "b", "c", None, None)
+    assert codes.parents == (NO_CODE, 0, 1, NO_CODE)
+
+    encoded = codes.encode_many(["d", None, "a"])
+    assert list(encoded) == [3, NO_CODE, 0]
+    assert encoded.itemsize == 2
+    assert codes.decode_many(encoded) == ["d", None, "a"]
+
+    with pytest.raises(ValueError, match="not a member"):
+        codes.encode("missing")
+    with pytest.raises(ValueError, match="not a code"):
+        codes.decode(NO_CODE)
+
+    assert codes.fingerprint == HierarchyCodes.build(["a", "a:b", "a:b:c", "d"]).fingerprint
+    assert codes.fingerprint != HierarchyCodes.build(["a", "a:b", "d", "a:b:c"]).fingerprint
+
+
+def test_hierarchy_codes_assigned() -> None:
+    codes = HierarchyCodes.build(["a", "a:b", "c"], ["a", "retired", "c", "a:b"])
+
+    assert codes.encode("a:b") == 3
+    assert codes.decode(1) == "retired"
+    assert codes.parents == (NO_CODE, NO_CODE, NO_CODE, 0)
+
+    with pytest.raises(ValueError, match=r"must be appended: \['d'\]"):
+        HierarchyCodes.build(["a", "d"], ["a", "c"])
+    with pytest.raises(ValueError, match="one code"):
+        HierarchyCodes.build(["a"], ["a", "a"])
+
+
+# The number of codes assigned to each hierarchy as of a release, and a hash of the values coded.
+# Codes are append only, so the codes of these values must never change.
+ASSIGNED_CODES = {
+    AnatomSiteEnum: (206, "00a7ce82ce909c24"),
+    DiagnosisEnum: (418, "c2b1820781bd4872"),
+}
+
+
+@pytest.mark.parametrize("enum", [AnatomSiteEnum, DiagnosisEnum])
+def test_enum_codes_are_append_only(enum: type[AnatomSiteEnum | DiagnosisEnum]) -> None:
+    num_codes, digest = ASSIGNED_CODES[enum]
+    assigned = enum.codes().members[:num_codes]
+
+    assert len(assigned) == num_codes
+    assert hashlib.sha256("\n".join(assigned).encode()).hexdigest()[:16] == digest
+
+
+@pytest.mark.parametrize("enum", [AnatomSiteEnum, DiagnosisEnum])
+def test_enum_codes(enum: type[AnatomSiteEnum | DiagnosisEnum]) -> None:
+    codes = enum.codes()
+
+    for member in enum:
+        code = codes.encode(member)
+        assert codes.decode(code) is member
+        assert codes.levels[code] == enum.levels(member)
+
+        parent = member.rpartition(":")[0]
+        assert codes.parents[code] == (codes.encode(parent) if parent else NO_CODE)
+
+
+def test_metadata_row_hierarchy_codes() -> None:
+    metadata = MetadataRow.model_validate({"diagnosis": "Nevus"})
+
+    assert metadata.diagnosis_code == DiagnosisEnum.codes().encode(
+        DiagnosisEnum.benign_benign_melanocytic_proliferations_nevus
+    )
+    assert metadata.anatom_site_code is None
+    assert "diagnosis_code" not in metadata.model_dump()
+
+
+def test_metadata_row_levels_follow_current_values() -> None:
+    metadata = MetadataRow.model_validate({"diagnosis": "Nevus", "anatom_site": "Head"})
+    assert metadata.diagnosis_3 == "Nevus"
+    assert metadata.anatom_site_2 == "Head"
+
+    metadata.diagnosis = None
+    metadata.anatom_site = AnatomSiteEnum.trunk
+    assert (metadata.diagnosis_1, metadata.anatom_site_1) == (None, "Trunk")
+
+    copied = metadata.model_copy(update={"anatom_site": None})
+    assert copied.anatom_site_1 is None
+
+    unpickled = pickle.loads(pickle.dumps(metadata))
+    assert unpickled.anatom_site_1 == "Trunk"
+
+    constructed = MetadataRow.model_construct(diagnosis=DiagnosisEnum.malignant)
+    assert constructed.model_dump()["diagnosis_1"] == "Malignant"
+
+
+@pytest.mark.parametrize("enum", [AnatomSiteEnum, DiagnosisEnum])
+def test_expand_levels_matches_metadata_row(enum: type[AnatomSiteEnum | DiagnosisEnum]) -> None:
+    field_name = "diagnosis" if enum is DiagnosisEnum else "anatom_site"
+    values = [*enum, *(member.split(":")[-1] for member in enum), ""]
+    rows = [MetadataRow.model_validate({field_name: value}) for value in values]
+
+    for array in [np.array(values), np.array(values, dtype=object), pa.array(values)]:
+        levels = enum.expand_levels(array)
+        assert list(levels) == [f"{field_name}_{level}" for level in range(1, 6)]
+        for name, column in levels.items():
+            expected = [getattr(row, name) for row in rows]
+            assert (
+                column.to_pylist() if isinstance(column, pa.Array) else list(column)
+            ) == expected
+
+
+def test_expand_levels_missing_values() -> None:
+    levels = DiagnosisEnum.expand_levels(np.array([None, "Nevus"], dtype=object))
+    assert list(levels["diagnosis_1"]) == [None, "Benign"]
+
+    levels = DiagnosisEnum.expand_levels(
+        pa.chunked_array([[None, "Nevus"], ["Benign"]]).dictionary_encode()
+    )
+    assert levels["diagnosis_1"].to_pylist() == [None, "Benign", "Benign"]
+    assert levels["diagnosis_3"].to_pylist() == [None, "Nevus", None]
+
+
+def test_expand_levels_rejects_unknown_values() -> None:
+    with pytest.raises(ValueError, match="'not a diagnosis' is not a member"):
+        DiagnosisEnum.expand_levels(np.array(["Nevus", "not a diagnosis"]))
+
+    with pytest.raises(TypeError):
+        DiagnosisEnum.expand_levels(["Nevus"])
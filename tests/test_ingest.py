@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import csv
+import io
+from itertools import product
+import json
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from pydantic import ValidationError
+import pytest
+
+from isic_metadata import ingest
+from isic_metadata.cache import CacheInfo
+from isic_metadata.ingest import (
+    HeaderLayout,
+    ValidationResultCache,
+    ValidationStream,
+    validate_csv,
+)
+from isic_metadata.metadata import MetadataBatch, MetadataRow
+from isic_metadata.unstructured import UnstructuredRow
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+def to_csv(rows: list[dict[str, Any]]) -> io.StringIO:
+    f = io.StringIO()
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    f.seek(0)
+    return f
+
+
+def test_validate_csv_yields_rows_and_errors() -> None:
+    stream = validate_csv(
+        to_csv(
+            [
+                {"age": "54", "diagnosis": "Nevus", "extra": "x"},
+                {"age": "foo", "diagnosis": "Nevus", "extra": "y"},
+            ]
+        )
+    )
+
+    results = list(stream)
+    assert [i for i, _ in results] == [0, 1]
+    assert results[0][1] == MetadataRow.model_validate(
+        {"age": "54", "diagnosis": "Nevus", "extra": "x"}
+    )
+    assert isinstance(results[1][1], list)
+    assert results[1][1][0]["loc"] == ("age",)
+    assert stream.batch_errors == []
+
+
+def test_streamed_unstructured_values_are_dicts() -> None:
+    rows = [{"age": "54", "extra": "x", "other": ""}, {"age": "55", "extra": "y", "other": "z"}]
+
+    for stream in [validate_csv(to_csv(rows)), ValidationStream(rows)]:
+        [(_, first), (_, second)] = list(stream)
+        assert isinstance(first, MetadataRow)
+        assert isinstance(second, MetadataRow)
+        assert json.dumps(first.unstructured) == '{"extra": "x", "other": ""}'
+        second.unstructured["extra"] = "edited"
+        assert second.unstructured == {"extra": "edited", "other": "z"}
+
+
+def test_validate_csv_from_path(tmp_path: Path) -> None:
+    path = tmp_path / "metadata.csv"
+    # spreadsheet software tends to add a byte order mark
+    path.write_text("﻿age,sex\n54,male\n", encoding="utf-8")
+
+    [(_, row)] = list(validate_csv(path))
+    assert isinstance(row, MetadataRow)
+    assert row.age == 54
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [{"lesion_id": "l1", "patient_id": "p1"}, {"lesion_id": "l1", "patient_id": "p2"}],
+        [
+            {"rcm_case_id": "c1", "image_type": "RCM: macroscopic"},
+            {"rcm_case_id": "c1", "image_type": "RCM: macroscopic"},
+        ],
+        [
+            {"rcm_case_id": "c1", "lesion_id": "l1", "image_type": "RCM: tile"},
+            {"rcm_case_id": "c1", "lesion_id": "l2", "image_type": "RCM: tile"},
+        ],
+        [{"lesion_id": "l1", "patient_id": "p1"}, {"lesion_id": "l2", "patient_id": "p2"}],
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 1_000])
+def test_batch_errors_match_metadata_batch(rows: list[dict[str, Any]], chunk_size: int) -> None:
+    stream = ValidationStream(rows, chunk_size=chunk_size)
+    list(stream)
+
+    try:
+        MetadataBatch(items=[MetadataRow.model_validate(dict(row)) for row in rows])
+    except ValidationError as e:
+        expected_errors = e.errors()
+    else:
+        expected_errors = []
+
+    assert [(error["type"], error["msg"], error.get("ctx")) for error in stream.batch_errors] == [
+        (error["type"], error["msg"], error.get("ctx")) for error in expected_errors
+    ]
+
+
+def test_invalid_rows_take_part_in_batch_checks() -> None:
+    stream = ValidationStream(
+        [
+            {"rcm_case_id": "c1", "lesion_id": "l1"},
+            {"rcm_case_id": "c1", "lesion_id": "l2", "age": "foo"},
+        ]
+    )
+    assert all(isinstance(result, list) for _, result in stream)
+    assert [error["type"] for error in stream.batch_errors] == ["one_rcm_case_multiple_lesions"]
+
+
+def test_parallel_validation_matches_serial() -> None:
+    rows = [
+        {"lesion_id": "l1", "patient_id": "p1", "age": "54"},
+        {"rcm_case_id": "c1", "lesion_id": "l1", "image_type": "RCM: macroscopic"},
+        {"age": "foo"},
+        {"lesion_id": "l1", "patient_id": "p2"},
+        {"rcm_case_id": "c1", "lesion_id": "l2", "image_type": "RCM: macroscopic", "age": "foo"},
+    ]
+    serial = ValidationStream(rows)
+    serial_results = list(serial)
+    parallel = ValidationStream(rows, max_workers=2, chunk_size=2)
+
+    assert list(parallel) == serial_results
+    assert parallel.batch_errors == serial.batch_errors
+    assert [error["type"] for error in parallel.batch_errors] == [
+        "one_lesion_multiple_patients",
+        "rcm_multiple_macroscopics",
+        "one_rcm_case_multiple_lesions",
+    ]
+
+
+def test_batch_errors_require_full_iteration() -> None:
+    stream = ValidationStream([{"age": "1"}, {"age": "2"}])
+    next(iter(stream))
+
+    with pytest.raises(RuntimeError):
+        _ = stream.batch_errors
+
+
+def test_validate_csv_memory_is_bounded(tmp_path: Path) -> None:
+    def peak_memory(num_rows: int) -> int:
+        path = tmp_path / f"{num_rows}.csv"
+        with path.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["age", "sex", "diagnosis", "patient_id", "lesion_id", "notes"])
+            writer.writerows(
+                [str(i % 80), "male", "Nevus", f"p{i % 10}", f"l{i % 10}", "note"]
+                for i in range(num_rows)
+            )
+
+        tracemalloc.start()
+        for _ in validate_csv(path, chunk_size=100):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    assert peak_memory(2_000) < peak_memory(200) * 1.5
+
+
+def test_result_cache_only_validates_changed_rows(tmp_path: Path, mocker: MockerFixture) -> None:
+    rows = [
+        {"lesion_id": "l1", "patient_id": "p1", "age": "54", "notes": "x"},
+        {"lesion_id": "l2", "patient_id": "p2", "age": "foo"},
+        {"lesion_id": "l3", "patient_id": "p3", "diagnosis": "Nevus"},
+    ]
+    with ValidationResultCache(tmp_path / "results.sqlite") as result_cache:
+        list(ValidationStream(rows, result_cache=result_cache))
+
+    # a resubmission with one edited row, the same columns in another order, and one new row
+    resubmitted = [
+        dict(reversed(rows[0].items())),
+        {**rows[1], "age": "55"},
+        rows[2],
+        {"lesion_id": "l3", "patient_id": "p4"},
+    ]
+    validate_prepared = mocker.spy(ingest, "_validate_prepared")
+    with ValidationResultCache(tmp_path / "results.sqlite") as result_cache:
+        stream = ValidationStream(resubmitted, result_cache=result_cache, chunk_size=2)
+        results = list(stream)
+
+        assert result_cache.cache_info() == CacheInfo(hits=2, misses=2, maxsize=None, currsize=5)
+
+    # only the edited and new rows
+    assert validate_prepared.call_count == 2
+    uncached = ValidationStream(resubmitted)
+    uncached_results = list(uncached)
+    assert results == uncached_results
+    assert [
+        result.model_fields_set for _, result in results if isinstance(result, MetadataRow)
+    ] == [
+        result.model_fields_set for _, result in uncached_results if isinstance(result, MetadataRow)
+    ]
+    # the batch checks span the cached rows too
+    assert stream.batch_errors == uncached.batch_errors
+    assert [error["type"] for error in stream.batch_errors] == ["one_lesion_multiple_patients"]
+
+
+def test_result_cache_is_discarded_when_the_schema_changes(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    with ValidationResultCache(tmp_path / "results.sqlite") as result_cache:
+        list(ValidationStream([{"age": "54"}], result_cache=result_cache))
+        assert result_cache.cache_info().currsize == 1
+
+    mocker.patch("isic_metadata.ingest.schema_fingerprint", return_value="0" * 16)
+    with ValidationResultCache(tmp_path / "results.sqlite") as result_cache:
+        assert result_cache.cache_info().currsize == 0
+
+
+def test_result_cache_with_workers(tmp_path: Path) -> None:
+    rows = [{"lesion_id": f"l{i % 3}", "patient_id": f"p{i % 2}"} for i in range(6)]
+    with ValidationResultCache(tmp_path / "results.sqlite") as result_cache:
+        list(ValidationStream(rows[:3], result_cache=result_cache))
+
+        stream = ValidationStream(rows, result_cache=result_cache, max_workers=2, chunk_size=2)
+        assert list(stream) == list(ValidationStream(rows))
+        assert [error["type"] for error in stream.batch_errors] == ["one_lesion_multiple_patients"]
+
+
+def test_header_layout() -> None:
+    layout = HeaderLayout(
+        ["filename", "age", "diagnosis_1", "notes", "diagnosis_2", "isic_id", "diagnosis_6"]
+    )
+
+    assert layout.structured == ("age",)
+    assert layout.hierarchical == ("diagnosis_1", "diagnosis_2")
+    assert layout.reserved == ("filename", "isic_id")
+    assert layout.unstructured == ("notes", "diagnosis_6")
+    assert layout.prepare(["a.jpg", "54", "Benign", "x", "", "ISIC_1", "y"]) == {
+        "age": "54",
+        "diagnosis": "Benign",
+        "unstructured": {
+            "filename": "a.jpg",
+            "notes": "x",
+            "isic_id": "ISIC_1",
+            "diagnosis_6": "y",
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # hierarchical values given as levels, alongside a full value, and with missing levels
+        (
+            "diagnosis,diagnosis_1,diagnosis_2,anatom_site_1,anatom_site_3,age\n"
+            "Nevus,,,Head and neck,,54\n"
+            ",Benign,Benign melanocytic proliferations,Trunk,,foo\n"
+            ",Malignant,,,,\n"
+        ),
+        # reserved, unstructured and repeated columns, short and long rows, and blank lines
+        (
+            "filename,lesion_id,patient_id,notes,sex,notes,unstructured\n"
+            "a.jpg,l1,p1,x,male,y,z\n"
+            "\n"
+            "b.jpg,l1,p2\n"
+            "c.jpg,l2,p3,x,FEMALE,y,z,extra\n"
+        ),
+    ],
+)
+def test_validate_csv_matches_dict_rows(text: str) -> None:
+    expected = ValidationStream(csv.DictReader(io.StringIO(text)))
+    expected_results = list(expected)
+
+    for max_workers, shared_unstructured in product([1, 2], [False, True]):
+        stream = validate_csv(
+            io.StringIO(text),
+            max_workers=max_workers,
+            chunk_size=2,
+            shared_unstructured=shared_unstructured,
+        )
+        results = [result for _, result in stream]
+        assert list(enumerate(results)) == expected_results
+        assert stream.batch_errors == expected.batch_errors
+        # with shared_unstructured, the unstructured values of a chunk share its columns
+        assert all(
+            type(result.unstructured) is (UnstructuredRow if shared_unstructured else dict)
+            for result in results
+            if isinstance(result, MetadataRow)
+        )
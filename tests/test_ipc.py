@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import stat
+from typing import TYPE_CHECKING
+
+import pyarrow as pa
+import pytest
+
+from isic_metadata.arrow import ARROW_SCHEMA, validate_arrow
+from isic_metadata.ipc import FINGERPRINT_KEY, cached_ipc, ipc_fingerprint, read_ipc, write_ipc
+from isic_metadata.metadata import MetadataRow
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def rows() -> list[MetadataRow]:
+    return [
+        MetadataRow.model_validate(
+            {
+                "age": str(20 + i),
+                "sex": ["male", "female"][i % 2],
+                "diagnosis": ["Nevus", "Melanoma in situ"][i % 2],
+                "clin_size_long_diam_mm": f"{i}mm",
+                "lesion_id": f"IL_{i}",
+            }
+        )
+        for i in range(10)
+    ]
+
+
+def test_round_trip(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.arrow"
+    write_ipc(path, rows)
+
+    table = read_ipc(path)
+    assert table is not None
+    assert table.schema == ARROW_SCHEMA
+    assert table.to_pylist() == [
+        {field_name: getattr(row, field_name) for field_name in ARROW_SCHEMA.names} for row in rows
+    ]
+    # only the file is left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["metadata.arrow"]
+
+
+def test_read_ipc_is_memory_mapped(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.arrow"
+    write_ipc(path, rows * 1000)
+
+    allocated = pa.total_allocated_bytes()
+    table = read_ipc(path)
+    assert table is not None
+    assert table.num_rows == 10_000
+    assert pa.total_allocated_bytes() - allocated < table.nbytes // 10
+
+
+def test_write_ipc_chunked_table(tmp_path: Path) -> None:
+    # the chunks of a validated table can each have their own dictionary
+    table = pa.concat_tables(
+        [
+            validate_arrow(pa.record_batch({"sex": ["male", None]})).table,
+            validate_arrow(pa.record_batch({"sex": ["female"], "extra": ["foo"]})).table,
+        ]
+    )
+    path = tmp_path / "metadata.arrow"
+    write_ipc(path, table)
+
+    cached = read_ipc(path)
+    assert cached is not None
+    assert cached["sex"].to_pylist() == ["male", None, "female"]
+
+
+def test_read_ipc_stale_or_missing(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.arrow"
+    assert read_ipc(path) is None
+
+    write_ipc(path, rows)
+    table = pa.ipc.open_file(path).read_all()
+    assert table.schema.metadata == {FINGERPRINT_KEY: ipc_fingerprint().encode()}
+
+    with pa.ipc.new_file(path, ARROW_SCHEMA.with_metadata({FINGERPRINT_KEY: b"0"})) as writer:
+        writer.write_table(table.replace_schema_metadata({FINGERPRINT_KEY: b"0"}))
+    assert read_ipc(path) is None
+
+
+def test_cached_ipc(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.arrow"
+    calls: list[None] = []
+
+    def build() -> list[MetadataRow]:
+        calls.append(None)
+        return rows
+
+    assert cached_ipc(path, build).num_rows == 10
+    assert cached_ipc(path, build).num_rows == 10
+    assert len(calls) == 1
+
+    # a cache written with another schema is rebuilt
+    with pa.ipc.new_file(path, pa.schema([("lesion_id", pa.string())])) as writer:
+        writer.write_table(pa.table({"lesion_id": ["IL_1"]}))
+    assert cached_ipc(path, build).schema == ARROW_SCHEMA
+    assert len(calls) == 2
+
+
+def test_cached_ipc_truncated(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.arrow"
+    write_ipc(path, rows)
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 2])
+
+    with pytest.raises(pa.ArrowInvalid):
+        read_ipc(path)
+    assert cached_ipc(path, lambda: rows).num_rows == 10
+    assert path.read_bytes() == data
+
+
+def test_write_ipc_mode(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.arrow"
+    umask = os.umask(0o027)
+    try:
+        write_ipc(path, rows)
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
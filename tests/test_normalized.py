@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from pydantic import ValidationError
+import pytest
+
+from isic_metadata.metadata import MetadataRow
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {},
+        {"age": "85+", "sex": "Male", "clin_size_long_diam_mm": "4 mm"},
+        {"diagnosis": "Melanoma Invasive", "mel_ulcer": "true", "mel_thick_mm": "1.5mm"},
+        {"anatom_site": "Scalp", "fitzpatrick_skin_type": "II", "melanocytic": "False"},
+        {"image_type": "RCM: tile", "rcm_case_id": "case", "lesion_id": 12, "other": "x"},
+        {"image_type": "dermoscopic", "dermoscopic_type": "contact polarized"},
+    ],
+)
+def test_from_normalized_matches_model_validate(values: dict[str, Any]) -> None:
+    # round trip through a dump, which is how rows are stored in the database
+    dumped = MetadataRow.model_validate(values).model_dump()
+
+    assert MetadataRow.from_normalized(dumped) == MetadataRow.model_validate(dict(dumped))
+
+
+def test_from_normalized_null_levels() -> None:
+    dumped = MetadataRow.model_validate({"diagnosis": "Nevus"}).model_dump()
+    assert dumped["diagnosis_4"] is None
+    assert dumped["anatom_site_1"] is None
+
+    metadata = MetadataRow.from_normalized(dumped)
+    assert metadata.diagnosis == "Benign:Benign melanocytic proliferations:Nevus"
+    assert metadata.anatom_site is None
+    assert metadata.model_dump() == dumped
+
+
+def test_from_normalized_rebuilds_hierarchical_values() -> None:
+    metadata = MetadataRow.from_normalized(
+        {"diagnosis_1": "Benign", "diagnosis_2": "Benign melanocytic proliferations"}
+    )
+    assert metadata.diagnosis == "Benign:Benign melanocytic proliferations"
+    assert metadata.diagnosis_3 is None
+
+
+def test_from_normalized_trusts_typed_values() -> None:
+    metadata = MetadataRow.from_normalized({"patient_id": " IP_1 ", "mel_ulcer": None})
+    assert metadata.patient_id == " IP_1 "
+
+
+def test_from_normalized_coerces_other_values() -> None:
+    metadata = MetadataRow.from_normalized({"age": "85+", "clin_size_long_diam_mm": "1cm"})
+    assert metadata.age == 85
+    assert metadata.clin_size_long_diam_mm == Decimal("10.0")
+
+    with pytest.raises(ValidationError) as excinfo:
+        MetadataRow.from_normalized({"age": "foo", "diagnosis_1": "nope"})
+    assert [error["loc"] for error in excinfo.value.errors()] == [("age",), ("diagnosis",)]
+
+
+def test_from_normalized_runs_cross_field_validators() -> None:
+    with pytest.raises(ValidationError) as excinfo:
+        MetadataRow.from_normalized({"diagnosis_1": "Benign", "mel_ulcer": True})
+    assert "mel_ulcer is incompatible with diagnosis" in excinfo.value.errors()[0]["msg"]
+
+    MetadataRow.from_normalized({"rcm_case_id": "foo"}, _ignore_rcm_model_checks=True)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from isic_metadata.arrow import ARROW_SCHEMA, validate_arrow
+from isic_metadata.diagnosis_hierarchical import DiagnosisEnum
+from isic_metadata.metadata import MetadataRow
+from isic_metadata.parquet import MetadataParquetWriter, _filter_expression, read_parquet
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def rows() -> list[MetadataRow]:
+    diagnoses = ["Nevus", "Melanoma in situ", "Basal cell carcinoma", "Benign"]
+    return [
+        MetadataRow.model_validate(
+            {
+                "age": str(20 + i % 60),
+                "sex": ["male", "female"][i % 2],
+                "diagnosis": diagnoses[i // 25],
+                "anatom_site": "Scalp",
+                "clin_size_long_diam_mm": f"{i % 10}mm",
+                "image_type": "dermoscopic",
+                "patient_id": f"IP_{i // 10}",
+                "lesion_id": f"IL_{i // 5}",
+            }
+        )
+        for i in range(100)
+    ]
+
+
+def test_round_trip(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.parquet"
+    with MetadataParquetWriter(path, row_group_size=30) as writer:
+        writer.write_rows(rows[:45])
+        writer.write_rows(rows[45:])
+
+    metadata = pq.ParquetFile(path).metadata
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [
+        30,
+        30,
+        30,
+        10,
+    ]
+
+    # keyword fields, including the full hierarchical values, are dictionary encoded
+    for field_name in ["diagnosis", "patient_id", "sex"]:
+        column = metadata.row_group(0).column(ARROW_SCHEMA.get_field_index(field_name))
+        assert "RLE_DICTIONARY" in column.encodings
+
+    table = pa.Table.from_batches(read_parquet(path), schema=ARROW_SCHEMA)
+    assert table.to_pylist() == [
+        {field_name: getattr(row, field_name) for field_name in ARROW_SCHEMA.names} for row in rows
+    ]
+
+
+def test_write_validated_tables(tmp_path: Path) -> None:
+    path = tmp_path / "metadata.parquet"
+    result = validate_arrow(pa.table({"age": ["54", "foo"], "sex": ["male", " FEMALE"]}))
+    with MetadataParquetWriter(path) as writer:
+        writer.write_table(result.table.filter(result.valid))
+        writer.write_rows([MetadataRow(age=30)])
+
+    table = pa.Table.from_batches(read_parquet(path, columns=["age", "sex"]))
+    assert table.to_pylist() == [{"age": 54, "sex": "male"}, {"age": 30, "sex": None}]
+
+
+def test_read_parquet_filters(tmp_path: Path, rows: list[MetadataRow]) -> None:
+    path = tmp_path / "metadata.parquet"
+    with MetadataParquetWriter(path, row_group_size=25) as writer:
+        writer.write_rows(rows)
+
+    def read(**filters: object) -> list[str | None]:
+        batches = read_parquet(path, columns=["lesion_id"], filters=filters)
+        return [lesion_id for batch in batches for lesion_id in batch["lesion_id"].to_pylist()]
+
+    assert read(lesion_id="IL_3") == ["IL_3"] * 5
+    assert read(sex="female", patient_id=["IP_0", "IP_9"]) == [
+        f"IL_{i // 5}" for i in [*range(10), *range(90, 100)] if i % 2
+    ]
+    # levels are matched through the hierarchical values they're derived from
+    assert read(diagnosis_1="Malignant") == [row.lesion_id for row in rows[25:75]]
+    assert read(diagnosis_3=["Nevus", "Melanoma in situ"]) == [
+        row.lesion_id
+        for row in rows
+        if row.diagnosis
+        in {
+            DiagnosisEnum.benign_benign_melanocytic_proliferations_nevus,
+            DiagnosisEnum.malignant_malignant_melanocytic_proliferations_melanoma_melanoma_in_situ,
+        }
+    ]
+
+
+def test_read_parquet_rejects_unknown_fields(tmp_path: Path) -> None:
+    path = tmp_path / "metadata.parquet"
+    with MetadataParquetWriter(path) as writer:
+        writer.write_rows([MetadataRow()])
+
+    with pytest.raises(ValueError, match="Unknown columns: nope"):
+        read_parquet(path, columns=["nope"])
+    with pytest.raises(ValueError, match="isn't a registry field"):
+        read_parquet(path, filters={"unstructured": "x"})
+
+
+def test_read_parquet_skips_row_groups(tmp_path: Path) -> None:
+    path = tmp_path / "metadata.parquet"
+    with MetadataParquetWriter(path, row_group_size=10) as writer:
+        writer.write_rows(
+            MetadataRow(lesion_id=f"IL_{i:02}", diagnosis="Benign" if i < 50 else "Malignant")
+            for i in range(100)
+        )
+
+    [fragment] = ds.dataset(path, schema=ARROW_SCHEMA).get_fragments()
+    assert len(fragment.split_by_row_group(_filter_expression("lesion_id", "IL_42"))) == 1
+    assert len(fragment.split_by_row_group(_filter_expression("diagnosis_1", "Malignant"))) == 5
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import copy
+import pickle
+
+import pytest
+
+from isic_metadata.unstructured import UnstructuredColumns, UnstructuredRow
+
+
+def test_append() -> None:
+    columns = UnstructuredColumns()
+    first = columns.append({"foo": "1", "bar": "x"})
+    second = columns.append({})
+    third = columns.append({"baz": "2", "foo": "1"})
+
+    assert first == {"foo": "1", "bar": "x"}
+    assert second == {}
+    assert third == {"foo": "1", "baz": "2"}
+    assert "bar" not in third
+    with pytest.raises(KeyError):
+        third["bar"]
+    assert len(columns) == 3
+    assert columns.keys() == ("foo", "bar", "baz")
+    assert columns.column("foo") == ["1", None, "1"]
+    assert columns.column("bar") == ["x", None, None]
+    assert columns.column("baz") == [None, None, "2"]
+
+
+def test_append_values() -> None:
+    columns = UnstructuredColumns(["foo", "bar"])
+    assert columns.append_values(["1", "2"]) == {"foo": "1", "bar": "2"}
+    assert columns.append({"baz": "3"}) == {"baz": "3"}
+    assert columns.row(0) == {"foo": "1", "bar": "2"}
+
+    with pytest.raises(ValueError, match="zip"):
+        columns.append_values(["1"])
+    with pytest.raises(IndexError):
+        columns.row(2)
+
+
+def test_many_distinct_values() -> None:
+    columns = UnstructuredColumns(["foo"])
+    rows = [columns.append_values([str(i)]) for i in range(70_000)]
+    columns.append_values([None])
+
+    assert [row["foo"] for row in rows[::7_000]] == [str(i) for i in range(0, 70_000, 7_000)]
+    assert columns.column("foo")[-2:] == ["69999", None]
+
+
+def test_unhashable_values() -> None:
+    columns = UnstructuredColumns()
+    first = columns.append({None: ["a", "b"]})  # type: ignore[dict-item]
+    second = columns.append({None: ["a", "b"]})  # type: ignore[dict-item]
+
+    assert first == second == {None: ["a", "b"]}
+    assert first[None] is not second[None]  # type: ignore[index]
+
+
+def test_copies_are_dicts() -> None:
+    columns = UnstructuredColumns()
+    row = columns.append({"foo": "1"})
+
+    assert isinstance(row, UnstructuredRow)
+    assert repr(row) == "{'foo': '1'}"
+    for copied in [pickle.loads(pickle.dumps(row)), copy.copy(row), copy.deepcopy(row)]:
+        assert type(copied) is dict
+        assert copied == {"foo": "1"}
+
+
+def test_seal() -> None:
+    columns = UnstructuredColumns(["foo"])
+    row = columns.append_values(["1"])
+    columns.seal()
+
+    assert row == {"foo": "1"}
+    with pytest.raises(RuntimeError):
+        columns.append_values(["2"])